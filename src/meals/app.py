@@ -4,19 +4,40 @@
 BeeWare (Toga) を使用したiOS向け献立管理アプリケーション
 """
 
+import asyncio
+import importlib
 import sys
 import threading
-import time
 import traceback
 
 import toga
 
-from meals.utils.database import backup_database, init_db, restore_database
 from meals.utils.exceptions import DatabaseException, MealPlannerException, RecoveryException
 from meals.utils.logger import logger
 from meals.utils.performance import measure_execution_time
-from meals.utils.ui import run_in_background, show_loading, hide_loading
-from meals.views.main_window import MainView
+
+# ローディングインジケーターを表示するまでの猶予(秒)
+SPINNER_DELAY = 0.15
+
+# スプラッシュ表示中に先読みしておくモジュール
+# (SQLAlchemy / Pydantic を含むため、初回描画の前には読み込まない)
+_PREWARM_MODULES = (
+    "meals.models",
+    "meals.schemas",
+    "meals.repositories",
+    "meals.viewmodels",
+)
+
+
+def _prewarm() -> None:
+    """
+    重いモジュールをバックグラウンドで先読みする
+    """
+    for module_name in _PREWARM_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            logger.warning(f"Failed to prewarm {module_name}: {str(e)}")
 
 
 class MealPlannerApp(toga.App):
@@ -53,8 +74,9 @@ class MealPlannerApp(toga.App):
         )
         
         # ローディングインジケーター
-        activity_indicator = toga.ActivityIndicator(style=toga.style.Pack(padding=10))
-        activity_indicator.start()
+        # 初期化がすぐに終わる場合はアニメーションを開始しない
+        self._activity_indicator = toga.ActivityIndicator(style=toga.style.Pack(padding=10))
+        self._spinner_task = self.loop.create_task(self._maybe_start_spinner(self._activity_indicator))
         
         # ローディングメッセージ
         loading_label = toga.Label(
@@ -64,7 +86,7 @@ class MealPlannerApp(toga.App):
         
         # スプラッシュスクリーンにコンポーネントを追加
         splash_box.add(app_name_label)
-        splash_box.add(activity_indicator)
+        splash_box.add(self._activity_indicator)
         splash_box.add(loading_label)
         
         # スプラッシュスクリーンを表示
@@ -72,39 +94,57 @@ class MealPlannerApp(toga.App):
         self.main_window.show()
         
         # 非同期で初期化処理を実行
-        self._async_initialize()
+        self._bootstrap_task = self.loop.create_task(self._bootstrap())
     
-    @run_in_background
-    def _async_initialize(self):
+    async def _maybe_start_spinner(self, activity_indicator):
+        """
+        初期化が長引いた場合のみローディングインジケーターを開始する
+        """
+        await asyncio.sleep(SPINNER_DELAY)
+        activity_indicator.start()
+    
+    async def _bootstrap(self):
         """
         非同期でアプリケーションを初期化する
+        
+        データベースの初期化はワーカースレッドで行い、
+        メインビューの作成はUIスレッド上でそのまま行う
         """
         try:
             logger.info("Starting application")
             
+            # モデル等の読み込みをデータベース初期化と並行して行う
+            threading.Thread(target=_prewarm, daemon=True).start()
+            
             # データベースの初期化
-            self._initialize_app()
+            await asyncio.to_thread(self._initialize_app)
             
-            # UIスレッドでメインビューを作成
-            self.add_background_task(self._create_main_view)
+            # メインビューの作成
+            self._create_main_view()
             
             logger.info("Application started successfully")
         except (MealPlannerException, DatabaseException) as e:
             logger.error(f"Initialization error: {str(e)}")
-            self.add_background_task(lambda: self._handle_initialization_error(e))
+            self._handle_initialization_error(e)
         except Exception as e:
             logger.critical(f"Unexpected error: {str(e)}")
             logger.critical(traceback.format_exc())
-            self.add_background_task(lambda: self.main_window.info_dialog(
+            self.main_window.info_dialog(
                 "重大なエラー",
                 f"予期しないエラーが発生しました: {str(e)}\n\n"
                 "アプリケーションを再起動してください。"
-            ))
+            )
     
     def _create_main_view(self, *args):
         """
         メインビューを作成する
         """
+        from meals.views.main_window import MainView
+        
+        # ローディングインジケーターを停止
+        self._spinner_task.cancel()
+        self._activity_indicator.stop()
+        
         # メインビューの作成
         self.main_view = MainView(self)
     
@@ -113,13 +153,20 @@ class MealPlannerApp(toga.App):
         アプリケーションの初期化処理
         データベースの接続やモデルの初期化などを行う
         """
+        from meals.utils.database import init_db, optimize_database
+        
         # データベースの初期化
         init_db()
+        
+        # クエリプランナーの統計情報を更新
+        optimize_database()
     
     def _handle_initialization_error(self, error):
         """
         初期化エラーを処理する
         """
+        from meals.utils.database import backup_database, immediate_transaction, init_db, restore_database
+        
         # データベースのバックアップを作成
         backup_path = backup_database()
         
@@ -131,12 +178,13 @@ class MealPlannerApp(toga.App):
                 "データベースを再作成しますか？"
             ):
                 try:
-                    # データベースを再作成
+                    # データベースを再作成 (単一のトランザクション内でスキーマを構築)
                     logger.info("Attempting to recreate database")
-                    init_db(max_retries=5)
+                    with immediate_transaction() as connection:
+                        init_db(max_retries=5, connection=connection)
                     
                     # メインビューの作成
-                    self.main_view = MainView(self)
+                    self._create_main_view()
                     
                     self.main_window.info_dialog(
                         "復旧成功",
@@ -162,10 +210,11 @@ class MealPlannerApp(toga.App):
                                     )
                                     
                                     # 再初期化
-                                    init_db()
+                                    with immediate_transaction() as connection:
+                                        init_db(connection=connection)
                                     
                                     # メインビューの作成
-                                    self.main_view = MainView(self)
+                                    self._create_main_view()
                                     
                                     logger.info("Database restore successful")
                                     return
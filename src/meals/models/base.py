@@ -2,14 +2,34 @@
 Base model for SQLAlchemy models.
 """
 
+import os
 from datetime import datetime
-from typing import Any, Dict
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
 
-from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy import Column, DateTime, Integer, inspect
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# Loader strategy for collection relationships.
+# With MEALS_STRICT_LOAD=1 any unplanned lazy load raises, so N+1 queries surface in dev/test.
+RELATIONSHIP_LAZY = "raise_on_sql" if os.environ.get("MEALS_STRICT_LOAD") == "1" else "select"
+
+
+class _LoadedState:
+    """Mapping over loaded attribute values; unloaded attributes read as None."""
+    
+    __slots__ = ("_state",)
+    
+    def __init__(self, state: Dict[str, Any]):
+        self._state = state
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self._state.get(key)
+        return value.value if isinstance(value, Enum) else value
+
 
 class BaseModel(Base):
     """Base model for all SQLAlchemy models."""
@@ -20,6 +40,43 @@ class BaseModel(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # repr template defined by each model, filled from loaded attributes only
+    # so that repr() never triggers a lazy load
+    _repr_template: str
+    
+    def __repr__(self) -> str:
+        """String representation of the model."""
+        return self._repr_template.format_map(_LoadedState(self.__dict__))
+    
+    @classmethod
+    def _column_names(cls) -> Tuple[str, ...]:
+        """Get the column names, computed once per model class."""
+        names = cls.__dict__.get("__column_names__")
+        if names is None:
+            names = tuple(c.name for c in cls.__table__.columns)
+            cls.__column_names__ = names
+        return names
+    
+    @classmethod
+    def _column_keys(cls) -> FrozenSet[str]:
+        """Get the mapped column attribute keys as a set, computed once per model class."""
+        keys = cls.__dict__.get("__column_keys__")
+        if keys is None:
+            keys = frozenset(attr.key for attr in inspect(cls).column_attrs)
+            cls.__column_keys__ = keys
+        return keys
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert model instance to dictionary."""
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
\ No newline at end of file
+        state = self.__dict__
+        return {
+            name: state[name] if name in state else getattr(self, name)
+            for name in type(self)._column_names()
+        }
+    
+    @classmethod
+    def to_dicts(cls, instances: Iterable["BaseModel"]) -> List[Dict[str, Any]]:
+        """Convert model instances to dictionaries in bulk."""
+        names = cls._column_names()
+        getter = attrgetter(*names)
+        return [dict(zip(names, getter(instance))) for instance in instances]
\ No newline at end of file
@@ -1,5 +1,8 @@
 """
 Enum definitions for the meal planner application.
+
+Enum columns are stored as integer codes in definition order
+(see meals.models.types.EnumCode); only ever append new members.
 """
 
 from enum import Enum, auto
@@ -5,11 +5,12 @@ MealPlan model for the meal planner application.
 from datetime import date
 from typing import List
 
-from sqlalchemy import Column, Date, ForeignKey, Integer, String, Table, UniqueConstraint
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String, Table, UniqueConstraint
 from sqlalchemy.orm import relationship
 
-from meals.models.base import Base, BaseModel
+from meals.models.base import RELATIONSHIP_LAZY, Base, BaseModel
 from meals.models.enums import MealType
+from meals.models.types import EnumCode
 
 # Association table for many-to-many relationship between MealPlan and Recipe
 meal_plan_recipes = Table(
@@ -17,6 +18,9 @@ meal_plan_recipes = Table(
     Base.metadata,
     Column("meal_plan_id", Integer, ForeignKey("meal_plans.id", ondelete="CASCADE"), primary_key=True),
     Column("recipe_id", Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True),
+    # Covering index for lookups by recipe (e.g. cascading recipe deletes)
+    Index("ix_meal_plan_recipes_recipe_meal_plan", "recipe_id", "meal_plan_id"),
+    sqlite_with_rowid=False,
 )
 
 
@@ -25,14 +29,13 @@ class MealPlan(BaseModel):
     
     __tablename__ = "meal_plans"
     __table_args__ = (UniqueConstraint("date", "meal_type", name="uq_meal_plan_date_type"),)
+    _repr_template = "<MealPlan(id={id}, name='{name}', date='{date}', meal_type='{meal_type}')>"
     
     name = Column(String, nullable=False)
     date = Column(Date, nullable=False)
-    meal_type = Column(String, nullable=False)
+    meal_type = Column(EnumCode(MealType), nullable=False)
     
     # Relationships
-    recipes = relationship("Recipe", secondary=meal_plan_recipes, back_populates="meal_plans")
-    
-    def __repr__(self) -> str:
-        """String representation of the MealPlan."""
-        return f"<MealPlan(id={self.id}, name='{self.name}', date='{self.date}', meal_type='{self.meal_type}')>"
\ No newline at end of file
+    recipes = relationship(
+        "Recipe", secondary=meal_plan_recipes, back_populates="meal_plans", lazy=RELATIONSHIP_LAZY
+    )
\ No newline at end of file
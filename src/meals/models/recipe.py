@@ -4,48 +4,50 @@ Recipe and Ingredient models for the meal planner application.
 
 from typing import List
 
-from sqlalchemy import Column, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
-from meals.models.base import BaseModel
+from meals.models.base import RELATIONSHIP_LAZY, BaseModel
 from meals.models.enums import IngredientCategory, RecipeCategory
 from meals.models.meal_plan import meal_plan_recipes
+from meals.models.types import EnumCode
 
 
 class Recipe(BaseModel):
     """Recipe model."""
     
     __tablename__ = "recipes"
+    _repr_template = "<Recipe(id={id}, name='{name}', category='{category}')>"
     
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     preparation_time = Column(Integer, nullable=True)  # in minutes
     cooking_instructions = Column(Text, nullable=True)
-    category = Column(String, nullable=True)
+    category = Column(EnumCode(RecipeCategory), nullable=True)
     
     # Relationships
-    ingredients = relationship("Ingredient", back_populates="recipe", cascade="all, delete-orphan")
-    meal_plans = relationship("MealPlan", secondary=meal_plan_recipes, back_populates="recipes")
-    
-    def __repr__(self) -> str:
-        """String representation of the Recipe."""
-        return f"<Recipe(id={self.id}, name='{self.name}', category='{self.category}')>"
+    ingredients = relationship(
+        "Ingredient", back_populates="recipe", cascade="all, delete-orphan", lazy=RELATIONSHIP_LAZY
+    )
+    meal_plans = relationship(
+        "MealPlan", secondary=meal_plan_recipes, back_populates="recipes", lazy=RELATIONSHIP_LAZY
+    )
 
 
 class Ingredient(BaseModel):
     """Ingredient model."""
     
     __tablename__ = "ingredients"
+    # Leads with recipe_id for the relationship loads; the other columns cover the
+    # per-recipe reads of the ingredient aggregation so it never visits the table
+    __table_args__ = (Index("ix_ingredients_recipe_aggregate", "recipe_id", "name", "unit", "category", "quantity"),)
+    _repr_template = "<Ingredient(id={id}, name='{name}', quantity={quantity}, unit='{unit}')>"
     
     recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
     quantity = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
-    category = Column(String, nullable=True)
+    category = Column(EnumCode(IngredientCategory), nullable=True)
     
     # Relationships
-    recipe = relationship("Recipe", back_populates="ingredients")
-    
-    def __repr__(self) -> str:
-        """String representation of the Ingredient."""
-        return f"<Ingredient(id={self.id}, name='{self.name}', quantity={self.quantity}, unit='{self.unit}')>"
\ No newline at end of file
+    recipe = relationship("Recipe", back_populates="ingredients")
\ No newline at end of file
@@ -5,17 +5,20 @@ ShoppingList and ShoppingListItem models for the meal planner application.
 from datetime import date
 from typing import List
 
-from sqlalchemy import Boolean, Column, Date, Float, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, Date, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from meals.models.base import BaseModel
 from meals.models.enums import IngredientCategory
+from meals.models.types import EnumCode
 
 
 class ShoppingList(BaseModel):
     """ShoppingList model."""
     
     __tablename__ = "shopping_lists"
+    __table_args__ = (Index("ix_shopping_lists_date_range", "date_range_start", "date_range_end"),)
+    _repr_template = "<ShoppingList(id={id}, name='{name}', date_range='{date_range_start} to {date_range_end}')>"
     
     name = Column(String, nullable=False)
     date_range_start = Column(Date, nullable=False)
@@ -23,27 +26,28 @@ class ShoppingList(BaseModel):
     
     # Relationships
     items = relationship("ShoppingListItem", back_populates="shopping_list", cascade="all, delete-orphan")
-    
-    def __repr__(self) -> str:
-        """String representation of the ShoppingList."""
-        return f"<ShoppingList(id={self.id}, name='{self.name}', date_range='{self.date_range_start} to {self.date_range_end}')>"
 
 
 class ShoppingListItem(BaseModel):
     """ShoppingListItem model."""
     
     __tablename__ = "shopping_list_items"
+    # Serve the per-list category / purchase status filters already sorted by name
+    __table_args__ = (
+        Index("ix_shopping_list_items_list_category_name", "shopping_list_id", "category", "ingredient_name"),
+        Index("ix_shopping_list_items_list_purchased_name", "shopping_list_id", "is_purchased", "ingredient_name"),
+    )
+    _repr_template = (
+        "<ShoppingListItem(id={id}, ingredient_name='{ingredient_name}', total_quantity={total_quantity}, "
+        "unit='{unit}', is_purchased={is_purchased})>"
+    )
     
     shopping_list_id = Column(Integer, ForeignKey("shopping_lists.id", ondelete="CASCADE"), nullable=False)
     ingredient_name = Column(String, nullable=False)
     total_quantity = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
-    category = Column(String, nullable=True)
+    category = Column(EnumCode(IngredientCategory), nullable=True)
     is_purchased = Column(Boolean, default=False)
     
     # Relationships
-    shopping_list = relationship("ShoppingList", back_populates="items")
-    
-    def __repr__(self) -> str:
-        """String representation of the ShoppingListItem."""
-        return f"<ShoppingListItem(id={self.id}, ingredient_name='{self.ingredient_name}', total_quantity={self.total_quantity}, unit='{self.unit}', is_purchased={self.is_purchased})>"
\ No newline at end of file
+    shopping_list = relationship("ShoppingList", back_populates="items")
\ No newline at end of file
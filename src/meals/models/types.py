@@ -0,0 +1,44 @@
+"""
+Custom column types for the meal planner application.
+"""
+
+from enum import Enum
+from typing import Any, Optional, Type
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class EnumCode(TypeDecorator):
+    """Store a str Enum as a small integer code.
+    
+    Codes follow the member definition order starting at 1, so new members
+    must only ever be appended to the enum.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: Type[Enum]):
+        """Initialize the type with the enum class to map."""
+        super().__init__()
+        self.enum_class = enum_class
+        self._codes = {member: code for code, member in enumerate(enum_class, start=1)}
+        self._members = {code: member for member, code in self._codes.items()}
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        """Convert an enum member (or its value) to its code."""
+        if value is None:
+            return None
+        return self._codes[self.enum_class(value)]
+    
+    def process_result_value(self, value: Any, dialect) -> Optional[Enum]:
+        """Convert a stored code back to the enum member."""
+        if value is None:
+            return None
+        # Databases migrated from VARCHAR columns keep TEXT affinity and return codes as strings
+        return self._members[int(value)]
+    
+    def code_of(self, member: Enum) -> int:
+        """Get the stored code of an enum member."""
+        return self._codes[member]
@@ -3,19 +3,28 @@ Base repository interface for the meal planner application.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Generic, Iterator, List, Optional, Sequence, Type, TypeVar
 
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import delete, exists, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from meals.models.base import BaseModel
-from meals.utils.database import get_db_session
+from meals.utils.database import ScopedSession
 from meals.utils.exceptions import DatabaseException
 
 # Type variable for the model
 T = TypeVar("T", bound=BaseModel)
 
+# Type variable for the repository
+R = TypeVar("R", bound="BaseRepository")
+
+
+def is_foreign_key_error(error: IntegrityError) -> bool:
+    """Tell whether an integrity error came from a foreign key rather than another constraint."""
+    return "FOREIGN KEY constraint failed" in str(error.orig)
+
 
 class BaseRepository(Generic[T], ABC):
     """Base repository interface for all repositories."""
@@ -23,13 +32,25 @@ class BaseRepository(Generic[T], ABC):
     def __init__(self, session: Optional[Session] = None):
         """Initialize the repository with a session."""
         self._session = session
+        self._owns_session = session is None
+    
+    @classmethod
+    def shared(cls: Type[R]) -> R:
+        """Get the instance of this repository shared by the viewmodels."""
+        # Looked up in the class's own namespace so subclasses do not share their parent's
+        instance = cls.__dict__.get("_shared_instance")
+        if instance is None:
+            instance = cls()
+            cls._shared_instance = instance
+        return instance
     
     @property
     def session(self) -> Session:
         """Get the session."""
         if self._session is None:
-            # Get a new session from the generator
-            self._session = next(get_db_session())
+            # Look up the calling thread's session (and its pooled connection) on every use,
+            # so one repository instance can serve the UI and the background threads
+            return ScopedSession()
         return self._session
     
     @property
@@ -38,13 +59,29 @@ class BaseRepository(Generic[T], ABC):
         """Get the model class."""
         pass
     
+    @property
+    def allowed_columns(self) -> FrozenSet[str]:
+        """Get the writable column names."""
+        return self.model_class._column_keys()
+    
+    @staticmethod
+    def _insert_values(model_class: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop None values for columns with a default, as the ORM does for new objects."""
+        columns = model_class.__table__.c
+        return {
+            key: value
+            for key, value in data.items()
+            if value is not None or not (columns[key].primary_key or columns[key].default is not None)
+        }
+    
     def create(self, data: Dict[str, Any]) -> T:
         """Create a new record."""
         try:
-            instance = self.model_class(**data)
-            self.session.add(instance)
+            # INSERT ... RETURNING hands back the stored row in one statement
+            values = self._insert_values(self.model_class, data)
+            stmt = insert(self.model_class).values(**values).returning(self.model_class)
+            instance = self.session.scalars(stmt).one()
             self.session.commit()
-            self.session.refresh(instance)
             return instance
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -57,27 +94,48 @@ class BaseRepository(Generic[T], ABC):
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get {self.model_class.__name__} by ID: {str(e)}")
     
+    def exists(self, id: int) -> bool:
+        """Check whether a record exists without loading it."""
+        try:
+            # An object already in the identity map needs no SQL at all
+            key = self.session.identity_key(self.model_class, id)
+            if key in self.session.identity_map:
+                return True
+            
+            stmt = select(exists().where(self.model_class.id == id))
+            return bool(self.session.scalar(stmt))
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Failed to check {self.model_class.__name__} exists: {str(e)}")
+    
     def get_all(self) -> List[T]:
         """Get all records."""
+        return list(self.iter_all())
+    
+    def iter_all(self, chunk: int = 500) -> Iterator[T]:
+        """Iterate over all records, fetching them in chunks."""
         try:
-            stmt = select(self.model_class)
-            return list(self.session.execute(stmt).scalars().all())
+            stmt = select(self.model_class).execution_options(stream_results=True)
+            yield from self.session.scalars(stmt).yield_per(chunk)
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get all {self.model_class.__name__}s: {str(e)}")
     
     def update(self, id: int, data: Dict[str, Any]) -> Optional[T]:
         """Update a record."""
         try:
-            instance = self.get_by_id(id)
-            if instance is None:
-                return None
-            
-            for key, value in data.items():
-                if hasattr(instance, key):
-                    setattr(instance, key, value)
+            allowed = self.allowed_columns
+            values = {key: value for key, value in data.items() if key in allowed}
+            if not values:
+                return self.get_by_id(id)
             
+            # UPDATE ... RETURNING replaces the lookup, the attribute writes and the refresh
+            stmt = (
+                update(self.model_class)
+                .where(self.model_class.id == id)
+                .values(**values)
+                .returning(self.model_class)
+            )
+            instance = self.session.scalar(stmt)
             self.session.commit()
-            self.session.refresh(instance)
             return instance
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -97,8 +155,80 @@ class BaseRepository(Generic[T], ABC):
             self.session.rollback()
             raise DatabaseException(f"Failed to delete {self.model_class.__name__}: {str(e)}")
     
+    @contextmanager
+    def transaction(self) -> Iterator[Session]:
+        """
+        Commit everything done inside the block once, or roll it all back.
+        
+        The single-row helpers only flush, so callers wrap them in this block
+        to decide where the commit (and its fsync) happens.
+        """
+        try:
+            yield self.session
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise DatabaseException(f"Failed to commit transaction: {str(e)}")
+        except BaseException:
+            self.session.rollback()
+            raise
+    
+    def _sync_collection(
+        self, parent: BaseModel, collection: str, rows: List[Dict[str, Any]], natural_key: Sequence[str]
+    ) -> None:
+        """
+        Make a one-to-many collection match rows, writing only the differences.
+        
+        Rows are matched to existing children by "id" when present, otherwise by
+        natural_key. Matches are updated in place, unmatched rows are inserted and
+        children left without a row are deleted.
+        """
+        relationship = inspect(type(parent)).relationships[collection]
+        child_class = relationship.mapper.class_
+        parent_column, child_column = relationship.local_remote_pairs[0]
+        parent_key = child_column.key
+        parent_id = getattr(parent, parent_column.key)
+        # Timestamps are left to the column defaults; rows from the schemas carry them as None
+        writable = child_class._column_keys() - {"id", parent_key, "created_at", "updated_at"}
+        
+        # Query the children directly; the collection may be expired or raise-guarded
+        stmt = select(child_class).where(getattr(child_class, parent_key) == parent_id)
+        children = self.session.scalars(stmt).all()
+        by_id = {child.id: child for child in children}
+        by_key = {tuple(getattr(child, key) for key in natural_key): child for child in children}
+        
+        kept = set()
+        new_rows = []
+        for row in rows:
+            row_id = row.get("id")
+            if row_id is not None:
+                child = by_id.get(row_id)
+            else:
+                child = by_key.get(tuple(row.get(key) for key in natural_key))
+            
+            if child is None or child.id in kept:
+                values = {key: value for key, value in row.items() if key in writable}
+                new_rows.append({**values, parent_key: parent_id})
+                continue
+            
+            kept.add(child.id)
+            for key, value in row.items():
+                if key in writable and getattr(child, key) != value:
+                    setattr(child, key, value)
+        
+        removed_ids = by_id.keys() - kept
+        if removed_ids:
+            self.session.execute(delete(child_class).where(child_class.id.in_(removed_ids)))
+        if new_rows:
+            self.session.execute(insert(child_class), new_rows)
+        
+        # The bulk statements bypass the collection, so reload it on next access
+        self.session.expire(parent, [collection])
+    
     def close(self) -> None:
         """Close the session."""
-        if self._session is not None:
+        if self._owns_session:
+            ScopedSession.remove()
+        elif self._session is not None:
             self._session.close()
             self._session = None
\ No newline at end of file
@@ -3,13 +3,15 @@ MealPlan repository for the meal planner application.
 """
 
 from datetime import date
-from typing import List, Optional, Type
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Type
 
-from sqlalchemy import and_, select
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, delete, exists, func, lambda_stmt, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from meals.models import MealPlan, Recipe, meal_plan_recipes
+from meals.models import Ingredient, MealPlan, Recipe, meal_plan_recipes
 from meals.models.enums import MealType
 from meals.repositories.base import BaseRepository
 from meals.utils.exceptions import DatabaseException
@@ -23,60 +25,116 @@ class MealPlanRepository(BaseRepository[MealPlan]):
         """Get the model class."""
         return MealPlan
     
+    def create_if_slot_free(self, data: Dict[str, Any]) -> Optional[MealPlan]:
+        """Create a meal plan unless one already exists for its date and meal type."""
+        try:
+            # The UNIQUE(date, meal_type) constraint does the check; RETURNING is empty on a conflict
+            stmt = (
+                sqlite_insert(MealPlan)
+                .values(**self._insert_values(MealPlan, data))
+                .on_conflict_do_nothing(index_elements=["date", "meal_type"])
+                .returning(MealPlan)
+            )
+            return self.session.scalar(stmt)  # The caller commits via transaction()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise DatabaseException(f"Failed to create MealPlan: {str(e)}")
+    
+    def update_if_slot_free(self, meal_plan_id: int, data: Dict[str, Any]) -> Optional[MealPlan]:
+        """Update a meal plan unless another one already exists for the new date and meal type."""
+        try:
+            values = {key: value for key, value in data.items() if key in self.allowed_columns}
+            if not values:
+                return self.get_by_id(meal_plan_id)
+            
+            # OR IGNORE skips the row on a UNIQUE(date, meal_type) conflict, so RETURNING is empty
+            # both when the meal plan does not exist and when its new slot is taken
+            stmt = (
+                update(MealPlan)
+                .prefix_with("OR IGNORE")
+                .where(MealPlan.id == meal_plan_id)
+                .values(**values)
+                .returning(MealPlan)
+            )
+            return self.session.scalar(stmt)  # The caller commits via transaction()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise DatabaseException(f"Failed to update MealPlan: {str(e)}")
+    
     def get_by_date_range(self, start_date: date, end_date: date) -> List[MealPlan]:
         """Get meal plans by date range."""
         try:
-            stmt = (
-                select(MealPlan)
-                .where(and_(MealPlan.date >= start_date, MealPlan.date <= end_date))
+            stmt = lambda_stmt(lambda: select(MealPlan))
+            stmt += lambda s: (
+                s.where(MealPlan.date.between(start_date, end_date))
                 .order_by(MealPlan.date, MealPlan.meal_type)
+                .options(selectinload(MealPlan.recipes))
             )
-            return list(self.session.execute(stmt).scalars().all())
+            return self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get meal plans by date range: {str(e)}")
     
+    def has_meal_plans_in_date_range(self, start_date: date, end_date: date) -> bool:
+        """Check whether any meal plan falls in a date range."""
+        try:
+            stmt = lambda_stmt(lambda: select(exists().where(MealPlan.date.between(start_date, end_date))))
+            return bool(self.session.scalar(stmt))
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Failed to check meal plans by date range: {str(e)}")
+    
+    def aggregate_ingredients_for_date_range(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """Sum the ingredient quantities of all recipes planned in a date range, per name, unit and category."""
+        try:
+            # A recipe planned twice counts twice, as each link row joins its ingredients again
+            stmt = lambda_stmt(
+                lambda: select(
+                    Ingredient.name.label("ingredient_name"),
+                    Ingredient.unit,
+                    Ingredient.category,
+                    func.sum(Ingredient.quantity).label("total_quantity"),
+                )
+                .join(meal_plan_recipes, meal_plan_recipes.c.recipe_id == Ingredient.recipe_id)
+                .join(MealPlan, MealPlan.id == meal_plan_recipes.c.meal_plan_id)
+                .where(MealPlan.date.between(start_date, end_date))
+                .group_by(Ingredient.name, Ingredient.unit, Ingredient.category)
+                .order_by(Ingredient.name)
+            )
+            return [dict(row) for row in self.session.execute(stmt).mappings()]
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Failed to aggregate ingredients by date range: {str(e)}")
+    
     def get_by_date_and_meal_type(self, date_val: date, meal_type: MealType) -> Optional[MealPlan]:
         """Get meal plan by date and meal type."""
         try:
-            stmt = (
-                select(MealPlan)
-                .where(and_(MealPlan.date == date_val, MealPlan.meal_type == meal_type))
+            if isinstance(meal_type, MealType):
+                meal_type = meal_type.value
+            
+            stmt = lambda_stmt(lambda: select(MealPlan))
+            stmt += lambda s: (
+                s.where(and_(MealPlan.date == date_val, MealPlan.meal_type == meal_type))
                 .options(joinedload(MealPlan.recipes))
             )
-            return self.session.execute(stmt).scalar_one_or_none()
+            return self.session.scalars(stmt).unique().one_or_none()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get meal plan by date and meal type: {str(e)}")
     
     def add_recipe_to_meal_plan(self, meal_plan_id: int, recipe_id: int) -> bool:
         """Add a recipe to a meal plan."""
         try:
-            meal_plan = self.get_by_id(meal_plan_id)
-            if meal_plan is None:
-                return False
-            
-            # Check if the recipe exists
-            recipe = self.session.get(Recipe, recipe_id)
-            if recipe is None:
-                return False
-            
-            # Check if the recipe is already in the meal plan
+            # Insert the link directly; an existing link is left as is
             stmt = (
-                select(meal_plan_recipes)
-                .where(
-                    and_(
-                        meal_plan_recipes.c.meal_plan_id == meal_plan_id,
-                        meal_plan_recipes.c.recipe_id == recipe_id,
-                    )
-                )
+                sqlite_insert(meal_plan_recipes)
+                .values(meal_plan_id=meal_plan_id, recipe_id=recipe_id)
+                .on_conflict_do_nothing()
             )
-            existing = self.session.execute(stmt).first()
-            if existing is not None:
-                return True  # Already exists
-            
-            # Add the recipe to the meal plan
-            meal_plan.recipes.append(recipe)
+            self.session.execute(stmt)
             self.session.commit()
+            self._expire_links(meal_plan_id, [recipe_id])
             return True
+        except IntegrityError:
+            # The meal plan or the recipe does not exist
+            self.session.rollback()
+            return False
         except SQLAlchemyError as e:
             self.session.rollback()
             raise DatabaseException(f"Failed to add recipe to meal plan: {str(e)}")
@@ -84,41 +142,109 @@ class MealPlanRepository(BaseRepository[MealPlan]):
     def remove_recipe_from_meal_plan(self, meal_plan_id: int, recipe_id: int) -> bool:
         """Remove a recipe from a meal plan."""
         try:
-            meal_plan = self.get_by_id(meal_plan_id)
-            if meal_plan is None:
-                return False
-            
-            # Check if the recipe exists
-            recipe = self.session.get(Recipe, recipe_id)
-            if recipe is None:
-                return False
+            stmt = delete(meal_plan_recipes).where(
+                and_(
+                    meal_plan_recipes.c.meal_plan_id == meal_plan_id,
+                    meal_plan_recipes.c.recipe_id == recipe_id,
+                )
+            )
+            result = self.session.execute(stmt)
+            self.session.commit()
+            self._expire_links(meal_plan_id, [recipe_id])
+            return result.rowcount > 0
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise DatabaseException(f"Failed to remove recipe from meal plan: {str(e)}")
+    
+    def _expire_links(self, meal_plan_id: int, recipe_ids: Iterable[int]) -> None:
+        """Reload both sides of links written with Core statements, which bypass the ORM, on next access."""
+        identity_map = self.session.identity_map
+        meal_plan = identity_map.get(self.session.identity_key(MealPlan, meal_plan_id))
+        if meal_plan is not None:
+            self.session.expire(meal_plan, ["recipes"])
+        for recipe_id in recipe_ids:
+            recipe = identity_map.get(self.session.identity_key(Recipe, recipe_id))
+            if recipe is not None:
+                self.session.expire(recipe, ["meal_plans"])
+    
+    def set_recipes(self, meal_plan_id: int, to_add: Iterable[int], to_remove: Iterable[int]) -> bool:
+        """Add and remove several recipes of a meal plan with one statement each."""
+        try:
+            to_add, to_remove = list(to_add), list(to_remove)
+            if to_remove:
+                stmt = delete(meal_plan_recipes).where(
+                    and_(
+                        meal_plan_recipes.c.meal_plan_id == meal_plan_id,
+                        meal_plan_recipes.c.recipe_id.in_(to_remove),
+                    )
+                )
+                self.session.execute(stmt)
+            if to_add:
+                # INSERT ... SELECT skips recipes that do not exist; existing links are left as is
+                stmt = (
+                    sqlite_insert(meal_plan_recipes)
+                    .from_select(
+                        ["meal_plan_id", "recipe_id"],
+                        select(literal(meal_plan_id), Recipe.id).where(Recipe.id.in_(to_add)),
+                    )
+                    .on_conflict_do_nothing()
+                )
+                self.session.execute(stmt)  # The caller commits via transaction()
             
-            # Remove the recipe from the meal plan
-            if recipe in meal_plan.recipes:
-                meal_plan.recipes.remove(recipe)
-                self.session.commit()
-                return True
+            self._expire_links(meal_plan_id, to_add + to_remove)
+            return True
+        except IntegrityError:
+            # The meal plan does not exist
+            self.session.rollback()
             return False
         except SQLAlchemyError as e:
             self.session.rollback()
-            raise DatabaseException(f"Failed to remove recipe from meal plan: {str(e)}")
+            raise DatabaseException(f"Failed to set recipes of meal plan: {str(e)}")
     
-    def get_with_recipes(self, meal_plan_id: int) -> Optional[MealPlan]:
-        """Get a meal plan with its recipes."""
+    def get_recipe_ids(self, meal_plan_id: int) -> Set[int]:
+        """Get the IDs of a meal plan's recipes without loading the recipes."""
+        try:
+            stmt = select(meal_plan_recipes.c.recipe_id).where(meal_plan_recipes.c.meal_plan_id == meal_plan_id)
+            return set(self.session.scalars(stmt))
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Failed to get recipe IDs of meal plan: {str(e)}")
+    
+    def load_recipes(self, meal_plan: MealPlan) -> MealPlan:
+        """Load the recipes of a meal plan already in the session with one targeted SELECT."""
         try:
             stmt = (
-                select(MealPlan)
-                .where(MealPlan.id == meal_plan_id)
-                .options(joinedload(MealPlan.recipes))
+                select(Recipe)
+                .join(meal_plan_recipes, meal_plan_recipes.c.recipe_id == Recipe.id)
+                .where(meal_plan_recipes.c.meal_plan_id == meal_plan.id)
             )
-            return self.session.execute(stmt).scalar_one_or_none()
+            # Populate the collection as if it had been loaded, without re-selecting the meal plan
+            set_committed_value(meal_plan, "recipes", self.session.scalars(stmt).all())
+            return meal_plan
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Failed to load recipes of meal plan: {str(e)}")
+    
+    def get_with_recipes(self, meal_plan_id: int) -> Optional[MealPlan]:
+        """Get a meal plan with its recipes."""
+        try:
+            stmt = lambda_stmt(lambda: select(MealPlan))
+            stmt += lambda s: s.where(MealPlan.id == meal_plan_id).options(joinedload(MealPlan.recipes))
+            return self.session.scalars(stmt).unique().one_or_none()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get meal plan with recipes: {str(e)}")
     
     def get_all_with_recipes(self) -> List[MealPlan]:
         """Get all meal plans with their recipes."""
+        return list(self.iter_all_with_recipes())
+    
+    def iter_all_with_recipes(self, chunk: int = 200) -> Iterator[MealPlan]:
+        """Iterate over all meal plans with their recipes, fetching them in chunks."""
         try:
-            stmt = select(MealPlan).options(joinedload(MealPlan.recipes))
-            return list(self.session.execute(stmt).scalars().all())
+            # One extra SELECT ... IN per chunk for the recipes instead of a row per recipe
+            stmt = (
+                select(MealPlan)
+                .options(selectinload(MealPlan.recipes), raiseload("*"))
+                .execution_options(yield_per=chunk)
+            )
+            yield from self.session.scalars(stmt)
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get all meal plans with recipes: {str(e)}")
\ No newline at end of file
@@ -2,17 +2,34 @@
 Recipe repository for the meal planner application.
 """
 
-from typing import Dict, List, Optional, Type, Union
+from typing import Dict, Iterator, List, Optional, Type, Union
 
-from sqlalchemy import func, or_, select
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 from meals.models import Ingredient, Recipe
 from meals.models.enums import RecipeCategory
-from meals.repositories.base import BaseRepository
+from meals.repositories.base import BaseRepository, is_foreign_key_error
+from meals.utils.database import get_request_cache
 from meals.utils.exceptions import DatabaseException
 
+# Statements built once at import; only their parameters change per call
+_BY_CATEGORY_STMT = select(Recipe).where(Recipe.category == bindparam("category"))
+
+_SEARCH_STMT = (
+    select(Recipe)
+    .where(
+        or_(
+            Recipe.name.like(bindparam("q")),
+            Recipe.description.like(bindparam("q")),
+            # A semi-join on the ingredients instead of a row per ingredient to de-duplicate
+            Recipe.id.in_(select(Ingredient.recipe_id).where(Ingredient.name.like(bindparam("q")))),
+        )
+    )
+    .options(selectinload(Recipe.ingredients))
+)
+
 
 class RecipeRepository(BaseRepository[Recipe]):
     """Repository for Recipe model."""
@@ -25,18 +42,18 @@ class RecipeRepository(BaseRepository[Recipe]):
     def create_with_ingredients(self, recipe_data: Dict, ingredients_data: List[Dict]) -> Recipe:
         """Create a recipe with ingredients."""
         try:
-            # Create the recipe
-            recipe = Recipe(**recipe_data)
-            self.session.add(recipe)
-            self.session.flush()  # Flush to get the recipe ID
+            # Create the recipe; RETURNING hands back the ID and defaults
+            stmt = insert(Recipe).values(**self._insert_values(Recipe, recipe_data)).returning(Recipe)
+            recipe = self.session.scalars(stmt).one()
             
-            # Create the ingredients
-            for ingredient_data in ingredients_data:
-                ingredient = Ingredient(recipe_id=recipe.id, **ingredient_data)
-                self.session.add(ingredient)
+            # Create the ingredients with one multi-row INSERT
+            if ingredients_data:
+                self.session.execute(
+                    insert(Ingredient),
+                    [{**ingredient_data, "recipe_id": recipe.id} for ingredient_data in ingredients_data],
+                )
             
             self.session.commit()
-            self.session.refresh(recipe)
             return recipe
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -45,50 +62,51 @@ class RecipeRepository(BaseRepository[Recipe]):
     def get_by_category(self, category: RecipeCategory) -> List[Recipe]:
         """Get recipes by category."""
         try:
-            stmt = select(Recipe).where(Recipe.category == category)
-            return list(self.session.execute(stmt).scalars().all())
+            return self.session.scalars(_BY_CATEGORY_STMT, {"category": category}).all()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get recipes by category: {str(e)}")
     
     def search(self, query: str) -> List[Recipe]:
         """Search recipes by name or ingredients."""
         try:
-            # Convert query to lowercase for case-insensitive search
-            search_term = f"%{query.lower()}%"
-            
-            stmt = (
-                select(Recipe)
-                .distinct()
-                .join(Recipe.ingredients, isouter=True)
-                .where(
-                    or_(
-                        func.lower(Recipe.name).like(search_term),
-                        func.lower(Recipe.description).like(search_term),
-                        func.lower(Ingredient.name).like(search_term),
-                    )
-                )
-            )
-            return list(self.session.execute(stmt).scalars().all())
+            return self.session.scalars(_SEARCH_STMT, {"q": f"%{query}%"}).all()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to search recipes: {str(e)}")
     
     def get_with_ingredients(self, recipe_id: int) -> Optional[Recipe]:
         """Get a recipe with its ingredients."""
+        cache = get_request_cache(self.session)
+        cached = cache.get(Recipe, recipe_id, "ingredients")
+        if cached is not None:
+            return cached
+        
         try:
             stmt = (
                 select(Recipe)
                 .where(Recipe.id == recipe_id)
-                .options(joinedload(Recipe.ingredients))
+                .options(joinedload(Recipe.ingredients), raiseload("*"))
             )
-            return self.session.execute(stmt).scalar_one_or_none()
+            result = self.session.scalars(stmt).unique().one_or_none()
+            if result is not None:
+                cache.put(result)
+            return result
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get recipe with ingredients: {str(e)}")
     
     def get_all_with_ingredients(self) -> List[Recipe]:
         """Get all recipes with their ingredients."""
+        return list(self.iter_all_with_ingredients())
+    
+    def iter_all_with_ingredients(self, chunk: int = 200) -> Iterator[Recipe]:
+        """Iterate over all recipes with their ingredients, fetching them in chunks."""
         try:
-            stmt = select(Recipe).options(joinedload(Recipe.ingredients))
-            return list(self.session.execute(stmt).scalars().all())
+            # One extra SELECT ... IN per chunk for the ingredients instead of a row per ingredient
+            stmt = (
+                select(Recipe)
+                .options(selectinload(Recipe.ingredients), raiseload("*"))
+                .execution_options(yield_per=chunk)
+            )
+            yield from self.session.scalars(stmt)
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get all recipes with ingredients: {str(e)}")
     
@@ -97,28 +115,22 @@ class RecipeRepository(BaseRepository[Recipe]):
     ) -> Optional[Recipe]:
         """Update a recipe with ingredients."""
         try:
-            # Get the recipe
-            recipe = self.get_by_id(recipe_id)
+            # Update recipe fields; RETURNING hands back the stored row
+            values = {key: value for key, value in recipe_data.items() if key in self.allowed_columns}
+            if values:
+                stmt = update(Recipe).where(Recipe.id == recipe_id).values(**values).returning(Recipe)
+                recipe = self.session.scalar(stmt)
+            else:
+                recipe = self.get_by_id(recipe_id)
             if recipe is None:
                 return None
             
-            # Update recipe fields
-            for key, value in recipe_data.items():
-                if hasattr(recipe, key):
-                    setattr(recipe, key, value)
-            
             # Update ingredients if provided
             if ingredients_data is not None:
-                # Delete existing ingredients
-                self.session.query(Ingredient).filter(Ingredient.recipe_id == recipe_id).delete()
-                
-                # Create new ingredients
-                for ingredient_data in ingredients_data:
-                    ingredient = Ingredient(recipe_id=recipe_id, **ingredient_data)
-                    self.session.add(ingredient)
+                # Write only the ingredients that changed
+                self._sync_collection(recipe, "ingredients", ingredients_data, ("name", "unit"))
             
             self.session.commit()
-            self.session.refresh(recipe)
             return recipe
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -127,17 +139,17 @@ class RecipeRepository(BaseRepository[Recipe]):
     def add_ingredient(self, recipe_id: int, ingredient_data: Dict) -> Optional[Ingredient]:
         """Add an ingredient to a recipe."""
         try:
-            # Check if the recipe exists
-            recipe = self.get_by_id(recipe_id)
-            if recipe is None:
+            # Create the ingredient; RETURNING hands back the ID and defaults
+            values = self._insert_values(Ingredient, {**ingredient_data, "recipe_id": recipe_id})
+            stmt = insert(Ingredient).values(**values).returning(Ingredient)
+            return self.session.scalars(stmt).one()  # The caller commits via transaction()
+        except IntegrityError as e:
+            if is_foreign_key_error(e):
+                # The foreign key rejected a missing parent; SQLite only undid this statement,
+                # so the caller's transaction stays usable
                 return None
-            
-            # Create the ingredient
-            ingredient = Ingredient(recipe_id=recipe_id, **ingredient_data)
-            self.session.add(ingredient)
-            self.session.commit()
-            self.session.refresh(ingredient)
-            return ingredient
+            self.session.rollback()
+            raise DatabaseException(f"Failed to add ingredient to recipe: {str(e)}")
         except SQLAlchemyError as e:
             self.session.rollback()
             raise DatabaseException(f"Failed to add ingredient to recipe: {str(e)}")
@@ -152,7 +164,7 @@ class RecipeRepository(BaseRepository[Recipe]):
             
             # Delete the ingredient
             self.session.delete(ingredient)
-            self.session.commit()
+            self.session.flush()  # The caller commits via transaction()
             return True
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -161,19 +173,13 @@ class RecipeRepository(BaseRepository[Recipe]):
     def update_ingredient(self, ingredient_id: int, ingredient_data: Dict) -> Optional[Ingredient]:
         """Update an ingredient."""
         try:
-            # Check if the ingredient exists
-            ingredient = self.session.get(Ingredient, ingredient_id)
-            if ingredient is None:
-                return None
-            
-            # Update ingredient fields
-            for key, value in ingredient_data.items():
-                if hasattr(ingredient, key):
-                    setattr(ingredient, key, value)
+            values = {key: value for key, value in ingredient_data.items() if key in Ingredient._column_keys()}
+            if not values:
+                return self.session.get(Ingredient, ingredient_id)
             
-            self.session.commit()
-            self.session.refresh(ingredient)
-            return ingredient
+            # Update the ingredient; RETURNING hands back the stored row, or nothing if it does not exist
+            stmt = update(Ingredient).where(Ingredient.id == ingredient_id).values(**values).returning(Ingredient)
+            return self.session.scalar(stmt)  # The caller commits via transaction()
         except SQLAlchemyError as e:
             self.session.rollback()
             raise DatabaseException(f"Failed to update ingredient: {str(e)}")
\ No newline at end of file
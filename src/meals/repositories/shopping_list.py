@@ -3,17 +3,41 @@ ShoppingList repository for the meal planner application.
 """
 
 from datetime import date
-from typing import Dict, List, Optional, Type
+from typing import Dict, Iterator, List, Optional, Type
 
-from sqlalchemy import and_, select
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 from meals.models import ShoppingList, ShoppingListItem
 from meals.models.enums import IngredientCategory
-from meals.repositories.base import BaseRepository
+from meals.repositories.base import BaseRepository, is_foreign_key_error
+from meals.utils.database import get_request_cache
 from meals.utils.exceptions import DatabaseException
 
+# Statements built once at import; only their parameters change per call
+_ITEMS_BY_CATEGORY_STMT = (
+    select(ShoppingListItem)
+    .where(
+        and_(
+            ShoppingListItem.shopping_list_id == bindparam("shopping_list_id"),
+            ShoppingListItem.category == bindparam("category"),
+        )
+    )
+    .order_by(ShoppingListItem.ingredient_name)
+)
+
+_ITEMS_BY_PURCHASE_STATUS_STMT = (
+    select(ShoppingListItem)
+    .where(
+        and_(
+            ShoppingListItem.shopping_list_id == bindparam("shopping_list_id"),
+            ShoppingListItem.is_purchased == bindparam("is_purchased"),
+        )
+    )
+    .order_by(ShoppingListItem.ingredient_name)
+)
+
 
 class ShoppingListRepository(BaseRepository[ShoppingList]):
     """Repository for ShoppingList model."""
@@ -26,18 +50,19 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
     def create_with_items(self, shopping_list_data: Dict, items_data: List[Dict]) -> ShoppingList:
         """Create a shopping list with items."""
         try:
-            # Create the shopping list
-            shopping_list = ShoppingList(**shopping_list_data)
-            self.session.add(shopping_list)
-            self.session.flush()  # Flush to get the shopping list ID
+            # Create the shopping list; RETURNING hands back the ID and defaults
+            values = self._insert_values(ShoppingList, shopping_list_data)
+            stmt = insert(ShoppingList).values(**values).returning(ShoppingList)
+            shopping_list = self.session.scalars(stmt).one()
             
-            # Create the items
-            for item_data in items_data:
-                item = ShoppingListItem(shopping_list_id=shopping_list.id, **item_data)
-                self.session.add(item)
+            # Create the items with one multi-row INSERT
+            if items_data:
+                self.session.execute(
+                    insert(ShoppingListItem),
+                    [{**item_data, "shopping_list_id": shopping_list.id} for item_data in items_data],
+                )
             
             self.session.commit()
-            self.session.refresh(shopping_list)
             return shopping_list
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -56,27 +81,44 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
                 )
                 .order_by(ShoppingList.date_range_start)
             )
-            return list(self.session.execute(stmt).scalars().all())
+            return self.session.scalars(stmt).all()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get shopping lists by date range: {str(e)}")
     
     def get_with_items(self, shopping_list_id: int) -> Optional[ShoppingList]:
         """Get a shopping list with its items."""
+        cache = get_request_cache(self.session)
+        cached = cache.get(ShoppingList, shopping_list_id, "items")
+        if cached is not None:
+            return cached
+        
         try:
             stmt = (
                 select(ShoppingList)
                 .where(ShoppingList.id == shopping_list_id)
-                .options(joinedload(ShoppingList.items))
+                .options(joinedload(ShoppingList.items), raiseload("*"))
             )
-            return self.session.execute(stmt).scalar_one_or_none()
+            result = self.session.scalars(stmt).unique().one_or_none()
+            if result is not None:
+                cache.put(result)
+            return result
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get shopping list with items: {str(e)}")
     
     def get_all_with_items(self) -> List[ShoppingList]:
         """Get all shopping lists with their items."""
+        return list(self.iter_all_with_items())
+    
+    def iter_all_with_items(self, chunk: int = 200) -> Iterator[ShoppingList]:
+        """Iterate over all shopping lists with their items, fetching them in chunks."""
         try:
-            stmt = select(ShoppingList).options(joinedload(ShoppingList.items))
-            return list(self.session.execute(stmt).scalars().all())
+            # One extra SELECT ... IN per chunk for the items instead of a row per item
+            stmt = (
+                select(ShoppingList)
+                .options(selectinload(ShoppingList.items), raiseload("*"))
+                .execution_options(yield_per=chunk)
+            )
+            yield from self.session.scalars(stmt)
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get all shopping lists with items: {str(e)}")
     
@@ -85,30 +127,27 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
     ) -> Optional[ShoppingList]:
         """Update a shopping list with items."""
         try:
-            # Get the shopping list
-            shopping_list = self.get_by_id(shopping_list_id)
+            # Update shopping list fields; RETURNING hands back the stored row
+            values = {key: value for key, value in shopping_list_data.items() if key in self.allowed_columns}
+            if values:
+                stmt = (
+                    update(ShoppingList)
+                    .where(ShoppingList.id == shopping_list_id)
+                    .values(**values)
+                    .returning(ShoppingList)
+                )
+                shopping_list = self.session.scalar(stmt)
+            else:
+                shopping_list = self.get_by_id(shopping_list_id)
             if shopping_list is None:
                 return None
             
-            # Update shopping list fields
-            for key, value in shopping_list_data.items():
-                if hasattr(shopping_list, key):
-                    setattr(shopping_list, key, value)
-            
             # Update items if provided
             if items_data is not None:
-                # Delete existing items
-                self.session.query(ShoppingListItem).filter(
-                    ShoppingListItem.shopping_list_id == shopping_list_id
-                ).delete()
-                
-                # Create new items
-                for item_data in items_data:
-                    item = ShoppingListItem(shopping_list_id=shopping_list_id, **item_data)
-                    self.session.add(item)
+                # Write only the items that changed
+                self._sync_collection(shopping_list, "items", items_data, ("ingredient_name", "unit"))
             
             self.session.commit()
-            self.session.refresh(shopping_list)
             return shopping_list
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -117,17 +156,17 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
     def add_item(self, shopping_list_id: int, item_data: Dict) -> Optional[ShoppingListItem]:
         """Add an item to a shopping list."""
         try:
-            # Check if the shopping list exists
-            shopping_list = self.get_by_id(shopping_list_id)
-            if shopping_list is None:
+            # Create the item; RETURNING hands back the ID and defaults
+            values = self._insert_values(ShoppingListItem, {**item_data, "shopping_list_id": shopping_list_id})
+            stmt = insert(ShoppingListItem).values(**values).returning(ShoppingListItem)
+            return self.session.scalars(stmt).one()  # The caller commits via transaction()
+        except IntegrityError as e:
+            if is_foreign_key_error(e):
+                # The foreign key rejected a missing parent; SQLite only undid this statement,
+                # so the caller's transaction stays usable
                 return None
-            
-            # Create the item
-            item = ShoppingListItem(shopping_list_id=shopping_list_id, **item_data)
-            self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
-            return item
+            self.session.rollback()
+            raise DatabaseException(f"Failed to add item to shopping list: {str(e)}")
         except SQLAlchemyError as e:
             self.session.rollback()
             raise DatabaseException(f"Failed to add item to shopping list: {str(e)}")
@@ -142,7 +181,7 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
             
             # Delete the item
             self.session.delete(item)
-            self.session.commit()
+            self.session.flush()  # The caller commits via transaction()
             return True
         except SQLAlchemyError as e:
             self.session.rollback()
@@ -151,19 +190,18 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
     def update_item(self, item_id: int, item_data: Dict) -> Optional[ShoppingListItem]:
         """Update an item."""
         try:
-            # Check if the item exists
-            item = self.session.get(ShoppingListItem, item_id)
-            if item is None:
-                return None
+            values = {key: value for key, value in item_data.items() if key in ShoppingListItem._column_keys()}
+            if not values:
+                return self.session.get(ShoppingListItem, item_id)
             
-            # Update item fields
-            for key, value in item_data.items():
-                if hasattr(item, key):
-                    setattr(item, key, value)
-            
-            self.session.commit()
-            self.session.refresh(item)
-            return item
+            # Update the item; RETURNING hands back the stored row, or nothing if it does not exist
+            stmt = (
+                update(ShoppingListItem)
+                .where(ShoppingListItem.id == item_id)
+                .values(**values)
+                .returning(ShoppingListItem)
+            )
+            return self.session.scalar(stmt)  # The caller commits via transaction()
         except SQLAlchemyError as e:
             self.session.rollback()
             raise DatabaseException(f"Failed to update item: {str(e)}")
@@ -171,49 +209,48 @@ class ShoppingListRepository(BaseRepository[ShoppingList]):
     def mark_item_as_purchased(self, item_id: int, is_purchased: bool = True) -> bool:
         """Mark an item as purchased or not purchased."""
         try:
-            # Check if the item exists
-            item = self.session.get(ShoppingListItem, item_id)
-            if item is None:
-                return False
+            # A single UPDATE; the row count tells whether the item exists
+            stmt = (
+                update(ShoppingListItem)
+                .where(ShoppingListItem.id == item_id)
+                .values(is_purchased=is_purchased)
+            )
+            result = self.session.execute(stmt)  # The caller commits via transaction()
+            return result.rowcount > 0
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise DatabaseException(f"Failed to mark item as purchased: {str(e)}")
+    
+    def bulk_mark_items_as_purchased(self, item_ids: List[int], is_purchased: bool = True) -> int:
+        """Mark several items as purchased or not purchased in one statement."""
+        try:
+            if not item_ids:
+                return 0
             
-            # Update the item
-            item.is_purchased = is_purchased
+            stmt = (
+                update(ShoppingListItem)
+                .where(ShoppingListItem.id.in_(item_ids))
+                .values(is_purchased=is_purchased)
+            )
+            result = self.session.execute(stmt)
             self.session.commit()
-            return True
+            return result.rowcount
         except SQLAlchemyError as e:
             self.session.rollback()
-            raise DatabaseException(f"Failed to mark item as purchased: {str(e)}")
+            raise DatabaseException(f"Failed to mark items as purchased: {str(e)}")
     
     def get_items_by_category(self, shopping_list_id: int, category: IngredientCategory) -> List[ShoppingListItem]:
         """Get items by category."""
         try:
-            stmt = (
-                select(ShoppingListItem)
-                .where(
-                    and_(
-                        ShoppingListItem.shopping_list_id == shopping_list_id,
-                        ShoppingListItem.category == category,
-                    )
-                )
-                .order_by(ShoppingListItem.ingredient_name)
-            )
-            return list(self.session.execute(stmt).scalars().all())
+            params = {"shopping_list_id": shopping_list_id, "category": category}
+            return self.session.scalars(_ITEMS_BY_CATEGORY_STMT, params).all()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get items by category: {str(e)}")
     
     def get_items_by_purchase_status(self, shopping_list_id: int, is_purchased: bool) -> List[ShoppingListItem]:
         """Get items by purchase status."""
         try:
-            stmt = (
-                select(ShoppingListItem)
-                .where(
-                    and_(
-                        ShoppingListItem.shopping_list_id == shopping_list_id,
-                        ShoppingListItem.is_purchased == is_purchased,
-                    )
-                )
-                .order_by(ShoppingListItem.ingredient_name)
-            )
-            return list(self.session.execute(stmt).scalars().all())
+            params = {"shopping_list_id": shopping_list_id, "is_purchased": is_purchased}
+            return self.session.scalars(_ITEMS_BY_PURCHASE_STATUS_STMT, params).all()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Failed to get items by purchase status: {str(e)}")
\ No newline at end of file
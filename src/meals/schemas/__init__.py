@@ -2,7 +2,7 @@
 Schemas package for the meal planner application.
 """
 
-from meals.schemas.base import BaseSchema
+from meals.schemas.base import BaseSchema, _list_adapter
 from meals.schemas.meal_plan import MealPlanCreate, MealPlanRead, MealPlanUpdate
 from meals.schemas.recipe import IngredientCreate, IngredientRead, RecipeCreate, RecipeRead, RecipeUpdate
 from meals.schemas.shopping_list import (
@@ -14,6 +14,13 @@ from meals.schemas.shopping_list import (
     ShoppingListUpdate,
 )
 
+# Resolve the RecipeRead <-> MealPlanRead forward references and build the read validators
+# (and their list validators) once, now that all schemas exist; the create/update schemas
+# are built lazily on first use
+for _schema in (MealPlanRead, RecipeRead, IngredientRead, ShoppingListRead, ShoppingListItemRead):
+    _schema.model_rebuild(_types_namespace={"MealPlanRead": MealPlanRead, "RecipeRead": RecipeRead})
+    _list_adapter(_schema)
+
 __all__ = [
     "BaseSchema",
     "MealPlanCreate",
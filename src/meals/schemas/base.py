@@ -3,16 +3,115 @@ Base schema for Pydantic models.
 """
 
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Collection, Dict, Iterable, List, Optional, Tuple, Type, TypeVar, get_args
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter, model_validator
+from pydantic_core import PydanticCustomError
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState
+
+S = TypeVar("S", bound="BaseSchema")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type["BaseSchema"]) -> TypeAdapter:
+    """Build the list validator for a schema once."""
+    return TypeAdapter(List[schema])
+
+
+@lru_cache(maxsize=None)
+def _construct_plan(schema: Type["BaseSchema"]) -> Tuple[Tuple[str, Optional[Type["BaseSchema"]]], ...]:
+    """Pair each field of a schema with the schema of its items if it holds nested schemas."""
+    plan = []
+    for name, field in schema.model_fields.items():
+        nested = None
+        pending = [field.annotation]
+        while pending:
+            annotation = pending.pop()
+            if isinstance(annotation, type) and issubclass(annotation, BaseSchema):
+                nested = annotation
+                break
+            pending.extend(get_args(annotation))
+        plan.append((name, nested))
+    return tuple(plan)
+
+
+def require_value(value: Any) -> Any:
+    """Treat None and blank strings as missing, like BaseViewModel.validate_required_fields."""
+    if value is None or (isinstance(value, str) and (not value or value.isspace())):
+        raise PydanticCustomError("missing", "Field required")
+    return value
 
 
 class BaseSchema(BaseModel):
     """Base schema for all Pydantic models."""
     
-    model_config = ConfigDict(from_attributes=True)
+    # Validators are compiled on first use (or by the rebuild in the package init), not per class at import
+    model_config = ConfigDict(from_attributes=True, defer_build=True, revalidate_instances="never", extra="ignore")
     
     id: Optional[int] = None
     created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _skip_unloaded_relationships(cls, data: Any) -> Any:
+        """Read only the relationships a query already loaded from an ORM instance."""
+        state = inspect(data, raiseerr=False)
+        if not isinstance(state, InstanceState):
+            return data
+        
+        # Unloaded relationships keep their defaults instead of triggering a lazy load
+        skipped = state.unloaded.intersection(state.mapper.relationships.keys())
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in skipped and hasattr(data, name)
+        }
+    
+    def to_dict(self, exclude: Collection[str] = (), exclude_none: bool = False) -> Dict[str, Any]:
+        """
+        Get the field values as a flat dict for the repositories.
+        
+        Reads __dict__ directly instead of model_dump(), so nested schemas are not
+        converted; callers exclude fields holding them.
+        """
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in exclude and not (exclude_none and value is None)
+        }
+    
+    def changes(self, exclude: Collection[str] = ()) -> Dict[str, Any]:
+        """Get the non-None values of only the fields the caller passed, for partial updates."""
+        values = self.__dict__
+        return {
+            name: values[name]
+            for name in self.model_fields_set
+            if name not in exclude and values[name] is not None
+        }
+    
+    @classmethod
+    def construct_from(cls: Type[S], obj: Any) -> S:
+        """Build a schema from a trusted ORM instance without validating it."""
+        # Only loaded attributes are read; unloaded ones keep their defaults
+        state = obj.__dict__
+        values = {}
+        for name, nested in _construct_plan(cls):
+            if name in state:
+                value = state[name]
+                if nested is not None and value is not None:
+                    value = [nested.construct_from(item) for item in value]
+                values[name] = value
+        return cls.model_construct(**values)
+    
+    @classmethod
+    def construct_many(cls: Type[S], objs: Iterable[Any]) -> List[S]:
+        """Build schemas from trusted ORM instances (a list or a one-shot iterator) without validating them."""
+        return [cls.construct_from(obj) for obj in objs]
+    
+    @classmethod
+    def validate_many(cls: Type[S], objs: Iterable[Any]) -> List[S]:
+        """Validate a batch of objects (a list or a one-shot iterator) with one compiled list validator."""
+        return _list_adapter(cls).validate_python(objs, from_attributes=True)
\ No newline at end of file
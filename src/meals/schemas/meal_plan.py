@@ -5,7 +5,7 @@ Schemas for MealPlan model.
 from datetime import date
 from typing import List, Optional
 
-from pydantic import Field, field_validator
+from pydantic import Field
 
 from meals.models.enums import MealType
 from meals.schemas.base import BaseSchema
@@ -17,14 +17,6 @@ class MealPlanBase(BaseSchema):
     name: str
     date: date
     meal_type: MealType
-    
-    @field_validator("meal_type")
-    @classmethod
-    def validate_meal_type(cls, v):
-        """Validate meal_type is a valid MealType."""
-        if isinstance(v, str):
-            return MealType(v)
-        return v
 
 
 class MealPlanCreate(MealPlanBase):
@@ -48,9 +40,4 @@ class MealPlanUpdate(BaseSchema):
     name: Optional[str] = None
     date: Optional[date] = None
     meal_type: Optional[MealType] = None
-    recipe_ids: Optional[List[int]] = None
-
-
-# Avoid circular imports
-from meals.schemas.recipe import RecipeRead  # noqa
-MealPlanRead.model_rebuild()
\ No newline at end of file
+    recipe_ids: Optional[List[int]] = None
\ No newline at end of file
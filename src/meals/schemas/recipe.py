@@ -2,12 +2,12 @@
 Schemas for Recipe and Ingredient models.
 """
 
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from pydantic import Field, field_validator
 
 from meals.models.enums import IngredientCategory, RecipeCategory
-from meals.schemas.base import BaseSchema
+from meals.schemas.base import BaseSchema, require_value
 
 
 class IngredientBase(BaseSchema):
@@ -17,22 +17,18 @@ class IngredientBase(BaseSchema):
     quantity: float
     unit: str
     category: Optional[IngredientCategory] = None
-    
-    @field_validator("category")
-    @classmethod
-    def validate_category(cls, v):
-        """Validate category is a valid IngredientCategory."""
-        if v is None:
-            return None
-        if isinstance(v, str):
-            return IngredientCategory(v)
-        return v
 
 
 class IngredientCreate(IngredientBase):
     """Schema for creating an Ingredient."""
     
     recipe_id: Optional[int] = None
+    
+    @field_validator("name", "quantity", "unit", mode="before")
+    @classmethod
+    def _require_value(cls, value: Any) -> Any:
+        """Reject None and blank strings for the required fields."""
+        return require_value(value)
 
 
 class IngredientRead(IngredientBase):
@@ -50,16 +46,6 @@ class RecipeBase(BaseSchema):
     preparation_time: Optional[int] = None
     cooking_instructions: Optional[str] = None
     category: Optional[RecipeCategory] = None
-    
-    @field_validator("category")
-    @classmethod
-    def validate_category(cls, v):
-        """Validate category is a valid RecipeCategory."""
-        if v is None:
-            return None
-        if isinstance(v, str):
-            return RecipeCategory(v)
-        return v
 
 
 class RecipeCreate(RecipeBase):
@@ -86,9 +72,4 @@ class RecipeUpdate(BaseSchema):
     preparation_time: Optional[int] = None
     cooking_instructions: Optional[str] = None
     category: Optional[RecipeCategory] = None
-    ingredients: Optional[List[IngredientCreate]] = None
-
-
-# Avoid circular imports
-from meals.schemas.meal_plan import MealPlanRead  # noqa
-RecipeRead.model_rebuild()
\ No newline at end of file
+    ingredients: Optional[List[IngredientCreate]] = None
\ No newline at end of file
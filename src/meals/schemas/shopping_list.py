@@ -3,12 +3,12 @@ Schemas for ShoppingList and ShoppingListItem models.
 """
 
 from datetime import date
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import Field, field_validator
 
 from meals.models.enums import IngredientCategory
-from meals.schemas.base import BaseSchema
+from meals.schemas.base import BaseSchema, require_value
 
 
 class ShoppingListItemBase(BaseSchema):
@@ -19,22 +19,18 @@ class ShoppingListItemBase(BaseSchema):
     unit: str
     category: Optional[IngredientCategory] = None
     is_purchased: bool = False
-    
-    @field_validator("category")
-    @classmethod
-    def validate_category(cls, v):
-        """Validate category is a valid IngredientCategory."""
-        if v is None:
-            return None
-        if isinstance(v, str):
-            return IngredientCategory(v)
-        return v
 
 
 class ShoppingListItemCreate(ShoppingListItemBase):
     """Schema for creating a ShoppingListItem."""
     
     shopping_list_id: Optional[int] = None
+    
+    @field_validator("ingredient_name", "total_quantity", "unit", mode="before")
+    @classmethod
+    def _require_value(cls, value: Any) -> Any:
+        """Reject None and blank strings for the required fields."""
+        return require_value(value)
 
 
 class ShoppingListItemRead(ShoppingListItemBase):
@@ -73,6 +69,19 @@ class ShoppingListRead(ShoppingListBase):
     
     id: int
     items: Optional[List[ShoppingListItemRead]] = None
+    
+    @property
+    def items_by_key(self) -> Dict[Tuple[str, str, Optional[IngredientCategory]], ShoppingListItemRead]:
+        """Items keyed by (ingredient name, unit, category), the key generated lists aggregate by."""
+        return {(item.ingredient_name, item.unit, item.category): item for item in self.items or []}
+    
+    @property
+    def items_by_category(self) -> Dict[Optional[IngredientCategory], List[ShoppingListItemRead]]:
+        """Items grouped by category, in list order."""
+        groups: Dict[Optional[IngredientCategory], List[ShoppingListItemRead]] = {}
+        for item in self.items or []:
+            groups.setdefault(item.category, []).append(item)
+        return groups
 
 
 class ShoppingListUpdate(BaseSchema):
@@ -4,41 +4,54 @@ Database connection and session management.
 
 import os
 import sqlite3
+import sys
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Generator, Optional
+from typing import Any, Iterator, Optional, Tuple, Type
 
-from sqlalchemy import create_engine, event
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
-from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.orm import MANYTOONE, Session, scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from meals.models import Base
+from meals.models import Base, Ingredient
+from meals.models.types import EnumCode
 from meals.utils.exceptions import DatabaseException
 from meals.utils.logger import logger
 
 # Get the app data directory
+@lru_cache(maxsize=None)
 def get_app_data_dir() -> Path:
     """Get the application data directory."""
     home = Path.home()
-    if os.name == "nt":  # Windows
+    if sys.platform == "win32":  # Windows
         app_data = home / "AppData" / "Local" / "meals"
-    elif os.name == "posix":  # macOS/Linux
-        if os.uname().sysname == "Darwin":  # macOS
-            app_data = home / "Library" / "Application Support" / "meals"
-        else:  # Linux
-            app_data = home / ".local" / "share" / "meals"
+    elif sys.platform in ("darwin", "ios"):  # macOS/iOS
+        app_data = home / "Library" / "Application Support" / "meals"
+    elif os.name == "posix":  # Linux
+        app_data = home / ".local" / "share" / "meals"
     else:
         raise DatabaseException(f"Unsupported operating system: {os.name}")
     
     # Create the directory if it doesn't exist
-    app_data.mkdir(parents=True, exist_ok=True)
+    if not app_data.is_dir():
+        app_data.mkdir(parents=True, exist_ok=True)
     
     return app_data
 
 # Database file path
 DB_PATH = get_app_data_dir() / "meals.db"
 
+# Buffer size for copying a backup over the database file
+RESTORE_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Schema version stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
 # Enable foreign keys for SQLite
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
@@ -49,41 +62,190 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor.close()
 
 # Create SQLite engine with connection pooling and optimized settings
+# A small QueuePool rather than StaticPool: startup work runs on background threads,
+# and pooled connections stay open so the PRAGMAs below run once per connection
 engine = create_engine(
     f"sqlite:///{DB_PATH}",
     connect_args={
         "check_same_thread": False,
         "timeout": 30,  # Connection timeout in seconds
     },
-    pool_pre_ping=True,
+    poolclass=QueuePool,
+    pool_size=4,
+    max_overflow=8,
     pool_recycle=3600,
-    pool_size=10,
-    max_overflow=20,
+    insertmanyvalues_page_size=1000,  # Rows per multi-row INSERT batch
+    query_cache_size=2000,  # Compiled statements kept per engine
     echo=False,  # Set to True for SQL query logging
 )
 
+
+@event.listens_for(engine, "connect")
+def set_app_db_pragma(dbapi_connection, connection_record):
+    """Tune the application database once per pooled connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")  # 64 MiB page cache
+    cursor.close()
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit; repositories re-read explicitly when they need fresh state
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Create scoped session for thread safety
 ScopedSession = scoped_session(SessionLocal)
 
+# Objects kept by each session's request cache
+REQUEST_CACHE_SIZE = 64
+
+
+class RequestCache:
+    """The objects a session loaded most recently, keyed by (model, primary key)."""
+    
+    def __init__(self, maxsize: int = REQUEST_CACHE_SIZE):
+        """Initialize an empty cache holding at most maxsize objects."""
+        self.maxsize = maxsize
+        self.map: OrderedDict[Tuple[Type, Any], Any] = OrderedDict()
+    
+    def get(self, model: Type, pk: Any, *loaded: str) -> Optional[Any]:
+        """Get a cached object that is still attached and has the given attributes loaded."""
+        key = (model, pk)
+        instance = self.map.get(key)
+        if instance is None:
+            return None
+        
+        state = inspect(instance)
+        if state.detached or state.deleted or not state.unloaded.isdisjoint(loaded):
+            del self.map[key]
+            return None
+        self.map.move_to_end(key)
+        return instance
+    
+    def put(self, instance: Any) -> None:
+        """Cache a loaded object, evicting the least recently used one when full."""
+        key = (type(instance), inspect(instance).identity[0])
+        self.map[key] = instance
+        self.map.move_to_end(key)
+        if len(self.map) > self.maxsize:
+            self.map.popitem(last=False)
+    
+    def discard(self, model: Type, pk: Any) -> None:
+        """Drop a cached object."""
+        self.map.pop((model, pk), None)
+    
+    def clear(self) -> None:
+        """Drop all cached objects."""
+        self.map.clear()
+
+
+def get_request_cache(session: Session) -> RequestCache:
+    """Get the session's cache, which lasts until its transaction ends."""
+    cache = session.info.get("request_cache")
+    if cache is None:
+        cache = session.info["request_cache"] = RequestCache()
+    return cache
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session, flush_context):
+    """Drop cached objects (and their parents) written by a flush."""
+    cache = session.info.get("request_cache")
+    if not cache or not cache.map:
+        return
+    
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        mapper = inspect(instance).mapper
+        cache.discard(mapper.class_, getattr(instance, "id", None))
+        
+        # A changed child also changes its parent's collection
+        for relationship in mapper.relationships:
+            if relationship.direction is MANYTOONE:
+                for local_column, _ in relationship.local_remote_pairs:
+                    cache.discard(relationship.mapper.class_, getattr(instance, local_column.key, None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_statements(orm_execute_state):
+    """Drop every cached object when a bulk statement bypasses the unit of work."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        cache = orm_execute_state.session.info.get("request_cache")
+        if cache:
+            cache.clear()
+
 
-def create_tables() -> None:
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_transaction_end(session):
+    """Drop every cached object when the session commits or rolls back, ending the request."""
+    cache = session.info.get("request_cache")
+    if cache:
+        cache.clear()
+
+
+def create_tables(connection: Optional[Connection] = None) -> None:
     """Create all tables in the database."""
     try:
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=connection if connection is not None else engine)
         logger.info("Database tables created successfully")
     except SQLAlchemyError as e:
         logger.error(f"Failed to create database tables: {str(e)}")
         raise DatabaseException(f"Failed to create database tables: {str(e)}")
 
 
-def get_db_session() -> Generator[Session, None, None]:
-    """Get a database session."""
+def _enum_code_columns() -> Iterator[Tuple[str, str, EnumCode]]:
+    """Yield (table name, column name, column type) for every enum-coded column."""
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if isinstance(column.type, EnumCode):
+                yield table.name, column.name, column.type
+
+
+def migrate_db(connection: Optional[Connection] = None) -> None:
+    """Bring an existing database up to SCHEMA_VERSION."""
+    if connection is None:
+        with engine.begin() as connection:
+            migrate_db(connection)
+        return
+    
+    version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+    if version >= SCHEMA_VERSION:
+        return
+    
+    if version < 1:
+        # Version 1: enum columns store integer codes instead of member names
+        for table_name, column_name, column_type in _enum_code_columns():
+            stmt = text(f"UPDATE {table_name} SET {column_name} = :code WHERE {column_name} = :name")
+            for member in column_type.enum_class:
+                connection.execute(stmt, {"code": column_type.code_of(member), "name": member.value})
+        logger.info("Migrated enum columns to integer codes")
+    
+    if version < 2:
+        # Version 2: indexes added to existing tables (create_all skips tables that exist)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        logger.info("Created missing indexes")
+    
+    if version < 3:
+        # Version 3: the ingredient recipe_id index became a covering index for the aggregation
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_ingredients_recipe_id")
+        for index in Ingredient.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        logger.info("Replaced the ingredient recipe_id index")
+    
+    connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+@contextmanager
+def get_db_session() -> Iterator[Session]:
+    """Get a database session for the duration of a with block, committing it on success."""
     session = ScopedSession()
     try:
         yield session
+        session.commit()
     except Exception as e:
         logger.error(f"Error in database session: {str(e)}")
         session.rollback()
@@ -92,14 +254,35 @@ def get_db_session() -> Generator[Session, None, None]:
         ScopedSession.remove()  # Remove session from registry
 
 
-def init_db(max_retries: int = 3, retry_delay: int = 1) -> None:
+@contextmanager
+def immediate_transaction() -> Iterator[Connection]:
+    """
+    Open a connection holding a single BEGIN IMMEDIATE transaction.
+    
+    The write lock is taken up front, so other connections never observe a
+    half-built schema, and all DDL inside the block is committed with one sync.
+    """
+    with engine.connect() as connection:
+        # Let the explicit BEGIN/COMMIT below drive the transaction instead of pysqlite
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+
+
+def init_db(max_retries: int = 3, retry_delay: int = 1, connection: Optional[Connection] = None) -> None:
     """Initialize the database with retry logic."""
     retries = 0
     last_error = None
     
     while retries < max_retries:
         try:
-            create_tables()
+            create_tables(connection)
+            migrate_db(connection)
             return
         except OperationalError as e:
             last_error = e
@@ -112,6 +295,15 @@ def init_db(max_retries: int = 3, retry_delay: int = 1) -> None:
     raise DatabaseException(f"Failed to initialize database after {max_retries} attempts: {str(last_error)}")
 
 
+def optimize_database() -> None:
+    """Let SQLite refresh the query planner statistics it considers stale."""
+    try:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA optimize")
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to optimize database: {str(e)}")
+
+
 def backup_database() -> Optional[Path]:
     """Backup the database."""
     try:
@@ -126,8 +318,23 @@ def backup_database() -> Optional[Path]:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = backup_dir / f"meals_{timestamp}.db"
         
-        # Copy the database file
-        shutil.copy2(DB_PATH, backup_path)
+        # Copy a consistent snapshot (including pages still in the WAL) with the online backup API
+        try:
+            # Quote the path, since "?" or "#" in it would end the file name of a plain URI
+            source = sqlite3.connect(f"{DB_PATH.absolute().as_uri()}?mode=ro", uri=True)
+            try:
+                target = sqlite3.connect(backup_path)
+                try:
+                    source.backup(target, pages=1024)
+                finally:
+                    target.close()
+            finally:
+                source.close()
+        except sqlite3.DatabaseError as e:
+            # A damaged file cannot be read page by page; keep a raw copy for recovery instead
+            logger.warning(f"Online backup failed, copying the database file: {str(e)}")
+            backup_path.unlink(missing_ok=True)
+            shutil.copy2(DB_PATH, backup_path)
         
         logger.info(f"Database backup created at {backup_path}")
         return backup_path
@@ -148,8 +355,13 @@ def restore_database(backup_path: Path) -> bool:
         # Close all connections
         engine.dispose()
         
-        # Copy the backup file to the database file
-        shutil.copy2(backup_path, DB_PATH)
+        # Drop any leftover WAL so it is not replayed onto the restored file
+        for suffix in ("-wal", "-shm"):
+            Path(f"{DB_PATH}{suffix}").unlink(missing_ok=True)
+        
+        # Copy the backup file to the database file in large chunks
+        with open(backup_path, "rb") as source, open(DB_PATH, "wb") as target:
+            shutil.copyfileobj(source, target, length=RESTORE_CHUNK_SIZE)
         
         logger.info(f"Database restored from {backup_path}")
         return True
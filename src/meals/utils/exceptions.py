@@ -2,8 +2,6 @@
 Exception classes for the meal planner application.
 """
 
-from meals.utils.logger import logger
-
 
 class MealPlannerException(Exception):
     """Base exception class for the meal planner application."""
@@ -11,7 +9,6 @@ class MealPlannerException(Exception):
     def __init__(self, message: str, *args, **kwargs):
         """Initialize the exception."""
         super().__init__(message, *args, **kwargs)
-        logger.error(f"{self.__class__.__name__}: {message}")
 
 
 class DatabaseException(MealPlannerException):
@@ -2,27 +2,32 @@
 Logger for the meal planner application.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
 def get_log_dir() -> Path:
     """Get the log directory."""
     home = Path.home()
-    if os.name == "nt":  # Windows
+    if sys.platform == "win32":  # Windows
         log_dir = home / "AppData" / "Local" / "meals" / "logs"
-    elif os.name == "posix":  # macOS/Linux
-        if os.uname().sysname == "Darwin":  # macOS
-            log_dir = home / "Library" / "Logs" / "meals"
-        else:  # Linux
-            log_dir = home / ".local" / "share" / "meals" / "logs"
+    elif sys.platform in ("darwin", "ios"):  # macOS/iOS
+        log_dir = home / "Library" / "Logs" / "meals"
+    elif os.name == "posix":  # Linux
+        log_dir = home / ".local" / "share" / "meals" / "logs"
     else:
         log_dir = Path("logs")
     
     # Create the directory if it doesn't exist
-    log_dir.mkdir(parents=True, exist_ok=True)
+    if not log_dir.is_dir():
+        log_dir.mkdir(parents=True, exist_ok=True)
     
     return log_dir
 
@@ -46,12 +51,19 @@ def setup_logger(name: str = "meals") -> logging.Logger:
     file_handler.setFormatter(formatter)
     
     # Create a console handler
+    # Only warnings and errors go to the console; the log file keeps the full record
     console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.WARNING)
     console_handler.setFormatter(formatter)
     
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Log calls only enqueue the record; a listener thread does the file and console writes
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
     
     return logger
 
@@ -3,47 +3,86 @@ Performance optimization utilities for the meal planner application.
 """
 
 import functools
+import logging
+import threading
 import time
-from typing import Any, Callable, Dict, Optional, TypeVar
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
 
 from meals.utils.logger import logger
 
 T = TypeVar("T")
 
 
-# Cache for memoization
-_cache: Dict[str, Dict[str, Any]] = {}
+class _MemoCache:
+    """Results of one memoized function, shared by the threads calling it."""
+    
+    def __init__(self):
+        """Initialize an empty cache."""
+        self.entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped by clear(), so results computed before a clear are not stored after it
+        self.generation = 0
+    
+    def clear(self) -> None:
+        """Drop all results, including those of calls still running."""
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+
+# Per-function memoization caches, registered for clear_cache
+_cache: Dict[str, _MemoCache] = {}
 
 
-def memoize(ttl: int = 60) -> Callable:
+def memoize(ttl: int = 60, maxsize: int = 1024) -> Callable:
     """
     Memoize a function with a time-to-live (TTL) in seconds.
     
+    Results of None are not cached, so a call that failed and returned None runs again.
+    
     Args:
         ttl: Time-to-live in seconds.
+        maxsize: Maximum number of cached results; the least recently used are evicted first.
     
     Returns:
         Decorated function.
     """
     def decorator(func: Callable) -> Callable:
         cache_key = f"{func.__module__}.{func.__qualname__}"
-        if cache_key not in _cache:
-            _cache[cache_key] = {}
+        cache = _cache.setdefault(cache_key, _MemoCache())
+        entries = cache.entries
         
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            # Create a key from the arguments
-            key = str(args) + str(sorted(kwargs.items()))
+            # Create a hashable key from the arguments, as lru_cache does
+            try:
+                key = functools._make_key(args, kwargs, False)
+            except TypeError:
+                # Unhashable arguments are not cached
+                return func(*args, **kwargs)
             
             # Check if the result is in the cache and not expired
-            if key in _cache[cache_key]:
-                result, timestamp = _cache[cache_key][key]
-                if time.time() - timestamp < ttl:
-                    return result
+            now = time.monotonic()
+            with cache.lock:
+                entry = entries.get(key)
+                if entry is not None and now - entry[1] < ttl:
+                    entries.move_to_end(key)
+                    return entry[0]
+                generation = cache.generation
             
-            # Call the function and cache the result
+            # Call the function without holding the lock
             result = func(*args, **kwargs)
-            _cache[cache_key][key] = (result, time.time())
+            if result is None:
+                return result
+            
+            # Cache the result unless the cache was cleared meanwhile, evicting the least recently used one when full
+            with cache.lock:
+                if cache.generation == generation:
+                    entries[key] = (result, now)
+                    entries.move_to_end(key)
+                    if len(entries) > maxsize:
+                        entries.popitem(last=False)
             return result
         
         return wrapper
@@ -59,7 +98,9 @@ def clear_cache(func: Optional[Callable] = None) -> None:
         func: Function to clear the cache for. If None, clear all caches.
     """
     if func is None:
-        _cache.clear()
+        # The decorated functions keep their caches, so empty them rather than the registry
+        for cache in _cache.values():
+            cache.clear()
     else:
         cache_key = f"{func.__module__}.{func.__qualname__}"
         if cache_key in _cache:
@@ -78,9 +119,13 @@ def measure_execution_time(func: Callable) -> Callable:
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs) -> Any:
-        start_time = time.time()
+        # Skip the timing and message formatting entirely unless debug logging is on
+        if not logger.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.perf_counter()
         execution_time = end_time - start_time
         logger.debug(f"{func.__qualname__} executed in {execution_time:.4f} seconds")
         return result
@@ -88,23 +133,6 @@ def measure_execution_time(func: Callable) -> Callable:
     return wrapper
 
 
-def lazy_property(func: Callable) -> property:
-    """
-    Create a lazy property that is computed only once.
-    
-    Args:
-        func: Function to compute the property.
-    
-    Returns:
-        Property descriptor.
-    """
-    attr_name = f"_{func.__name__}"
-    
-    @property
-    @functools.wraps(func)
-    def wrapper(self) -> Any:
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, func(self))
-        return getattr(self, attr_name)
-    
-    return wrapper
\ No newline at end of file
+# Lazy property computed only once: the value is stored in the instance __dict__
+# under the property's own name, so later reads never reach the descriptor
+lazy_property = functools.cached_property
\ No newline at end of file
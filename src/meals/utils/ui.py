@@ -3,17 +3,43 @@ UI utilities for the meal planner application.
 """
 
 import asyncio
+import atexit
 import functools
 import threading
-from typing import Any, Callable, Optional, TypeVar
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Set, Tuple, TypeVar
 
 import toga
 from toga.style import Pack
 
+from meals.utils.database import ScopedSession
 from meals.utils.logger import logger
 
 T = TypeVar("T")
 
+# Shared workers for background tasks, capped at the database engine's pool size
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="meals-bg")
+atexit.register(_executor.shutdown)
+
+# Strong references to tasks started by run_async until they finish
+_running_tasks: Set[asyncio.Task] = set()
+
+
+def _log_background_error(future: Future) -> None:
+    """Log an exception raised by a background task, which the future would otherwise keep."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Background task failed: {future.exception()}")
+
+
+def _run_in_own_session(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a function on a worker thread and discard the thread's database session afterwards."""
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # A worker's session is never committed or expired, so reusing it would
+        # serve rows from its identity map that the UI thread has since changed
+        ScopedSession.remove()
+
 
 def run_in_background(func: Callable) -> Callable:
     """
@@ -26,10 +52,10 @@ def run_in_background(func: Callable) -> Callable:
         Decorated function.
     """
     @functools.wraps(func)
-    def wrapper(*args, **kwargs) -> None:
-        thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-        thread.daemon = True
-        thread.start()
+    def wrapper(*args, **kwargs) -> Future:
+        future = _executor.submit(_run_in_own_session, func, *args, **kwargs)
+        future.add_done_callback(_log_background_error)
+        return future
     
     return wrapper
 
@@ -45,12 +71,46 @@ def run_async(func: Callable) -> Callable:
         Decorated function.
     """
     @functools.wraps(func)
-    def wrapper(*args, **kwargs) -> asyncio.Future:
-        return asyncio.ensure_future(func(*args, **kwargs))
+    def wrapper(*args, **kwargs) -> asyncio.Task:
+        task = asyncio.create_task(func(*args, **kwargs))
+        
+        # The event loop only keeps weak references to tasks
+        _running_tasks.add(task)
+        task.add_done_callback(_running_tasks.discard)
+        return task
     
     return wrapper
 
 
+def load_in_background(load: Callable[[], T], apply: Callable[[T], None]) -> None:
+    """
+    Run a blocking load on the background workers and apply its result on the event loop.
+    
+    Without a running event loop (e.g. while testing) the load runs inline.
+    
+    Args:
+        load: Function fetching the data.
+        apply: Function showing the data; called on the event loop thread.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is None:
+        apply(load())
+        return
+    
+    def done(future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Background load failed: {future.exception()}")
+            return
+        apply(future.result())
+    
+    loop.run_in_executor(_executor, _run_in_own_session, load).add_done_callback(done)
+
+
 def debounce(wait_time: float) -> Callable:
     """
     Debounce a function call.
@@ -62,21 +122,132 @@ def debounce(wait_time: float) -> Callable:
         Decorated function.
     """
     def decorator(func: Callable) -> Callable:
+        handle: Optional[asyncio.TimerHandle] = None
         timer: Optional[threading.Timer] = None
         
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> None:
-            nonlocal timer
+            nonlocal handle, timer
+            if handle is not None:
+                handle.cancel()
             if timer is not None:
                 timer.cancel()
-            timer = threading.Timer(wait_time, func, args=args, kwargs=kwargs)
-            timer.start()
+            
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop on this thread; fall back to a timer thread
+                timer = threading.Timer(wait_time, func, args=args, kwargs=kwargs)
+                timer.start()
+                return
+            
+            # On the UI event loop, reschedule without starting a thread per call
+            handle = loop.call_later(wait_time, functools.partial(func, *args, **kwargs))
         
         return wrapper
     
     return decorator
 
 
+def show_info(window: toga.Window, title: str, message: str) -> None:
+    """
+    Show an info dialog without waiting for the user to dismiss it.
+    
+    Args:
+        window: Window the dialog is modal to.
+        title: Dialog title.
+        message: Dialog message.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is None:
+        # No event loop to await the dialog on (e.g. while testing)
+        window.info_dialog(title, message)
+        return
+    
+    task = loop.create_task(window.dialog(toga.InfoDialog(title, message)))
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+
+
+class CoalescedNotice:
+    """Info dialog shown once for a burst of notifications instead of once per notification."""
+    
+    def __init__(self, app: toga.App, title: str, message: str, wait_time: float = 0.3):
+        """
+        Initialize the notice.
+        
+        Args:
+            app: Application whose main window shows the dialog.
+            title: Dialog title.
+            message: Dialog message; {count} is replaced by the number of notifications.
+            wait_time: Quiet time in seconds after the last notification before showing the dialog.
+        """
+        self.app = app
+        self.title = title
+        self.message = message
+        self.wait_time = wait_time
+        self._count = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+    
+    def notify(self) -> None:
+        """Count a notification and show the dialog once notifications stop arriving."""
+        self._count += 1
+        if self._handle is not None:
+            self._handle.cancel()
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            # Nothing to coalesce on without an event loop
+            self._show()
+            return
+        
+        self._handle = loop.call_later(self.wait_time, self._show)
+    
+    def _show(self) -> None:
+        """Show the dialog for the notifications counted so far."""
+        count, self._count, self._handle = self._count, 0, None
+        show_info(self.app.main_window, self.title, self.message.format(count=count))
+
+
+def sync_table_rows(table: toga.Table, old_rows: List[Tuple], rows: List[Tuple]) -> List[Tuple]:
+    """
+    Update a table to show rows, touching only the rows that differ from old_rows.
+    
+    Replacing table.data makes the backend rebuild every row; changing rows in
+    place only updates the ones that changed.
+    
+    Args:
+        table: Table currently showing old_rows.
+        old_rows: Rows the table was last filled with.
+        rows: Rows to show.
+        
+    Returns:
+        rows, to pass as old_rows on the next update.
+    """
+    if not old_rows or not rows:
+        # Nothing to reuse: one assignment fills or clears the table with a single refresh
+        table.data = rows
+        return rows
+    
+    data = table.data
+    common = min(len(rows), len(old_rows))
+    for index in range(common):
+        if rows[index] != old_rows[index]:
+            data[index] = rows[index]
+    append = data.append
+    for row in rows[common:]:
+        append(row)
+    for index in range(len(old_rows) - 1, common - 1, -1):
+        del data[index]
+    return rows
+
+
 def create_loading_indicator() -> toga.Box:
     """
     Create a loading indicator.
@@ -3,12 +3,17 @@ Base ViewModel for the meal planner application.
 """
 
 from abc import ABC
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
 
 import toga
+from pydantic import ValidationError
 from toga.style import Pack
 
+from meals.schemas.base import BaseSchema
 from meals.utils.exceptions import MealPlannerException, ValidationException
+from meals.utils.logger import logger
+
+S = TypeVar("S", bound=BaseSchema)
 
 
 class BaseViewModel(ABC):
@@ -27,13 +32,23 @@ class BaseViewModel(ABC):
         """Register a success handler for an action."""
         self._success_handlers[action] = handler
     
+    def register_handlers(
+        self,
+        error_handlers: Optional[Dict[str, Callable[[Exception], None]]] = None,
+        success_handlers: Optional[Dict[str, Callable[[Any], None]]] = None,
+    ) -> None:
+        """Register error and success handlers for several actions at once."""
+        if error_handlers:
+            self._error_handlers.update(error_handlers)
+        if success_handlers:
+            self._success_handlers.update(success_handlers)
+    
     def _handle_error(self, action: str, error: Exception) -> None:
         """Handle an error."""
+        # Log once at the boundary rather than whenever an exception is constructed
+        logger.error(f"Error in {action}: {str(error)}")
         if action in self._error_handlers:
             self._error_handlers[action](error)
-        else:
-            # Default error handling
-            print(f"Error in {action}: {str(error)}")
     
     def _handle_success(self, action: str, result: Any = None) -> None:
         """Handle a success."""
@@ -52,12 +67,34 @@ class BaseViewModel(ABC):
         """Show a confirmation dialog."""
         return window.question_dialog(title, message)
     
-    def validate_required_fields(self, data: Dict[str, Any], required_fields: List[str]) -> None:
-        """Validate that required fields are present and not empty."""
-        missing_fields = []
-        for field in required_fields:
-            if field not in data or data[field] is None or (isinstance(data[field], str) and not data[field].strip()):
-                missing_fields.append(field)
+    def validate_required_fields(
+        self, data: Dict[str, Any], required_fields: List[str], label: Optional[str] = None
+    ) -> None:
+        """Validate that required fields are present and not empty, prefixing the error with label."""
+        # None and blank strings count as missing; isspace() checks a string without copying it
+        missing_fields = [
+            field
+            for field in required_fields
+            if (value := data.get(field)) is None or (isinstance(value, str) and (not value or value.isspace()))
+        ]
         
         if missing_fields:
-            raise ValidationException(f"Missing required fields: {', '.join(missing_fields)}")
\ No newline at end of file
+            message = f"Missing required fields: {', '.join(missing_fields)}"
+            raise ValidationException(f"{label}: {message}" if label else message)
+    
+    def validate_items(self, schema: Type[S], items_data: List[Dict[str, Any]], label: str) -> List[S]:
+        """Validate a list of item dicts with one Pydantic call, reporting the first invalid item."""
+        try:
+            return schema.validate_many(items_data)
+        except ValidationError as e:
+            errors = e.errors()
+            index = errors[0]["loc"][0]
+            item_errors = [error for error in errors if error["loc"][0] == index]
+            
+            # Report missing fields like validate_required_fields, anything else by field
+            missing_fields = [str(error["loc"][1]) for error in item_errors if error["type"] == "missing"]
+            if missing_fields:
+                message = f"Missing required fields: {', '.join(missing_fields)}"
+            else:
+                message = f"Invalid {item_errors[0]['loc'][1]}: {item_errors[0]['msg']}"
+            raise ValidationException(f"{label} {index + 1}: {message}")
\ No newline at end of file
@@ -20,8 +20,8 @@ class MealPlanViewModel(BaseViewModel):
     def __init__(self):
         """Initialize the ViewModel."""
         super().__init__()
-        self.meal_plan_repo = MealPlanRepository()
-        self.recipe_repo = RecipeRepository()
+        self.meal_plan_repo = MealPlanRepository.shared()
+        self.recipe_repo = RecipeRepository.shared()
     
     def create_meal_plan(self, data: Dict) -> Optional[MealPlanRead]:
         """Create a new meal plan."""
@@ -29,29 +29,27 @@ class MealPlanViewModel(BaseViewModel):
             # Validate required fields
             self.validate_required_fields(data, ["name", "date", "meal_type"])
             
-            # Check if meal plan already exists for this date and meal type
-            existing = self.meal_plan_repo.get_by_date_and_meal_type(
-                date_val=data["date"],
-                meal_type=data["meal_type"],
-            )
-            if existing:
-                raise ValidationException(
-                    f"A meal plan already exists for {data['date']} ({data['meal_type']})"
-                )
-            
             # Create meal plan schema
             recipe_ids = data.pop("recipe_ids", [])
             meal_plan_create = MealPlanCreate(**data)
             
-            # Create meal plan
-            meal_plan = self.meal_plan_repo.create(meal_plan_create.model_dump(exclude={"recipe_ids"}))
-            
-            # Add recipes if provided
-            for recipe_id in recipe_ids:
-                self.meal_plan_repo.add_recipe_to_meal_plan(meal_plan.id, recipe_id)
+            # Create the meal plan and its recipe links in one transaction
+            with self.meal_plan_repo.transaction():
+                # Create meal plan unless one already exists for this date and meal type
+                meal_plan = self.meal_plan_repo.create_if_slot_free(
+                    meal_plan_create.to_dict(exclude={"recipe_ids"})
+                )
+                if meal_plan is None:
+                    raise ValidationException(
+                        f"A meal plan already exists for {data['date']} ({data['meal_type']})"
+                    )
+                
+                # Add recipes if provided
+                if recipe_ids:
+                    self.meal_plan_repo.set_recipes(meal_plan.id, set(recipe_ids), ())
             
-            # Get the created meal plan with recipes
-            result = self.meal_plan_repo.get_with_recipes(meal_plan.id)
+            # Load the recipes of the created meal plan, which is still in the session
+            result = self.meal_plan_repo.load_recipes(meal_plan)
             
             # Convert to schema
             meal_plan_read = MealPlanRead.model_validate(result)
@@ -67,69 +65,42 @@ class MealPlanViewModel(BaseViewModel):
     def update_meal_plan(self, meal_plan_id: int, data: Dict) -> Optional[MealPlanRead]:
         """Update a meal plan."""
         try:
-            # Check if meal plan exists
-            meal_plan = self.meal_plan_repo.get_by_id(meal_plan_id)
-            if not meal_plan:
-                raise ValidationException(f"Meal plan with ID {meal_plan_id} not found")
-            
-            # Check if date and meal type are being updated and if they would conflict
-            if "date" in data and "meal_type" in data:
-                existing = self.meal_plan_repo.get_by_date_and_meal_type(
-                    date_val=data["date"],
-                    meal_type=data["meal_type"],
-                )
-                if existing and existing.id != meal_plan_id:
-                    raise ValidationException(
-                        f"A meal plan already exists for {data['date']} ({data['meal_type']})"
-                    )
-            elif "date" in data:
-                existing = self.meal_plan_repo.get_by_date_and_meal_type(
-                    date_val=data["date"],
-                    meal_type=meal_plan.meal_type,
-                )
-                if existing and existing.id != meal_plan_id:
-                    raise ValidationException(
-                        f"A meal plan already exists for {data['date']} ({meal_plan.meal_type})"
-                    )
-            elif "meal_type" in data:
-                existing = self.meal_plan_repo.get_by_date_and_meal_type(
-                    date_val=meal_plan.date,
-                    meal_type=data["meal_type"],
-                )
-                if existing and existing.id != meal_plan_id:
-                    raise ValidationException(
-                        f"A meal plan already exists for {meal_plan.date} ({data['meal_type']})"
-                    )
-            
             # Handle recipe IDs separately
             recipe_ids = data.pop("recipe_ids", None)
             
             # Create update schema
             meal_plan_update = MealPlanUpdate(**data)
             
-            # Update meal plan
-            updated_meal_plan = self.meal_plan_repo.update(
-                meal_plan_id, meal_plan_update.model_dump(exclude_none=True)
-            )
-            
-            # Update recipes if provided
-            if recipe_ids is not None:
-                # Get current recipes
-                meal_plan_with_recipes = self.meal_plan_repo.get_with_recipes(meal_plan_id)
-                current_recipe_ids = [recipe.id for recipe in meal_plan_with_recipes.recipes]
-                
-                # Remove recipes that are not in the new list
-                for recipe_id in current_recipe_ids:
-                    if recipe_id not in recipe_ids:
-                        self.meal_plan_repo.remove_recipe_from_meal_plan(meal_plan_id, recipe_id)
+            # Update the meal plan and its recipe links in one transaction
+            with self.meal_plan_repo.transaction():
+                # Update meal plan unless another one already exists for the new date and meal type
+                updated_meal_plan = self.meal_plan_repo.update_if_slot_free(
+                    meal_plan_id, meal_plan_update.changes()
+                )
+                if updated_meal_plan is None:
+                    # Tell a missing meal plan from a conflict only on this failure path
+                    meal_plan = self.meal_plan_repo.get_by_id(meal_plan_id)
+                    if not meal_plan:
+                        raise ValidationException(f"Meal plan with ID {meal_plan_id} not found")
+                    raise ValidationException(
+                        f"A meal plan already exists for {data.get('date', meal_plan.date)} "
+                        f"({data.get('meal_type', meal_plan.meal_type)})"
+                    )
                 
-                # Add recipes that are not already in the meal plan
-                for recipe_id in recipe_ids:
-                    if recipe_id not in current_recipe_ids:
-                        self.meal_plan_repo.add_recipe_to_meal_plan(meal_plan_id, recipe_id)
-            
-            # Get the updated meal plan with recipes
-            result = self.meal_plan_repo.get_with_recipes(meal_plan_id)
+                # Update recipes if provided
+                if recipe_ids is not None:
+                    # Get current recipe IDs
+                    current_recipe_ids = self.meal_plan_repo.get_recipe_ids(meal_plan_id)
+                    new_recipe_ids = set(recipe_ids)
+                    
+                    # Remove the recipes not in the new list and add the missing ones in one batch each
+                    to_add = new_recipe_ids - current_recipe_ids
+                    to_remove = current_recipe_ids - new_recipe_ids
+                    if to_add or to_remove:
+                        self.meal_plan_repo.set_recipes(meal_plan_id, to_add, to_remove)
+            
+            # Load the recipes of the updated meal plan, which is still in the session
+            result = self.meal_plan_repo.load_recipes(updated_meal_plan)
             
             # Convert to schema
             meal_plan_read = MealPlanRead.model_validate(result)
@@ -145,13 +116,10 @@ class MealPlanViewModel(BaseViewModel):
     def delete_meal_plan(self, meal_plan_id: int) -> bool:
         """Delete a meal plan."""
         try:
-            # Check if meal plan exists
-            meal_plan = self.meal_plan_repo.get_by_id(meal_plan_id)
-            if not meal_plan:
-                raise ValidationException(f"Meal plan with ID {meal_plan_id} not found")
-            
-            # Delete meal plan
+            # Delete meal plan; the repository reports a missing one
             result = self.meal_plan_repo.delete(meal_plan_id)
+            if not result:
+                raise ValidationException(f"Meal plan with ID {meal_plan_id} not found")
             
             # Handle success
             self._handle_success("delete_meal_plan", result)
@@ -181,10 +149,10 @@ class MealPlanViewModel(BaseViewModel):
         """Get all meal plans."""
         try:
             # Get all meal plans with recipes
-            meal_plans = self.meal_plan_repo.get_all_with_recipes()
+            meal_plans = self.meal_plan_repo.iter_all_with_recipes()
             
             # Convert to schemas
-            meal_plan_reads = [MealPlanRead.model_validate(mp) for mp in meal_plans]
+            meal_plan_reads = MealPlanRead.construct_many(meal_plans)
             
             return meal_plan_reads
         except DatabaseException as e:
@@ -198,7 +166,7 @@ class MealPlanViewModel(BaseViewModel):
             meal_plans = self.meal_plan_repo.get_by_date_range(start_date, end_date)
             
             # Convert to schemas
-            meal_plan_reads = [MealPlanRead.model_validate(mp) for mp in meal_plans]
+            meal_plan_reads = MealPlanRead.construct_many(meal_plans)
             
             return meal_plan_reads
         except DatabaseException as e:
@@ -225,13 +193,11 @@ class MealPlanViewModel(BaseViewModel):
         """Add a recipe to a meal plan."""
         try:
             # Check if meal plan exists
-            meal_plan = self.meal_plan_repo.get_by_id(meal_plan_id)
-            if not meal_plan:
+            if not self.meal_plan_repo.exists(meal_plan_id):
                 raise ValidationException(f"Meal plan with ID {meal_plan_id} not found")
             
             # Check if recipe exists
-            recipe = self.recipe_repo.get_by_id(recipe_id)
-            if not recipe:
+            if not self.recipe_repo.exists(recipe_id):
                 raise ValidationException(f"Recipe with ID {recipe_id} not found")
             
             # Add recipe to meal plan
@@ -249,8 +215,7 @@ class MealPlanViewModel(BaseViewModel):
         """Remove a recipe from a meal plan."""
         try:
             # Check if meal plan exists
-            meal_plan = self.meal_plan_repo.get_by_id(meal_plan_id)
-            if not meal_plan:
+            if not self.meal_plan_repo.exists(meal_plan_id):
                 raise ValidationException(f"Meal plan with ID {meal_plan_id} not found")
             
             # Remove recipe from meal plan
@@ -17,40 +17,37 @@ class RecipeViewModel(BaseViewModel):
     def __init__(self):
         """Initialize the ViewModel."""
         super().__init__()
-        self.recipe_repo = RecipeRepository()
+        self.recipe_repo = RecipeRepository.shared()
     
-    def create_recipe(self, recipe_data: Dict, ingredients_data: List[Dict]) -> Optional[RecipeRead]:
-        """Create a new recipe with ingredients."""
+    def create_recipe(
+        self, recipe_data: Dict, ingredients_data: List[Dict], trusted: bool = False
+    ) -> Optional[RecipeRead]:
+        """
+        Create a new recipe with ingredients.
+        
+        With trusted=True the data must already hold column values (enums, numbers) and is
+        passed to the repository without building the Pydantic create schemas.
+        """
         try:
             # Validate required fields for recipe
             self.validate_required_fields(recipe_data, ["name"])
             
-            # Validate required fields for each ingredient
-            for i, ingredient_data in enumerate(ingredients_data):
-                try:
-                    self.validate_required_fields(
-                        ingredient_data, ["name", "quantity", "unit"]
-                    )
-                except ValidationException as e:
-                    raise ValidationException(f"Ingredient {i+1}: {str(e)}")
-            
-            # Create recipe schema
-            recipe_create = RecipeCreate(**recipe_data)
-            
-            # Create ingredient schemas
-            ingredient_creates = [IngredientCreate(**data) for data in ingredients_data]
+            if trusted:
+                self._validate_trusted_ingredients(ingredients_data)
+            else:
+                # Validate and convert the data through the create schemas, all ingredients at once
+                recipe_data = RecipeCreate(**recipe_data).to_dict(exclude={"ingredients"})
+                ingredient_creates = self.validate_items(IngredientCreate, ingredients_data, "Ingredient")
+                ingredients_data = [ing.to_dict() for ing in ingredient_creates]
             
             # Create recipe with ingredients
-            recipe = self.recipe_repo.create_with_ingredients(
-                recipe_create.model_dump(exclude={"ingredients"}),
-                [ing.model_dump() for ing in ingredient_creates],
-            )
+            recipe = self.recipe_repo.create_with_ingredients(recipe_data, ingredients_data)
             
             # Get the created recipe with ingredients
             result = self.recipe_repo.get_with_ingredients(recipe.id)
             
-            # Convert to schema
-            recipe_read = RecipeRead.model_validate(result)
+            # Convert to schema; the row was just read back from the database
+            recipe_read = RecipeRead.construct_from(result)
             
             # Handle success
             self._handle_success("create_recipe", recipe_read)
@@ -60,47 +57,49 @@ class RecipeViewModel(BaseViewModel):
             self._handle_error("create_recipe", e)
             return None
     
+    def _validate_trusted_ingredients(self, ingredients_data: List[Dict]) -> None:
+        """Check the required fields of trusted ingredients, which skip the create schemas."""
+        for i, data in enumerate(ingredients_data):
+            self.validate_required_fields(data, ["name", "quantity", "unit"], f"Ingredient {i + 1}")
+    
     def update_recipe(
-        self, recipe_id: int, recipe_data: Dict, ingredients_data: Optional[List[Dict]] = None
+        self,
+        recipe_id: int,
+        recipe_data: Dict,
+        ingredients_data: Optional[List[Dict]] = None,
+        trusted: bool = False,
     ) -> Optional[RecipeRead]:
-        """Update a recipe with ingredients."""
+        """
+        Update a recipe with ingredients.
+        
+        With trusted=True the data is passed to the repository without building the
+        Pydantic update schemas, as in create_recipe.
+        """
         try:
-            # Check if recipe exists
-            recipe = self.recipe_repo.get_by_id(recipe_id)
-            if not recipe:
-                raise ValidationException(f"Recipe with ID {recipe_id} not found")
-            
-            # Validate ingredients if provided
-            if ingredients_data is not None:
-                for i, ingredient_data in enumerate(ingredients_data):
-                    try:
-                        self.validate_required_fields(
-                            ingredient_data, ["name", "quantity", "unit"]
-                        )
-                    except ValidationException as e:
-                        raise ValidationException(f"Ingredient {i+1}: {str(e)}")
-            
-            # Create update schema
-            recipe_update = RecipeUpdate(**recipe_data)
+            if trusted:
+                recipe_data = {key: value for key, value in recipe_data.items() if value is not None}
+                if ingredients_data is not None:
+                    self._validate_trusted_ingredients(ingredients_data)
+            else:
+                # Validate and convert the data through the update schemas
+                recipe_data = RecipeUpdate(**recipe_data).changes(exclude={"ingredients"})
+                if ingredients_data is not None:
+                    ingredient_creates = self.validate_items(IngredientCreate, ingredients_data, "Ingredient")
+                    ingredients_data = [ing.to_dict() for ing in ingredient_creates]
             
             # Update recipe with ingredients
             if ingredients_data is not None:
-                ingredient_creates = [IngredientCreate(**data) for data in ingredients_data]
-                updated_recipe = self.recipe_repo.update_with_ingredients(
-                    recipe_id,
-                    recipe_update.model_dump(exclude_none=True, exclude={"ingredients"}),
-                    [ing.model_dump() for ing in ingredient_creates],
-                )
+                updated_recipe = self.recipe_repo.update_with_ingredients(recipe_id, recipe_data, ingredients_data)
             else:
-                updated_recipe = self.recipe_repo.update(
-                    recipe_id, recipe_update.model_dump(exclude_none=True, exclude={"ingredients"})
-                )
+                updated_recipe = self.recipe_repo.update(recipe_id, recipe_data)
+            if not updated_recipe:
+                raise ValidationException(f"Recipe with ID {recipe_id} not found")
             
             # Get the updated recipe with ingredients
             result = self.recipe_repo.get_with_ingredients(recipe_id)
             
-            # Convert to schema
-            recipe_read = RecipeRead.model_validate(result)
+            # Convert to schema; the row was just read back from the database
+            recipe_read = RecipeRead.construct_from(result)
             
             # Handle success
             self._handle_success("update_recipe", recipe_read)
@@ -113,13 +112,10 @@ class RecipeViewModel(BaseViewModel):
     def delete_recipe(self, recipe_id: int) -> bool:
         """Delete a recipe."""
         try:
-            # Check if recipe exists
-            recipe = self.recipe_repo.get_by_id(recipe_id)
-            if not recipe:
-                raise ValidationException(f"Recipe with ID {recipe_id} not found")
-            
-            # Delete recipe
+            # Delete recipe; the repository reports a missing one
             result = self.recipe_repo.delete(recipe_id)
+            if not result:
+                raise ValidationException(f"Recipe with ID {recipe_id} not found")
             
             # Handle success
             self._handle_success("delete_recipe", result)
@@ -149,10 +145,10 @@ class RecipeViewModel(BaseViewModel):
         """Get all recipes."""
         try:
             # Get all recipes with ingredients
-            recipes = self.recipe_repo.get_all_with_ingredients()
+            recipes = self.recipe_repo.iter_all_with_ingredients()
             
             # Convert to schemas
-            recipe_reads = [RecipeRead.model_validate(r) for r in recipes]
+            recipe_reads = RecipeRead.construct_many(recipes)
             
             return recipe_reads
         except DatabaseException as e:
@@ -166,35 +162,30 @@ class RecipeViewModel(BaseViewModel):
             recipes = self.recipe_repo.get_by_category(category)
             
             # Convert to schemas
-            recipe_reads = [RecipeRead.model_validate(r) for r in recipes]
+            recipe_reads = RecipeRead.construct_many(recipes)
             
             return recipe_reads
         except DatabaseException as e:
             self._handle_error("get_recipes_by_category", e)
             return []
     
-    def search_recipes(self, query: str) -> List[RecipeRead]:
-        """Search recipes by name or ingredients."""
+    def search_recipes(self, query: str) -> Optional[List[RecipeRead]]:
+        """Search recipes by name or ingredients; None if the search failed."""
         try:
             # Search recipes
             recipes = self.recipe_repo.search(query)
             
             # Convert to schemas
-            recipe_reads = [RecipeRead.model_validate(r) for r in recipes]
+            recipe_reads = RecipeRead.construct_many(recipes)
             
             return recipe_reads
         except DatabaseException as e:
             self._handle_error("search_recipes", e)
-            return []
+            return None
     
     def add_ingredient(self, recipe_id: int, ingredient_data: Dict) -> Optional[IngredientRead]:
         """Add an ingredient to a recipe."""
         try:
-            # Check if recipe exists
-            recipe = self.recipe_repo.get_by_id(recipe_id)
-            if not recipe:
-                raise ValidationException(f"Recipe with ID {recipe_id} not found")
-            
             # Validate required fields
             self.validate_required_fields(ingredient_data, ["name", "quantity", "unit"])
             
@@ -202,7 +193,10 @@ class RecipeViewModel(BaseViewModel):
             ingredient_create = IngredientCreate(**ingredient_data)
             
             # Add ingredient to recipe
-            ingredient = self.recipe_repo.add_ingredient(recipe_id, ingredient_create.model_dump())
+            with self.recipe_repo.transaction():
+                ingredient = self.recipe_repo.add_ingredient(recipe_id, ingredient_create.to_dict())
+            if not ingredient:
+                raise ValidationException(f"Recipe with ID {recipe_id} not found")
             
             # Convert to schema
             ingredient_read = IngredientRead.model_validate(ingredient)
@@ -219,7 +213,8 @@ class RecipeViewModel(BaseViewModel):
         """Update an ingredient."""
         try:
             # Update ingredient
-            ingredient = self.recipe_repo.update_ingredient(ingredient_id, ingredient_data)
+            with self.recipe_repo.transaction():
+                ingredient = self.recipe_repo.update_ingredient(ingredient_id, ingredient_data)
             if not ingredient:
                 raise ValidationException(f"Ingredient with ID {ingredient_id} not found")
             
@@ -238,7 +233,8 @@ class RecipeViewModel(BaseViewModel):
         """Remove an ingredient from a recipe."""
         try:
             # Remove ingredient
-            result = self.recipe_repo.remove_ingredient(ingredient_id)
+            with self.recipe_repo.transaction():
+                result = self.recipe_repo.remove_ingredient(ingredient_id)
             if not result:
                 raise ValidationException(f"Ingredient with ID {ingredient_id} not found")
             
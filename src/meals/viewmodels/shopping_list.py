@@ -3,9 +3,9 @@ ShoppingList ViewModel for the meal planner application.
 """
 
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 
-from meals.models import Ingredient, MealPlan, Recipe
+from meals.models import Ingredient, MealPlan
 from meals.models.enums import IngredientCategory
 from meals.repositories.meal_plan import MealPlanRepository
 from meals.repositories.shopping_list import ShoppingListRepository
@@ -26,8 +26,8 @@ class ShoppingListViewModel(BaseViewModel):
     def __init__(self):
         """Initialize the ViewModel."""
         super().__init__()
-        self.shopping_list_repo = ShoppingListRepository()
-        self.meal_plan_repo = MealPlanRepository()
+        self.shopping_list_repo = ShoppingListRepository.shared()
+        self.meal_plan_repo = MealPlanRepository.shared()
     
     def create_shopping_list(self, data: Dict, items_data: Optional[List[Dict]] = None) -> Optional[ShoppingListRead]:
         """Create a new shopping list."""
@@ -44,27 +44,18 @@ class ShoppingListViewModel(BaseViewModel):
             
             # Create shopping list
             if items_data:
-                # Validate required fields for each item
-                for i, item_data in enumerate(items_data):
-                    try:
-                        self.validate_required_fields(
-                            item_data, ["ingredient_name", "total_quantity", "unit"]
-                        )
-                    except ValidationException as e:
-                        raise ValidationException(f"Item {i+1}: {str(e)}")
-                
-                # Create item schemas
-                item_creates = [ShoppingListItemCreate(**item) for item in items_data]
+                # Validate all items at once
+                item_creates = self.validate_items(ShoppingListItemCreate, items_data, "Item")
                 
                 # Create shopping list with items
                 shopping_list = self.shopping_list_repo.create_with_items(
-                    shopping_list_create.model_dump(exclude={"items"}),
-                    [item.model_dump() for item in item_creates],
+                    shopping_list_create.to_dict(exclude={"items"}),
+                    [item.to_dict() for item in item_creates],
                 )
             else:
                 # Create empty shopping list
                 shopping_list = self.shopping_list_repo.create(
-                    shopping_list_create.model_dump(exclude={"items"})
+                    shopping_list_create.to_dict(exclude={"items"})
                 )
             
             # Get the created shopping list with items
@@ -86,20 +77,18 @@ class ShoppingListViewModel(BaseViewModel):
     ) -> Optional[ShoppingListRead]:
         """Update a shopping list."""
         try:
-            # Check if shopping list exists
-            shopping_list = self.shopping_list_repo.get_by_id(shopping_list_id)
-            if not shopping_list:
-                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
-            
             # Validate date range if both dates are provided
             if "date_range_start" in data and "date_range_end" in data:
                 if data["date_range_start"] > data["date_range_end"]:
                     raise ValidationException("Start date must be before or equal to end date")
-            elif "date_range_start" in data:
-                if data["date_range_start"] > shopping_list.date_range_end:
-                    raise ValidationException("Start date must be before or equal to end date")
-            elif "date_range_end" in data:
-                if shopping_list.date_range_start > data["date_range_end"]:
+            elif "date_range_start" in data or "date_range_end" in data:
+                # Only a one-sided change needs the stored range
+                shopping_list = self.shopping_list_repo.get_by_id(shopping_list_id)
+                if not shopping_list:
+                    raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
+                start = data.get("date_range_start", shopping_list.date_range_start)
+                end = data.get("date_range_end", shopping_list.date_range_end)
+                if start > end:
                     raise ValidationException("Start date must be before or equal to end date")
             
             # Create update schema
@@ -107,29 +96,22 @@ class ShoppingListViewModel(BaseViewModel):
             
             # Update shopping list
             if items_data is not None:
-                # Validate required fields for each item
-                for i, item_data in enumerate(items_data):
-                    try:
-                        self.validate_required_fields(
-                            item_data, ["ingredient_name", "total_quantity", "unit"]
-                        )
-                    except ValidationException as e:
-                        raise ValidationException(f"Item {i+1}: {str(e)}")
-                
-                # Create item schemas
-                item_creates = [ShoppingListItemCreate(**item) for item in items_data]
+                # Validate all items at once
+                item_creates = self.validate_items(ShoppingListItemCreate, items_data, "Item")
                 
                 # Update shopping list with items
                 updated_shopping_list = self.shopping_list_repo.update_with_items(
                     shopping_list_id,
-                    shopping_list_update.model_dump(exclude_none=True, exclude={"items"}),
-                    [item.model_dump() for item in item_creates],
+                    shopping_list_update.changes(exclude={"items"}),
+                    [item.to_dict() for item in item_creates],
                 )
             else:
                 # Update shopping list without changing items
                 updated_shopping_list = self.shopping_list_repo.update(
-                    shopping_list_id, shopping_list_update.model_dump(exclude_none=True, exclude={"items"})
+                    shopping_list_id, shopping_list_update.changes(exclude={"items"})
                 )
+            if not updated_shopping_list:
+                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
             
             # Get the updated shopping list with items
             result = self.shopping_list_repo.get_with_items(shopping_list_id)
@@ -148,13 +130,10 @@ class ShoppingListViewModel(BaseViewModel):
     def delete_shopping_list(self, shopping_list_id: int) -> bool:
         """Delete a shopping list."""
         try:
-            # Check if shopping list exists
-            shopping_list = self.shopping_list_repo.get_by_id(shopping_list_id)
-            if not shopping_list:
-                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
-            
-            # Delete shopping list
+            # Delete shopping list; the repository reports a missing one
             result = self.shopping_list_repo.delete(shopping_list_id)
+            if not result:
+                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
             
             # Handle success
             self._handle_success("delete_shopping_list", result)
@@ -184,10 +163,10 @@ class ShoppingListViewModel(BaseViewModel):
         """Get all shopping lists."""
         try:
             # Get all shopping lists with items
-            shopping_lists = self.shopping_list_repo.get_all_with_items()
+            shopping_lists = self.shopping_list_repo.iter_all_with_items()
             
             # Convert to schemas
-            shopping_list_reads = [ShoppingListRead.model_validate(sl) for sl in shopping_lists]
+            shopping_list_reads = ShoppingListRead.construct_many(shopping_lists)
             
             return shopping_list_reads
         except DatabaseException as e:
@@ -201,7 +180,7 @@ class ShoppingListViewModel(BaseViewModel):
             shopping_lists = self.shopping_list_repo.get_by_date_range(start_date, end_date)
             
             # Convert to schemas
-            shopping_list_reads = [ShoppingListRead.model_validate(sl) for sl in shopping_lists]
+            shopping_list_reads = ShoppingListRead.construct_many(shopping_lists)
             
             return shopping_list_reads
         except DatabaseException as e:
@@ -212,7 +191,8 @@ class ShoppingListViewModel(BaseViewModel):
         """Mark an item as purchased or not purchased."""
         try:
             # Mark item as purchased
-            result = self.shopping_list_repo.mark_item_as_purchased(item_id, is_purchased)
+            with self.shopping_list_repo.transaction():
+                result = self.shopping_list_repo.mark_item_as_purchased(item_id, is_purchased)
             if not result:
                 raise ValidationException(f"Item with ID {item_id} not found")
             
@@ -224,21 +204,34 @@ class ShoppingListViewModel(BaseViewModel):
             self._handle_error("mark_item_as_purchased", e)
             return False
     
+    def bulk_mark_items_as_purchased(self, item_ids: List[int], is_purchased: bool = True) -> int:
+        """Mark several items as purchased or not purchased at once."""
+        try:
+            # Mark all items with a single UPDATE and commit
+            count = self.shopping_list_repo.bulk_mark_items_as_purchased(item_ids, is_purchased)
+            
+            # Handle success
+            self._handle_success("bulk_mark_items_as_purchased", count)
+            
+            return count
+        except DatabaseException as e:
+            self._handle_error("bulk_mark_items_as_purchased", e)
+            return 0
+    
     def get_items_by_category(
         self, shopping_list_id: int, category: IngredientCategory
     ) -> List[ShoppingListItemRead]:
         """Get items by category."""
         try:
-            # Check if shopping list exists
-            shopping_list = self.shopping_list_repo.get_by_id(shopping_list_id)
-            if not shopping_list:
-                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
-            
             # Get items by category
             items = self.shopping_list_repo.get_items_by_category(shopping_list_id, category)
             
+            # Only an empty result needs the check for a missing shopping list
+            if not items and not self.shopping_list_repo.exists(shopping_list_id):
+                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
+            
             # Convert to schemas
-            item_reads = [ShoppingListItemRead.model_validate(item) for item in items]
+            item_reads = ShoppingListItemRead.construct_many(items)
             
             return item_reads
         except (ValidationException, DatabaseException) as e:
@@ -250,16 +243,15 @@ class ShoppingListViewModel(BaseViewModel):
     ) -> List[ShoppingListItemRead]:
         """Get items by purchase status."""
         try:
-            # Check if shopping list exists
-            shopping_list = self.shopping_list_repo.get_by_id(shopping_list_id)
-            if not shopping_list:
-                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
-            
             # Get items by purchase status
             items = self.shopping_list_repo.get_items_by_purchase_status(shopping_list_id, is_purchased)
             
+            # Only an empty result needs the check for a missing shopping list
+            if not items and not self.shopping_list_repo.exists(shopping_list_id):
+                raise ValidationException(f"Shopping list with ID {shopping_list_id} not found")
+            
             # Convert to schemas
-            item_reads = [ShoppingListItemRead.model_validate(item) for item in items]
+            item_reads = ShoppingListItemRead.construct_many(items)
             
             return item_reads
         except (ValidationException, DatabaseException) as e:
@@ -275,44 +267,15 @@ class ShoppingListViewModel(BaseViewModel):
             if start_date > end_date:
                 raise ValidationException("Start date must be before or equal to end date")
             
-            # Get meal plans in the date range
-            meal_plans = self.meal_plan_repo.get_by_date_range(start_date, end_date)
-            if not meal_plans:
+            # Check that there are meal plans in the date range
+            if not self.meal_plan_repo.has_meal_plans_in_date_range(start_date, end_date):
                 raise ValidationException(f"No meal plans found between {start_date} and {end_date}")
             
-            # Collect all ingredients from all recipes in all meal plans
-            ingredients_map: Dict[Tuple[str, str, Optional[str]], float] = {}
-            
-            for meal_plan in meal_plans:
-                # Load recipes for this meal plan
-                meal_plan_with_recipes = self.meal_plan_repo.get_with_recipes(meal_plan.id)
-                
-                for recipe in meal_plan_with_recipes.recipes:
-                    # Load ingredients for this recipe
-                    recipe_with_ingredients = self.meal_plan_repo.session.query(Recipe).filter(
-                        Recipe.id == recipe.id
-                    ).first()
-                    
-                    for ingredient in recipe_with_ingredients.ingredients:
-                        # Create a key for this ingredient (name, unit, category)
-                        key = (ingredient.name, ingredient.unit, ingredient.category)
-                        
-                        # Add or update the quantity
-                        if key in ingredients_map:
-                            ingredients_map[key] += ingredient.quantity
-                        else:
-                            ingredients_map[key] = ingredient.quantity
-            
-            # Create shopping list items from the collected ingredients
-            items_data = []
-            for (name, unit, category), total_quantity in ingredients_map.items():
-                items_data.append({
-                    "ingredient_name": name,
-                    "total_quantity": total_quantity,
-                    "unit": unit,
-                    "category": category,
-                    "is_purchased": False,
-                })
+            # Sum the ingredients of all recipes in all meal plans per (name, unit, category) in SQL
+            items_data = [
+                {**row, "is_purchased": False}
+                for row in self.meal_plan_repo.aggregate_ingredients_for_date_range(start_date, end_date)
+            ]
             
             # Create the shopping list
             shopping_list_data = {
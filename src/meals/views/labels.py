@@ -0,0 +1,41 @@
+"""
+Display labels for the enum values shown in the meal planner views.
+"""
+
+# Meal types (enum value -> label), the reverse lookup and the selection items
+MEAL_TYPE_JP = {"BREAKFAST": "朝食", "LUNCH": "昼食", "DINNER": "夕食"}
+MEAL_TYPE_EN = {label: value for value, label in MEAL_TYPE_JP.items()}
+MEAL_TYPE_ITEMS_JP = tuple(MEAL_TYPE_JP.values())
+
+# Recipe categories (enum value -> label), the reverse lookup and the selection items
+CATEGORY_JP = {
+    "MAIN_DISH": "主菜",
+    "SIDE_DISH": "副菜",
+    "SOUP": "スープ",
+    "SALAD": "サラダ",
+    "DESSERT": "デザート",
+    "DRINK": "飲み物",
+    "OTHER": "その他",
+}
+CATEGORY_EN = {label: value for value, label in CATEGORY_JP.items()}
+CATEGORY_ITEMS_JP = tuple(CATEGORY_JP.values())
+
+
+def meal_type_jp(value: str) -> str:
+    """Get the label of a meal type value, or the value itself if unknown."""
+    return MEAL_TYPE_JP.get(value, value)
+
+
+def meal_type_en(label: str) -> str:
+    """Get the meal type value of a label, or the label itself if unknown."""
+    return MEAL_TYPE_EN.get(label, label)
+
+
+def category_jp(value: str) -> str:
+    """Get the label of a recipe category value, or the value itself if unknown."""
+    return CATEGORY_JP.get(value, value)
+
+
+def category_en(label: str) -> str:
+    """Get the recipe category value of a label, or the label itself if unknown."""
+    return CATEGORY_EN.get(label, label)
\ No newline at end of file
@@ -2,23 +2,37 @@
 Main window view for the meal planner application.
 """
 
+import importlib
+
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN
 
 from meals.utils.exceptions import MealPlannerException
+from meals.views.styles import STYLE_FLEX, STYLE_TAB
 
 
 class MainView:
     """Main window view for the meal planner application."""
     
+    # (tab title, attribute holding the view, view module, view class, shared viewmodels it takes)
+    _TABS = (
+        ("献立", "meal_plan_view", "meals.views.meal_plan", "MealPlanView", ("recipe_vm",)),
+        ("レシピ", "recipe_view", "meals.views.recipe", "RecipeView", ("recipe_vm",)),
+        ("買い物リスト", "shopping_list_view", "meals.views.shopping_list", "ShoppingListView", ()),
+    )
+    
     def __init__(self, app):
         """Initialize the main window view."""
         self.app = app
         self.main_box = None
         self.tabs = None
+        self._tab_boxes = []
+        
+        # Viewmodels shared by the views, created for the first view that takes them
+        self._shared_viewmodels = {}
         
-        # Views
+        # Views, built when their tab is first selected
         self.meal_plan_view = None
         self.recipe_view = None
         self.shopping_list_view = None
@@ -31,32 +45,53 @@ class MainView:
         # Main container
         self.main_box = toga.Box(style=Pack(direction=COLUMN))
         
-        # Import views here to avoid circular imports
-        from meals.views.meal_plan import MealPlanView
-        from meals.views.recipe import RecipeView
-        from meals.views.shopping_list import ShoppingListView
-        
-        # Create views
-        self.meal_plan_view = MealPlanView(self.app)
-        self.recipe_view = RecipeView(self.app)
-        self.shopping_list_view = ShoppingListView(self.app)
+        # Each tab starts as an empty box that receives its view on first selection
+        self._tab_boxes = [toga.Box(style=STYLE_TAB) for _ in self._TABS]
         
         # Create tab container with content
         self.tabs = toga.OptionContainer(
-            style=Pack(flex=1),
-            content=[
-                ("献立", self.meal_plan_view.content),
-                ("レシピ", self.recipe_view.content),
-                ("買い物リスト", self.shopping_list_view.content),
-            ]
+            style=STYLE_FLEX,
+            content=[(title, box) for (title, *_), box in zip(self._TABS, self._tab_boxes)],
+            on_select=self.on_tab_selected,
         )
         
         # Add tabs to main box
         self.main_box.add(self.tabs)
         
+        # Only the initially shown tab is built at startup
+        self._build_tab(0)
+        
         # Set main window content
         self.app.main_window.content = self.main_box
     
+    def _build_tab(self, index):
+        """Build the view of a tab unless it has been built already."""
+        _, attribute, module_name, class_name, shared = self._TABS[index]
+        if getattr(self, attribute) is not None:
+            return
+        
+        # Import views here to avoid circular imports (and to defer loading unused ones)
+        view_class = getattr(importlib.import_module(module_name), class_name)
+        view = view_class(self.app, **{name: self._shared_viewmodel(name) for name in shared})
+        view.content.style.flex = 1
+        self._tab_boxes[index].add(view.content)
+        setattr(self, attribute, view)
+    
+    def _shared_viewmodel(self, name):
+        """Get the viewmodel shared under a name, creating it on first use."""
+        if name not in self._shared_viewmodels:
+            from meals.viewmodels.recipe import RecipeViewModel
+            
+            factories = {"recipe_vm": RecipeViewModel}
+            self._shared_viewmodels[name] = factories[name]()
+        return self._shared_viewmodels[name]
+    
+    def on_tab_selected(self, widget, **kwargs):
+        """Handle tab selection."""
+        tab = widget.current_tab
+        if tab is not None:
+            self._build_tab(tab.index)
+    
     def show_error(self, title, message):
         """Show an error dialog."""
         self.app.main_window.info_dialog(title, message)
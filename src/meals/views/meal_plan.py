@@ -2,23 +2,43 @@
 MealPlan view for the meal planner application.
 """
 
+from typing import Optional
+
 import toga
-from toga.style import Pack
-from toga.style.pack import COLUMN, ROW
 
+from meals.utils.ui import CoalescedNotice, load_in_background, show_info, sync_table_rows
 from meals.viewmodels.meal_plan import MealPlanViewModel
 from meals.viewmodels.recipe import RecipeViewModel
+from meals.views.labels import MEAL_TYPE_ITEMS_JP, meal_type_en, meal_type_jp
+from meals.views.styles import (
+    STYLE_ACTIONS,
+    STYLE_CONTENT,
+    STYLE_FLEX,
+    STYLE_FORM,
+    STYLE_FORM_LABEL,
+    STYLE_FORM_LIST,
+    STYLE_FORM_ROW,
+    STYLE_LABEL,
+    STYLE_SECTION,
+    STYLE_SECTION_LABEL,
+    STYLE_TITLE,
+)
 
 
 class MealPlanView:
     """MealPlan view for the meal planner application."""
     
-    def __init__(self, app):
-        """Initialize the meal plan view."""
+    def __init__(
+        self,
+        app,
+        meal_plan_vm: Optional[MealPlanViewModel] = None,
+        recipe_vm: Optional[RecipeViewModel] = None,
+    ):
+        """Initialize the meal plan view, optionally with viewmodels shared with other views."""
         self.app = app
         self.content = None
-        self.meal_plan_vm = MealPlanViewModel()
-        self.recipe_vm = RecipeViewModel()
+        self.meal_plan_vm = meal_plan_vm or MealPlanViewModel()
+        self.recipe_vm = recipe_vm or RecipeViewModel()
         
         # UI components
         self.meal_plans_list = None
@@ -28,6 +48,24 @@ class MealPlanView:
         self.name_input = None
         self.recipes_selection = None
         
+        # Rows last shown in the meal plans list
+        self._last_rows = []
+        
+        # Meal plans shown in the list, kept in step with saves instead of refetched
+        self._meal_plans = []
+        
+        # Meal plan ID of each row and meal plans by ID, for resolving a selected row directly
+        self._row_ids = []
+        self._meal_plans_by_id = {}
+        self._deleting_id = None
+        
+        # Recipe ID of each row in the recipes table and the same IDs as a set for membership checks
+        self._recipe_ids = []
+        self._selected_recipe_ids = set()
+        
+        # One dialog for a burst of saves
+        self._saved_notice = CoalescedNotice(app, "成功", "{count}件の献立が保存されました")
+        
         # Create the view
         self._create_view()
         
@@ -40,32 +78,30 @@ class MealPlanView:
     def _create_view(self):
         """Create the view."""
         # Main container
-        self.content = toga.Box(style=Pack(direction=COLUMN, padding=10))
+        self.content = toga.Box(style=STYLE_CONTENT)
         
         # Title
         title_label = toga.Label(
             "献立管理",
-            style=Pack(padding=(0, 0, 10, 0), font_size=18, font_weight="bold")
+            style=STYLE_TITLE
         )
         self.content.add(title_label)
         
         # Split view for list and details
-        split_container = toga.SplitContainer(style=Pack(flex=1))
+        split_container = toga.SplitContainer(style=STYLE_FLEX)
         
         # Meal plans list
-        list_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
-        list_label = toga.Label("献立一覧", style=Pack(padding=(0, 0, 5, 0), font_weight="bold"))
+        list_container = toga.Box(style=STYLE_SECTION)
+        list_label = toga.Label("献立一覧", style=STYLE_SECTION_LABEL)
         self.meal_plans_list = toga.Table(
             headings=["日付", "食事", "名前"],
-            style=Pack(flex=1),
+            style=STYLE_FLEX,
         )
         
         # Buttons for list actions
-        list_actions = toga.Box(style=Pack(direction=ROW, padding=5))
-        add_button = toga.Button("追加")
-        add_button.on_press = self.on_add_meal_plan
-        delete_button = toga.Button("削除")
-        delete_button.on_press = self.on_delete_meal_plan
+        list_actions = toga.Box(style=STYLE_ACTIONS)
+        add_button = toga.Button("追加", on_press=self.on_add_meal_plan)
+        delete_button = toga.Button("削除", on_press=self.on_delete_meal_plan)
         
         list_actions.add(add_button)
         list_actions.add(delete_button)
@@ -75,48 +111,46 @@ class MealPlanView:
         list_container.add(list_actions)
         
         # Meal plan details
-        details_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
-        details_label = toga.Label("献立詳細", style=Pack(padding=(0, 0, 5, 0), font_weight="bold"))
+        details_container = toga.Box(style=STYLE_SECTION)
+        details_label = toga.Label("献立詳細", style=STYLE_SECTION_LABEL)
         
         # Form for meal plan details
-        form_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
+        form_container = toga.Box(style=STYLE_SECTION)
         
         # Name input
-        name_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        name_label = toga.Label("名前:", style=Pack(width=100, padding=(0, 5, 0, 0)))
-        self.name_input = toga.TextInput(style=Pack(flex=1))
+        name_box = toga.Box(style=STYLE_FORM_ROW)
+        name_label = toga.Label("名前:", style=STYLE_FORM_LABEL)
+        self.name_input = toga.TextInput(style=STYLE_FLEX)
         name_box.add(name_label)
         name_box.add(self.name_input)
         
         # Date input
-        date_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        date_label = toga.Label("日付:", style=Pack(width=100, padding=(0, 5, 0, 0)))
-        self.date_input = toga.DateInput(style=Pack(flex=1))
+        date_box = toga.Box(style=STYLE_FORM_ROW)
+        date_label = toga.Label("日付:", style=STYLE_FORM_LABEL)
+        self.date_input = toga.DateInput(style=STYLE_FLEX)
         date_box.add(date_label)
         date_box.add(self.date_input)
         
         # Meal type selection
-        meal_type_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        meal_type_label = toga.Label("食事タイプ:", style=Pack(width=100, padding=(0, 5, 0, 0)))
+        meal_type_box = toga.Box(style=STYLE_FORM_ROW)
+        meal_type_label = toga.Label("食事タイプ:", style=STYLE_FORM_LABEL)
         self.meal_type_selection = toga.Selection(
-            items=["朝食", "昼食", "夕食"],
-            style=Pack(flex=1),
+            items=list(MEAL_TYPE_ITEMS_JP),
+            style=STYLE_FLEX,
         )
         meal_type_box.add(meal_type_label)
         meal_type_box.add(self.meal_type_selection)
         
         # Recipes selection
-        recipes_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
-        recipes_label = toga.Label("レシピ:", style=Pack(padding=(0, 0, 5, 0)))
-        self.recipes_selection = toga.MultilineTextInput(
-            readonly=True,
-            style=Pack(flex=1, height=150),
+        recipes_box = toga.Box(style=STYLE_FORM)
+        recipes_label = toga.Label("レシピ:", style=STYLE_LABEL)
+        self.recipes_selection = toga.Table(
+            headings=["レシピ名"],
+            style=STYLE_FORM_LIST,
         )
-        recipes_actions = toga.Box(style=Pack(direction=ROW, padding=2))
-        add_recipe_button = toga.Button("レシピを追加")
-        add_recipe_button.on_press = self.on_add_recipe
-        remove_recipe_button = toga.Button("レシピを削除")
-        remove_recipe_button.on_press = self.on_remove_recipe
+        recipes_actions = toga.Box(style=STYLE_FORM_ROW)
+        add_recipe_button = toga.Button("レシピを追加", on_press=self.on_add_recipe)
+        remove_recipe_button = toga.Button("レシピを削除", on_press=self.on_remove_recipe)
         recipes_actions.add(add_recipe_button)
         recipes_actions.add(remove_recipe_button)
         
@@ -131,11 +165,9 @@ class MealPlanView:
         form_container.add(recipes_box)
         
         # Buttons for details actions
-        details_actions = toga.Box(style=Pack(direction=ROW, padding=5))
-        save_button = toga.Button("保存")
-        save_button.on_press = self.on_save_meal_plan
-        cancel_button = toga.Button("キャンセル")
-        cancel_button.on_press = self.on_cancel_edit
+        details_actions = toga.Box(style=STYLE_ACTIONS)
+        save_button = toga.Button("保存", on_press=self.on_save_meal_plan)
+        cancel_button = toga.Button("キャンセル", on_press=self.on_cancel_edit)
         
         details_actions.add(save_button)
         details_actions.add(cancel_button)
@@ -153,42 +185,64 @@ class MealPlanView:
     def _register_handlers(self):
         """Register event handlers."""
         # Register handlers for meal plan view model
-        self.meal_plan_vm.register_error_handler("create_meal_plan", self._on_meal_plan_error)
-        self.meal_plan_vm.register_error_handler("update_meal_plan", self._on_meal_plan_error)
-        self.meal_plan_vm.register_error_handler("delete_meal_plan", self._on_meal_plan_error)
-        
-        self.meal_plan_vm.register_success_handler("create_meal_plan", self._on_meal_plan_success)
-        self.meal_plan_vm.register_success_handler("update_meal_plan", self._on_meal_plan_success)
-        self.meal_plan_vm.register_success_handler("delete_meal_plan", self._on_meal_plan_deleted)
+        self.meal_plan_vm.register_handlers(
+            error_handlers={
+                "create_meal_plan": self._on_meal_plan_error,
+                "update_meal_plan": self._on_meal_plan_error,
+                "delete_meal_plan": self._on_meal_plan_error,
+            },
+            success_handlers={
+                "create_meal_plan": self._on_meal_plan_success,
+                "update_meal_plan": self._on_meal_plan_success,
+                "delete_meal_plan": self._on_meal_plan_deleted,
+            },
+        )
         
         # Set up table selection handler
         self.meal_plans_list.on_select = self.on_meal_plan_selected
     
     def _load_data(self):
-        """Load initial data."""
+        """Load the meal plans in the background and show them when they arrive."""
+        # Show a placeholder row until the first load finishes
+        if not self._last_rows:
+            self._last_rows = sync_table_rows(self.meal_plans_list, self._last_rows, [("…", "…", "読み込み中")])
+        
         # Load meal plans
-        meal_plans = self.meal_plan_vm.get_all_meal_plans()
+        load_in_background(self.meal_plan_vm.get_all_meal_plans, self._on_meal_plans_loaded)
+    
+    def _on_meal_plans_loaded(self, meal_plans):
+        """Show the loaded meal plans."""
+        self._meal_plans = meal_plans
         self._update_meal_plans_list(meal_plans)
     
     def _update_meal_plans_list(self, meal_plans):
         """Update the meal plans list."""
-        # Clear the list
-        self.meal_plans_list.data = []
-        
-        # Add meal plans to the list
-        for meal_plan in meal_plans:
-            date_str = meal_plan.date.strftime("%Y-%m-%d")
-            meal_type_str = meal_plan.meal_type.value
-            if meal_type_str == "BREAKFAST":
-                meal_type_str = "朝食"
-            elif meal_type_str == "LUNCH":
-                meal_type_str = "昼食"
-            elif meal_type_str == "DINNER":
-                meal_type_str = "夕食"
-            
-            self.meal_plans_list.data.append(
-                (date_str, meal_type_str, meal_plan.name)
+        # Build the rows
+        rows = [
+            (
+                meal_plan.date.isoformat(),
+                meal_type_jp(meal_plan.meal_type.value),
+                meal_plan.name,
             )
+            for meal_plan in meal_plans
+        ]
+        self._row_ids = [meal_plan.id for meal_plan in meal_plans]
+        self._meal_plans_by_id = dict(zip(self._row_ids, meal_plans))
+        
+        # Update only the rows that changed
+        self._last_rows = sync_table_rows(self.meal_plans_list, self._last_rows, rows)
+    
+    def _selected_meal_plan(self):
+        """Get the meal plan of the selected row, or None."""
+        selection = self.meal_plans_list.selection
+        if selection is None:
+            return None
+        
+        # The loading placeholder row has no meal plan
+        index = self.meal_plans_list.data.index(selection)
+        if index >= len(self._row_ids):
+            return None
+        return self._meal_plans_by_id[self._row_ids[index]]
     
     def _on_meal_plan_error(self, error):
         """Handle meal plan error."""
@@ -196,37 +250,48 @@ class MealPlanView:
     
     def _on_meal_plan_success(self, meal_plan):
         """Handle meal plan success."""
-        self.app.main_window.info_dialog("成功", "献立が保存されました")
-        self._load_data()
+        self._saved_notice.notify()
+        
+        # Apply the saved meal plan to the loaded list instead of reloading all of them
+        if meal_plan.id in self._meal_plans_by_id:
+            self._meal_plans[self._row_ids.index(meal_plan.id)] = meal_plan
+        else:
+            self._meal_plans.append(meal_plan)
+        self._update_meal_plans_list(self._meal_plans)
     
     def _on_meal_plan_deleted(self, result):
         """Handle meal plan deleted."""
         if result:
-            self.app.main_window.info_dialog("成功", "献立が削除されました")
-            self._load_data()
+            show_info(self.app.main_window, "成功", "献立が削除されました")
+            
+            # Drop the deleted meal plan from the loaded list instead of reloading all of them
+            self._meal_plans = [meal_plan for meal_plan in self._meal_plans if meal_plan.id != self._deleting_id]
+            self._update_meal_plans_list(self._meal_plans)
     
-    def on_add_meal_plan(self, widget):
-        """Handle add meal plan button press."""
-        # Clear form fields
+    def _reset_form(self):
+        """Clear the form fields."""
         self.name_input.value = ""
         self.date_input.value = None
-        self.meal_type_selection.value = "朝食"
-        self.recipes_selection.value = ""
+        self.meal_type_selection.value = MEAL_TYPE_ITEMS_JP[0]
+        self._set_recipes([])
+    
+    def on_add_meal_plan(self, widget):
+        """Handle add meal plan button press."""
+        self._reset_form()
     
     def on_delete_meal_plan(self, widget):
         """Handle delete meal plan button press."""
         # Get selected meal plan
-        selection = self.meal_plans_list.selection
-        if selection is None:
+        meal_plan = self._selected_meal_plan()
+        if meal_plan is None:
             self.app.main_window.info_dialog("エラー", "献立を選択してください")
             return
         
         # Confirm deletion
         if self.app.main_window.question_dialog("確認", "選択した献立を削除しますか？"):
             # Delete meal plan
-            # Note: In a real implementation, we would need to get the meal plan ID
-            # For now, this is just a placeholder
-            pass
+            self._deleting_id = meal_plan.id
+            self.meal_plan_vm.delete_meal_plan(meal_plan.id)
     
     def on_save_meal_plan(self, widget):
         """Handle save meal plan button press."""
@@ -245,19 +310,14 @@ class MealPlanView:
             return
         
         # Convert meal type to enum value
-        if meal_type == "朝食":
-            meal_type = "BREAKFAST"
-        elif meal_type == "昼食":
-            meal_type = "LUNCH"
-        elif meal_type == "夕食":
-            meal_type = "DINNER"
+        meal_type = meal_type_en(meal_type)
         
         # Create meal plan data
         meal_plan_data = {
             "name": name,
             "date": date_val,
             "meal_type": meal_type,
-            "recipe_ids": [],  # In a real implementation, we would get selected recipe IDs
+            "recipe_ids": list(self._recipe_ids),
         }
         
         # Create or update meal plan
@@ -267,26 +327,49 @@ class MealPlanView:
     
     def on_cancel_edit(self, widget):
         """Handle cancel edit button press."""
-        # Clear form fields
-        self.name_input.value = ""
-        self.date_input.value = None
-        self.meal_type_selection.value = "朝食"
-        self.recipes_selection.value = ""
+        self._reset_form()
     
-    def on_meal_plan_selected(self, table, row):
+    def on_meal_plan_selected(self, table, **kwargs):
         """Handle meal plan selection."""
-        # In a real implementation, we would load the selected meal plan details
-        # For now, this is just a placeholder
-        pass
+        meal_plan = self._selected_meal_plan()
+        if meal_plan is None:
+            return
+        
+        # Load the selected meal plan details
+        self.name_input.value = meal_plan.name
+        self.date_input.value = meal_plan.date
+        self.meal_type_selection.value = meal_type_jp(meal_plan.meal_type.value)
+        self._set_recipes(meal_plan.recipes or [])
+    
+    def _set_recipes(self, recipes):
+        """Show the given recipes in the recipes table."""
+        self._recipe_ids = [recipe.id for recipe in recipes]
+        self._selected_recipe_ids = set(self._recipe_ids)
+        self.recipes_selection.data = [(recipe.name,) for recipe in recipes]
+    
+    def _add_recipe(self, recipe):
+        """Add a recipe to the recipes table unless it is already there."""
+        if recipe.id in self._selected_recipe_ids:
+            return
+        
+        self._recipe_ids.append(recipe.id)
+        self._selected_recipe_ids.add(recipe.id)
+        self.recipes_selection.data.append((recipe.name,))
     
     def on_add_recipe(self, widget):
         """Handle add recipe button press."""
         # In a real implementation, we would show a dialog to select recipes
-        # For now, this is just a placeholder
+        # and pass each chosen one to _add_recipe
         pass
     
     def on_remove_recipe(self, widget):
         """Handle remove recipe button press."""
-        # In a real implementation, we would remove the selected recipe from the meal plan
-        # For now, this is just a placeholder
-        pass
\ No newline at end of file
+        selection = self.recipes_selection.selection
+        if selection is None:
+            self.app.main_window.info_dialog("エラー", "レシピを選択してください")
+            return
+        
+        # Remove the selected row and its recipe ID
+        index = self.recipes_selection.data.index(selection)
+        self._selected_recipe_ids.discard(self._recipe_ids.pop(index))
+        self.recipes_selection.data.remove(selection)
\ No newline at end of file
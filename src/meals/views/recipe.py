@@ -2,24 +2,48 @@
 Recipe view for the meal planner application.
 """
 
+import functools
+import string
+from typing import Optional
+
 import toga
 from toga.style import Pack
-from toga.style.pack import COLUMN, ROW
 
+from meals.utils.performance import clear_cache, memoize
+from meals.utils.ui import CoalescedNotice, debounce, load_in_background, show_info, sync_table_rows
 from meals.viewmodels.recipe import RecipeViewModel
+from meals.views.labels import CATEGORY_ITEMS_JP, category_en, category_jp
+from meals.views.styles import (
+    STYLE_ACTIONS,
+    STYLE_CONTENT,
+    STYLE_FLEX,
+    STYLE_FORM,
+    STYLE_FORM_LABEL,
+    STYLE_FORM_LIST,
+    STYLE_FORM_ROW,
+    STYLE_LABEL,
+    STYLE_SECTION,
+    STYLE_SECTION_LABEL,
+    STYLE_TITLE,
+)
+
+# Folds only ASCII letters, like SQLite's LIKE; str.lower() would also fold "É" to "é",
+# which LIKE then no longer matches against the stored text
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
 
 
 class RecipeView:
     """Recipe view for the meal planner application."""
     
-    def __init__(self, app):
-        """Initialize the recipe view."""
+    def __init__(self, app, recipe_vm: Optional[RecipeViewModel] = None):
+        """Initialize the recipe view, optionally with a viewmodel shared with other views."""
         self.app = app
         self.content = None
-        self.recipe_vm = RecipeViewModel()
+        self.recipe_vm = recipe_vm or RecipeViewModel()
         
         # UI components
         self.recipes_list = None
+        self.search_input = None
         self.recipe_details = None
         self.name_input = None
         self.description_input = None
@@ -28,6 +52,23 @@ class RecipeView:
         self.cooking_instructions_input = None
         self.ingredients_table = None
         
+        # Rows last shown in the recipes list
+        self._last_rows = []
+        
+        # Recipes shown in the list, kept in step with saves instead of refetched
+        self._recipes = []
+        
+        # Recipe ID of each row and recipes by ID, for resolving a selected row directly
+        self._row_ids = []
+        self._recipes_by_id = {}
+        self._deleting_id = None
+        
+        # Incremented per search so results of a superseded search are dropped
+        self._search_generation = 0
+        
+        # One dialog for a burst of saves
+        self._saved_notice = CoalescedNotice(app, "成功", "{count}件のレシピが保存されました")
+        
         # Create the view
         self._create_view()
         
@@ -40,42 +81,39 @@ class RecipeView:
     def _create_view(self):
         """Create the view."""
         # Main container
-        self.content = toga.Box(style=Pack(direction=COLUMN, padding=10))
+        self.content = toga.Box(style=STYLE_CONTENT)
         
         # Title
         title_label = toga.Label(
             "レシピ管理",
-            style=Pack(padding=(0, 0, 10, 0), font_size=18, font_weight="bold")
+            style=STYLE_TITLE
         )
         self.content.add(title_label)
         
         # Split view for list and details
-        split_container = toga.SplitContainer(style=Pack(flex=1))
+        split_container = toga.SplitContainer(style=STYLE_FLEX)
         
         # Recipes list
-        list_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
-        list_label = toga.Label("レシピ一覧", style=Pack(padding=(0, 0, 5, 0), font_weight="bold"))
+        list_container = toga.Box(style=STYLE_SECTION)
+        list_label = toga.Label("レシピ一覧", style=STYLE_SECTION_LABEL)
         self.recipes_list = toga.Table(
             headings=["名前", "カテゴリ", "調理時間"],
-            style=Pack(flex=1),
+            style=STYLE_FLEX,
         )
         
         # Search box
-        search_box = toga.Box(style=Pack(direction=ROW, padding=5))
+        search_box = toga.Box(style=STYLE_ACTIONS)
         search_label = toga.Label("検索:", style=Pack(width=50, padding=(0, 5, 0, 0)))
-        search_input = toga.TextInput(style=Pack(flex=1))
-        search_button = toga.Button("検索")
-        search_button.on_press = self.on_search
+        self.search_input = toga.TextInput(style=STYLE_FLEX, on_change=self.on_search_change)
+        search_button = toga.Button("検索", on_press=self.on_search)
         search_box.add(search_label)
-        search_box.add(search_input)
+        search_box.add(self.search_input)
         search_box.add(search_button)
         
         # Buttons for list actions
-        list_actions = toga.Box(style=Pack(direction=ROW, padding=5))
-        add_button = toga.Button("追加")
-        add_button.on_press = self.on_add_recipe
-        delete_button = toga.Button("削除")
-        delete_button.on_press = self.on_delete_recipe
+        list_actions = toga.Box(style=STYLE_ACTIONS)
+        add_button = toga.Button("追加", on_press=self.on_add_recipe)
+        delete_button = toga.Button("削除", on_press=self.on_delete_recipe)
         
         list_actions.add(add_button)
         list_actions.add(delete_button)
@@ -86,33 +124,33 @@ class RecipeView:
         list_container.add(list_actions)
         
         # Recipe details
-        details_container = toga.ScrollContainer(style=Pack(flex=1))
-        details_box = toga.Box(style=Pack(direction=COLUMN, padding=5))
-        details_label = toga.Label("レシピ詳細", style=Pack(padding=(0, 0, 5, 0), font_weight="bold"))
+        details_container = toga.ScrollContainer(style=STYLE_FLEX)
+        details_box = toga.Box(style=STYLE_SECTION)
+        details_label = toga.Label("レシピ詳細", style=STYLE_SECTION_LABEL)
         
         # Form for recipe details
-        form_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
+        form_container = toga.Box(style=STYLE_SECTION)
         
         # Name input
-        name_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        name_label = toga.Label("名前:", style=Pack(width=100, padding=(0, 5, 0, 0)))
-        self.name_input = toga.TextInput(style=Pack(flex=1))
+        name_box = toga.Box(style=STYLE_FORM_ROW)
+        name_label = toga.Label("名前:", style=STYLE_FORM_LABEL)
+        self.name_input = toga.TextInput(style=STYLE_FLEX)
         name_box.add(name_label)
         name_box.add(self.name_input)
         
         # Category selection
-        category_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        category_label = toga.Label("カテゴリ:", style=Pack(width=100, padding=(0, 5, 0, 0)))
+        category_box = toga.Box(style=STYLE_FORM_ROW)
+        category_label = toga.Label("カテゴリ:", style=STYLE_FORM_LABEL)
         self.category_selection = toga.Selection(
-            items=["主菜", "副菜", "スープ", "サラダ", "デザート", "飲み物", "その他"],
-            style=Pack(flex=1),
+            items=list(CATEGORY_ITEMS_JP),
+            style=STYLE_FLEX,
         )
         category_box.add(category_label)
         category_box.add(self.category_selection)
         
         # Preparation time input
-        time_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        time_label = toga.Label("調理時間(分):", style=Pack(width=100, padding=(0, 5, 0, 0)))
+        time_box = toga.Box(style=STYLE_FORM_ROW)
+        time_label = toga.Label("調理時間(分):", style=STYLE_FORM_LABEL)
         self.preparation_time_input = toga.NumberInput(
             style=Pack(width=100),
             value=30,
@@ -121,8 +159,8 @@ class RecipeView:
         time_box.add(self.preparation_time_input)
         
         # Description input
-        description_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
-        description_label = toga.Label("説明:", style=Pack(padding=(0, 0, 5, 0)))
+        description_box = toga.Box(style=STYLE_FORM)
+        description_label = toga.Label("説明:", style=STYLE_LABEL)
         self.description_input = toga.MultilineTextInput(
             style=Pack(flex=1, height=80),
         )
@@ -130,30 +168,27 @@ class RecipeView:
         description_box.add(self.description_input)
         
         # Cooking instructions input
-        instructions_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
-        instructions_label = toga.Label("調理手順:", style=Pack(padding=(0, 0, 5, 0)))
+        instructions_box = toga.Box(style=STYLE_FORM)
+        instructions_label = toga.Label("調理手順:", style=STYLE_LABEL)
         self.cooking_instructions_input = toga.MultilineTextInput(
-            style=Pack(flex=1, height=150),
+            style=STYLE_FORM_LIST,
         )
         instructions_box.add(instructions_label)
         instructions_box.add(self.cooking_instructions_input)
         
         # Ingredients table
-        ingredients_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
-        ingredients_label = toga.Label("材料:", style=Pack(padding=(0, 0, 5, 0)))
+        ingredients_box = toga.Box(style=STYLE_FORM)
+        ingredients_label = toga.Label("材料:", style=STYLE_LABEL)
         self.ingredients_table = toga.Table(
             headings=["材料名", "分量", "単位", "カテゴリ"],
-            style=Pack(flex=1, height=150),
+            style=STYLE_FORM_LIST,
         )
         
         # Buttons for ingredients actions
-        ingredients_actions = toga.Box(style=Pack(direction=ROW, padding=2))
-        add_ingredient_button = toga.Button("材料を追加")
-        add_ingredient_button.on_press = self.on_add_ingredient
-        edit_ingredient_button = toga.Button("材料を編集")
-        edit_ingredient_button.on_press = self.on_edit_ingredient
-        remove_ingredient_button = toga.Button("材料を削除")
-        remove_ingredient_button.on_press = self.on_remove_ingredient
+        ingredients_actions = toga.Box(style=STYLE_FORM_ROW)
+        add_ingredient_button = toga.Button("材料を追加", on_press=self.on_add_ingredient)
+        edit_ingredient_button = toga.Button("材料を編集", on_press=self.on_edit_ingredient)
+        remove_ingredient_button = toga.Button("材料を削除", on_press=self.on_remove_ingredient)
         
         ingredients_actions.add(add_ingredient_button)
         ingredients_actions.add(edit_ingredient_button)
@@ -172,11 +207,9 @@ class RecipeView:
         form_container.add(ingredients_box)
         
         # Buttons for details actions
-        details_actions = toga.Box(style=Pack(direction=ROW, padding=5))
-        save_button = toga.Button("保存")
-        save_button.on_press = self.on_save_recipe
-        cancel_button = toga.Button("キャンセル")
-        cancel_button.on_press = self.on_cancel_edit
+        details_actions = toga.Box(style=STYLE_ACTIONS)
+        save_button = toga.Button("保存", on_press=self.on_save_recipe)
+        cancel_button = toga.Button("キャンセル", on_press=self.on_cancel_edit)
         
         details_actions.add(save_button)
         details_actions.add(cancel_button)
@@ -197,51 +230,65 @@ class RecipeView:
     def _register_handlers(self):
         """Register event handlers."""
         # Register handlers for recipe view model
-        self.recipe_vm.register_error_handler("create_recipe", self._on_recipe_error)
-        self.recipe_vm.register_error_handler("update_recipe", self._on_recipe_error)
-        self.recipe_vm.register_error_handler("delete_recipe", self._on_recipe_error)
-        
-        self.recipe_vm.register_success_handler("create_recipe", self._on_recipe_success)
-        self.recipe_vm.register_success_handler("update_recipe", self._on_recipe_success)
-        self.recipe_vm.register_success_handler("delete_recipe", self._on_recipe_deleted)
+        self.recipe_vm.register_handlers(
+            error_handlers={
+                "create_recipe": self._on_recipe_error,
+                "update_recipe": self._on_recipe_error,
+                "delete_recipe": self._on_recipe_error,
+            },
+            success_handlers={
+                "create_recipe": self._on_recipe_success,
+                "update_recipe": self._on_recipe_success,
+                "delete_recipe": self._on_recipe_deleted,
+            },
+        )
         
         # Set up table selection handler
         self.recipes_list.on_select = self.on_recipe_selected
     
     def _load_data(self):
-        """Load initial data."""
+        """Load the recipes in the background and show them when they arrive."""
+        # Show a placeholder row until the first load finishes
+        if not self._last_rows:
+            self._last_rows = sync_table_rows(self.recipes_list, self._last_rows, [("読み込み中", "…", "…")])
+        
         # Load recipes
-        recipes = self.recipe_vm.get_all_recipes()
+        load_in_background(self.recipe_vm.get_all_recipes, self._on_recipes_loaded)
+    
+    def _on_recipes_loaded(self, recipes):
+        """Show the loaded recipes."""
+        # A copy, since saves change the list in place and search results are cached
+        self._recipes = list(recipes)
         self._update_recipes_list(recipes)
     
     def _update_recipes_list(self, recipes):
         """Update the recipes list."""
-        # Clear the list
-        self.recipes_list.data = []
-        
-        # Add recipes to the list
-        for recipe in recipes:
-            category_str = recipe.category.value if recipe.category else ""
-            if category_str == "MAIN_DISH":
-                category_str = "主菜"
-            elif category_str == "SIDE_DISH":
-                category_str = "副菜"
-            elif category_str == "SOUP":
-                category_str = "スープ"
-            elif category_str == "SALAD":
-                category_str = "サラダ"
-            elif category_str == "DESSERT":
-                category_str = "デザート"
-            elif category_str == "DRINK":
-                category_str = "飲み物"
-            elif category_str == "OTHER":
-                category_str = "その他"
-            
-            preparation_time = f"{recipe.preparation_time}分" if recipe.preparation_time else ""
-            
-            self.recipes_list.data.append(
-                (recipe.name, category_str, preparation_time)
+        # Build the rows
+        rows = [
+            (
+                recipe.name,
+                category_jp(recipe.category.value) if recipe.category else "",
+                f"{recipe.preparation_time}分" if recipe.preparation_time else "",
             )
+            for recipe in recipes
+        ]
+        self._row_ids = [recipe.id for recipe in recipes]
+        self._recipes_by_id = dict(zip(self._row_ids, recipes))
+        
+        # Update only the rows that changed
+        self._last_rows = sync_table_rows(self.recipes_list, self._last_rows, rows)
+    
+    def _selected_recipe(self):
+        """Get the recipe of the selected row, or None."""
+        selection = self.recipes_list.selection
+        if selection is None:
+            return None
+        
+        # The loading placeholder row has no recipe
+        index = self.recipes_list.data.index(selection)
+        if index >= len(self._row_ids):
+            return None
+        return self._recipes_by_id[self._row_ids[index]]
     
     def _on_recipe_error(self, error):
         """Handle recipe error."""
@@ -249,45 +296,88 @@ class RecipeView:
     
     def _on_recipe_success(self, recipe):
         """Handle recipe success."""
-        self.app.main_window.info_dialog("成功", "レシピが保存されました")
-        self._load_data()
+        self._saved_notice.notify()
+        clear_cache(RecipeView._find_recipes)
+        
+        # Apply the saved recipe to the loaded list instead of reloading all of them
+        if recipe.id in self._recipes_by_id:
+            self._recipes[self._row_ids.index(recipe.id)] = recipe
+        else:
+            self._recipes.append(recipe)
+        self._update_recipes_list(self._recipes)
     
     def _on_recipe_deleted(self, result):
         """Handle recipe deleted."""
         if result:
-            self.app.main_window.info_dialog("成功", "レシピが削除されました")
-            self._load_data()
+            show_info(self.app.main_window, "成功", "レシピが削除されました")
+            clear_cache(RecipeView._find_recipes)
+            
+            # Drop the deleted recipe from the loaded list instead of reloading all of them
+            self._recipes = [recipe for recipe in self._recipes if recipe.id != self._deleting_id]
+            self._update_recipes_list(self._recipes)
+    
+    @memoize(ttl=300, maxsize=128)
+    def _find_recipes(self, query):
+        """Search the recipes; cached until a recipe is saved or deleted, since queries are often retyped.
+        
+        A failed search returns None, which is not cached.
+        """
+        return self.recipe_vm.search_recipes(query)
+    
+    def _search(self, query):
+        """Search the recipes in the background and show the matches; an empty query shows all of them."""
+        self._search_generation += 1
+        generation = self._search_generation
+        
+        # SQLite's LIKE ignores ASCII case, so queries differing only in that share a cache entry
+        query = query.strip().translate(_ASCII_LOWER)
+        if query:
+            load = functools.partial(self._find_recipes, query)
+        else:
+            load = self.recipe_vm.get_all_recipes
+        
+        def apply(recipes):
+            # Only the latest successful search may replace the list
+            if recipes is not None and generation == self._search_generation:
+                self._on_recipes_loaded(recipes)
+        
+        load_in_background(load, apply)
     
     def on_search(self, widget):
         """Handle search button press."""
-        # In a real implementation, we would search for recipes
-        # For now, this is just a placeholder
-        pass
+        self._search(self.search_input.value)
     
-    def on_add_recipe(self, widget):
-        """Handle add recipe button press."""
-        # Clear form fields
+    @debounce(0.15)
+    def on_search_change(self, widget):
+        """Handle search input change, once typing pauses."""
+        self._search(widget.value)
+    
+    def _reset_form(self):
+        """Clear the form fields."""
         self.name_input.value = ""
         self.description_input.value = ""
         self.preparation_time_input.value = 30
-        self.category_selection.value = "主菜"
+        self.category_selection.value = CATEGORY_ITEMS_JP[0]
         self.cooking_instructions_input.value = ""
         self.ingredients_table.data = []
     
+    def on_add_recipe(self, widget):
+        """Handle add recipe button press."""
+        self._reset_form()
+    
     def on_delete_recipe(self, widget):
         """Handle delete recipe button press."""
         # Get selected recipe
-        selection = self.recipes_list.selection
-        if selection is None:
+        recipe = self._selected_recipe()
+        if recipe is None:
             self.app.main_window.info_dialog("エラー", "レシピを選択してください")
             return
         
         # Confirm deletion
         if self.app.main_window.question_dialog("確認", "選択したレシピを削除しますか？"):
             # Delete recipe
-            # Note: In a real implementation, we would need to get the recipe ID
-            # For now, this is just a placeholder
-            pass
+            self._deleting_id = recipe.id
+            self.recipe_vm.delete_recipe(recipe.id)
     
     def on_save_recipe(self, widget):
         """Handle save recipe button press."""
@@ -304,20 +394,7 @@ class RecipeView:
             return
         
         # Convert category to enum value
-        if category == "主菜":
-            category = "MAIN_DISH"
-        elif category == "副菜":
-            category = "SIDE_DISH"
-        elif category == "スープ":
-            category = "SOUP"
-        elif category == "サラダ":
-            category = "SALAD"
-        elif category == "デザート":
-            category = "DESSERT"
-        elif category == "飲み物":
-            category = "DRINK"
-        elif category == "その他":
-            category = "OTHER"
+        category = category_en(category)
         
         # Create recipe data
         recipe_data = {
@@ -339,19 +416,30 @@ class RecipeView:
     
     def on_cancel_edit(self, widget):
         """Handle cancel edit button press."""
-        # Clear form fields
-        self.name_input.value = ""
-        self.description_input.value = ""
-        self.preparation_time_input.value = 30
-        self.category_selection.value = "主菜"
-        self.cooking_instructions_input.value = ""
-        self.ingredients_table.data = []
+        self._reset_form()
     
-    def on_recipe_selected(self, table, row):
+    def on_recipe_selected(self, table, **kwargs):
         """Handle recipe selection."""
-        # In a real implementation, we would load the selected recipe details
-        # For now, this is just a placeholder
-        pass
+        recipe = self._selected_recipe()
+        if recipe is None:
+            return
+        
+        # Load the selected recipe details
+        self.name_input.value = recipe.name
+        self.description_input.value = recipe.description or ""
+        self.preparation_time_input.value = recipe.preparation_time
+        if recipe.category:
+            self.category_selection.value = category_jp(recipe.category.value)
+        self.cooking_instructions_input.value = recipe.cooking_instructions or ""
+        self.ingredients_table.data = [
+            (
+                ingredient.name,
+                ingredient.quantity,
+                ingredient.unit,
+                ingredient.category.value if ingredient.category else "",
+            )
+            for ingredient in recipe.ingredients or []
+        ]
     
     def on_add_ingredient(self, widget):
         """Handle add ingredient button press."""
@@ -2,11 +2,36 @@
 ShoppingList view for the meal planner application.
 """
 
+import functools
+from datetime import date
+
 import toga
 from toga.style import Pack
-from toga.style.pack import COLUMN, ROW
 
+from meals.utils.ui import CoalescedNotice, debounce, show_info, sync_table_rows
 from meals.viewmodels.shopping_list import ShoppingListViewModel
+from meals.views.styles import (
+    STYLE_ACTIONS,
+    STYLE_CONTENT,
+    STYLE_FLEX,
+    STYLE_FORM,
+    STYLE_FORM_LABEL,
+    STYLE_FORM_ROW,
+    STYLE_LABEL,
+    STYLE_SECTION,
+    STYLE_SECTION_LABEL,
+    STYLE_TITLE,
+)
+
+# Items of the purchase status and category filters
+FILTER_ITEMS_JP = ("全て", "未購入のみ", "購入済みのみ")
+CATEGORY_FILTER_ITEMS_JP = ("全て", "野菜", "肉", "魚", "乳製品", "穀物", "果物", "調味料", "その他")
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_date(value: date) -> str:
+    """Format a date for the lists; reloads show the same few dates again and again."""
+    return value.isoformat()
 
 
 class ShoppingListView:
@@ -25,6 +50,13 @@ class ShoppingListView:
         self.start_date_input = None
         self.end_date_input = None
         self.items_table = None
+        self._split_container = None
+        
+        # Rows last shown in the shopping lists list
+        self._last_rows = []
+        
+        # One dialog for a burst of saves
+        self._saved_notice = CoalescedNotice(app, "成功", "{count}件の買い物リストが保存されました")
         
         # Create the view
         self._create_view()
@@ -38,34 +70,31 @@ class ShoppingListView:
     def _create_view(self):
         """Create the view."""
         # Main container
-        self.content = toga.Box(style=Pack(direction=COLUMN, padding=10))
+        self.content = toga.Box(style=STYLE_CONTENT)
         
         # Title
         title_label = toga.Label(
             "買い物リスト管理",
-            style=Pack(padding=(0, 0, 10, 0), font_size=18, font_weight="bold")
+            style=STYLE_TITLE
         )
         self.content.add(title_label)
         
         # Split view for list and details
-        split_container = toga.SplitContainer(style=Pack(flex=1))
+        self._split_container = toga.SplitContainer(style=STYLE_FLEX)
         
         # Shopping lists list
-        list_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
-        list_label = toga.Label("買い物リスト一覧", style=Pack(padding=(0, 0, 5, 0), font_weight="bold"))
+        list_container = toga.Box(style=STYLE_SECTION)
+        list_label = toga.Label("買い物リスト一覧", style=STYLE_SECTION_LABEL)
         self.shopping_lists_list = toga.Table(
             headings=["名前", "開始日", "終了日"],
-            style=Pack(flex=1),
+            style=STYLE_FLEX,
         )
         
         # Buttons for list actions
-        list_actions = toga.Box(style=Pack(direction=ROW, padding=5))
-        add_button = toga.Button("追加")
-        add_button.on_press = self.on_add_shopping_list
-        generate_button = toga.Button("献立から生成")
-        generate_button.on_press = self.on_generate_from_meal_plans
-        delete_button = toga.Button("削除")
-        delete_button.on_press = self.on_delete_shopping_list
+        list_actions = toga.Box(style=STYLE_ACTIONS)
+        add_button = toga.Button("追加", on_press=self.on_add_shopping_list)
+        generate_button = toga.Button("献立から生成", on_press=self.on_generate_from_meal_plans)
+        delete_button = toga.Button("削除", on_press=self.on_delete_shopping_list)
         
         list_actions.add(add_button)
         list_actions.add(generate_button)
@@ -75,33 +104,44 @@ class ShoppingListView:
         list_container.add(self.shopping_lists_list)
         list_container.add(list_actions)
         
+        # The details pane is only built once a shopping list is added or selected
+        self._split_container.content = [list_container, toga.Box(style=STYLE_SECTION)]
+        
+        # Add split view to main container
+        self.content.add(self._split_container)
+    
+    def _ensure_details_pane(self):
+        """Build the details pane on first use and show it next to the list."""
+        if self.shopping_list_details is not None:
+            return
+        
         # Shopping list details
-        details_container = toga.ScrollContainer(style=Pack(flex=1))
-        details_box = toga.Box(style=Pack(direction=COLUMN, padding=5))
-        details_label = toga.Label("買い物リスト詳細", style=Pack(padding=(0, 0, 5, 0), font_weight="bold"))
+        details_container = toga.ScrollContainer(style=STYLE_FLEX)
+        details_box = toga.Box(style=STYLE_SECTION)
+        details_label = toga.Label("買い物リスト詳細", style=STYLE_SECTION_LABEL)
         
         # Form for shopping list details
-        form_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
+        form_container = toga.Box(style=STYLE_SECTION)
         
         # Name input
-        name_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        name_label = toga.Label("名前:", style=Pack(width=100, padding=(0, 5, 0, 0)))
-        self.name_input = toga.TextInput(style=Pack(flex=1))
+        name_box = toga.Box(style=STYLE_FORM_ROW)
+        name_label = toga.Label("名前:", style=STYLE_FORM_LABEL)
+        self.name_input = toga.TextInput(style=STYLE_FLEX)
         name_box.add(name_label)
         name_box.add(self.name_input)
         
         # Date range inputs
-        date_range_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
+        date_range_box = toga.Box(style=STYLE_FORM)
         
-        start_date_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        start_date_label = toga.Label("開始日:", style=Pack(width=100, padding=(0, 5, 0, 0)))
-        self.start_date_input = toga.DateInput(style=Pack(flex=1))
+        start_date_box = toga.Box(style=STYLE_FORM_ROW)
+        start_date_label = toga.Label("開始日:", style=STYLE_FORM_LABEL)
+        self.start_date_input = toga.DateInput(style=STYLE_FLEX)
         start_date_box.add(start_date_label)
         start_date_box.add(self.start_date_input)
         
-        end_date_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        end_date_label = toga.Label("終了日:", style=Pack(width=100, padding=(0, 5, 0, 0)))
-        self.end_date_input = toga.DateInput(style=Pack(flex=1))
+        end_date_box = toga.Box(style=STYLE_FORM_ROW)
+        end_date_label = toga.Label("終了日:", style=STYLE_FORM_LABEL)
+        self.end_date_input = toga.DateInput(style=STYLE_FLEX)
         end_date_box.add(end_date_label)
         end_date_box.add(self.end_date_input)
         
@@ -109,45 +149,41 @@ class ShoppingListView:
         date_range_box.add(end_date_box)
         
         # Items table
-        items_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
-        items_label = toga.Label("アイテム:", style=Pack(padding=(0, 0, 5, 0)))
+        items_box = toga.Box(style=STYLE_FORM)
+        items_label = toga.Label("アイテム:", style=STYLE_LABEL)
         self.items_table = toga.Table(
             headings=["材料名", "分量", "単位", "カテゴリ", "購入済み"],
             style=Pack(flex=1, height=200),
         )
         
         # Filter options
-        filter_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        filter_label = toga.Label("フィルタ:", style=Pack(width=100, padding=(0, 5, 0, 0)))
+        filter_box = toga.Box(style=STYLE_FORM_ROW)
+        filter_label = toga.Label("フィルタ:", style=STYLE_FORM_LABEL)
         filter_selection = toga.Selection(
-            items=["全て", "未購入のみ", "購入済みのみ"],
-            style=Pack(flex=1),
+            items=list(FILTER_ITEMS_JP),
+            style=STYLE_FLEX,
         )
         filter_selection.on_select = self.on_filter_changed
         filter_box.add(filter_label)
         filter_box.add(filter_selection)
         
         # Category filter
-        category_box = toga.Box(style=Pack(direction=ROW, padding=2))
-        category_label = toga.Label("カテゴリ:", style=Pack(width=100, padding=(0, 5, 0, 0)))
+        category_box = toga.Box(style=STYLE_FORM_ROW)
+        category_label = toga.Label("カテゴリ:", style=STYLE_FORM_LABEL)
         category_selection = toga.Selection(
-            items=["全て", "野菜", "肉", "魚", "乳製品", "穀物", "果物", "調味料", "その他"],
-            style=Pack(flex=1),
+            items=list(CATEGORY_FILTER_ITEMS_JP),
+            style=STYLE_FLEX,
         )
         category_selection.on_select = self.on_category_changed
         category_box.add(category_label)
         category_box.add(category_selection)
         
         # Buttons for items actions
-        items_actions = toga.Box(style=Pack(direction=ROW, padding=2))
-        add_item_button = toga.Button("アイテムを追加")
-        add_item_button.on_press = self.on_add_item
-        edit_item_button = toga.Button("アイテムを編集")
-        edit_item_button.on_press = self.on_edit_item
-        remove_item_button = toga.Button("アイテムを削除")
-        remove_item_button.on_press = self.on_remove_item
-        mark_purchased_button = toga.Button("購入済みにする")
-        mark_purchased_button.on_press = self.on_mark_purchased
+        items_actions = toga.Box(style=STYLE_FORM_ROW)
+        add_item_button = toga.Button("アイテムを追加", on_press=self.on_add_item)
+        edit_item_button = toga.Button("アイテムを編集", on_press=self.on_edit_item)
+        remove_item_button = toga.Button("アイテムを削除", on_press=self.on_remove_item)
+        mark_purchased_button = toga.Button("購入済みにする", on_press=self.on_mark_purchased)
         
         items_actions.add(add_item_button)
         items_actions.add(edit_item_button)
@@ -166,11 +202,9 @@ class ShoppingListView:
         form_container.add(items_box)
         
         # Buttons for details actions
-        details_actions = toga.Box(style=Pack(direction=ROW, padding=5))
-        save_button = toga.Button("保存")
-        save_button.on_press = self.on_save_shopping_list
-        cancel_button = toga.Button("キャンセル")
-        cancel_button.on_press = self.on_cancel_edit
+        details_actions = toga.Box(style=STYLE_ACTIONS)
+        save_button = toga.Button("保存", on_press=self.on_save_shopping_list)
+        cancel_button = toga.Button("キャンセル", on_press=self.on_cancel_edit)
         
         details_actions.add(save_button)
         details_actions.add(cancel_button)
@@ -182,27 +216,26 @@ class ShoppingListView:
         # Add details box to scroll container
         details_container.content = details_box
         
-        # Add containers to split view
-        split_container.content = [list_container, details_container]
-        
-        # Add split view to main container
-        self.content.add(split_container)
+        # Replace the placeholder in the split view
+        self.shopping_list_details = details_container
+        self._split_container.content = [self._split_container.content[0], details_container]
     
     def _register_handlers(self):
         """Register event handlers."""
         # Register handlers for shopping list view model
-        self.shopping_list_vm.register_error_handler("create_shopping_list", self._on_shopping_list_error)
-        self.shopping_list_vm.register_error_handler("update_shopping_list", self._on_shopping_list_error)
-        self.shopping_list_vm.register_error_handler("delete_shopping_list", self._on_shopping_list_error)
-        self.shopping_list_vm.register_error_handler(
-            "generate_shopping_list_from_meal_plans", self._on_shopping_list_error
-        )
-        
-        self.shopping_list_vm.register_success_handler("create_shopping_list", self._on_shopping_list_success)
-        self.shopping_list_vm.register_success_handler("update_shopping_list", self._on_shopping_list_success)
-        self.shopping_list_vm.register_success_handler("delete_shopping_list", self._on_shopping_list_deleted)
-        self.shopping_list_vm.register_success_handler(
-            "generate_shopping_list_from_meal_plans", self._on_shopping_list_success
+        self.shopping_list_vm.register_handlers(
+            error_handlers={
+                "create_shopping_list": self._on_shopping_list_error,
+                "update_shopping_list": self._on_shopping_list_error,
+                "delete_shopping_list": self._on_shopping_list_error,
+                "generate_shopping_list_from_meal_plans": self._on_shopping_list_error,
+            },
+            success_handlers={
+                "create_shopping_list": self._on_shopping_list_success,
+                "update_shopping_list": self._on_shopping_list_success,
+                "delete_shopping_list": self._on_shopping_list_deleted,
+                "generate_shopping_list_from_meal_plans": self._on_shopping_list_success,
+            },
         )
         
         # Set up table selection handler
@@ -214,19 +247,25 @@ class ShoppingListView:
         shopping_lists = self.shopping_list_vm.get_all_shopping_lists()
         self._update_shopping_lists_list(shopping_lists)
     
+    @debounce(0.05)
+    def _schedule_reload(self):
+        """Reload the shopping lists once for a burst of changes."""
+        self._load_data()
+    
     def _update_shopping_lists_list(self, shopping_lists):
         """Update the shopping lists list."""
-        # Clear the list
-        self.shopping_lists_list.data = []
-        
-        # Add shopping lists to the list
-        for shopping_list in shopping_lists:
-            start_date_str = shopping_list.date_range_start.strftime("%Y-%m-%d")
-            end_date_str = shopping_list.date_range_end.strftime("%Y-%m-%d")
-            
-            self.shopping_lists_list.data.append(
-                (shopping_list.name, start_date_str, end_date_str)
+        # Build the rows
+        rows = [
+            (
+                shopping_list.name,
+                _format_date(shopping_list.date_range_start),
+                _format_date(shopping_list.date_range_end),
             )
+            for shopping_list in shopping_lists
+        ]
+        
+        # Update only the rows that changed
+        self._last_rows = sync_table_rows(self.shopping_lists_list, self._last_rows, rows)
     
     def _on_shopping_list_error(self, error):
         """Handle shopping list error."""
@@ -234,23 +273,27 @@ class ShoppingListView:
     
     def _on_shopping_list_success(self, shopping_list):
         """Handle shopping list success."""
-        self.app.main_window.info_dialog("成功", "買い物リストが保存されました")
-        self._load_data()
+        self._saved_notice.notify()
+        self._schedule_reload()
     
     def _on_shopping_list_deleted(self, result):
         """Handle shopping list deleted."""
         if result:
-            self.app.main_window.info_dialog("成功", "買い物リストが削除されました")
-            self._load_data()
+            show_info(self.app.main_window, "成功", "買い物リストが削除されました")
+            self._schedule_reload()
     
-    def on_add_shopping_list(self, widget):
-        """Handle add shopping list button press."""
-        # Clear form fields
+    def _reset_form(self):
+        """Clear the form fields."""
         self.name_input.value = ""
         self.start_date_input.value = None
         self.end_date_input.value = None
         self.items_table.data = []
     
+    def on_add_shopping_list(self, widget):
+        """Handle add shopping list button press."""
+        self._ensure_details_pane()
+        self._reset_form()
+    
     def on_generate_from_meal_plans(self, widget):
         """Handle generate from meal plans button press."""
         # In a real implementation, we would show a dialog to select date range and generate a shopping list
@@ -314,14 +357,15 @@ class ShoppingListView:
     
     def on_cancel_edit(self, widget):
         """Handle cancel edit button press."""
-        # Clear form fields
-        self.name_input.value = ""
-        self.start_date_input.value = None
-        self.end_date_input.value = None
-        self.items_table.data = []
+        self._reset_form()
     
-    def on_shopping_list_selected(self, table, row):
+    def on_shopping_list_selected(self, table, **kwargs):
         """Handle shopping list selection."""
+        # Replacing the table data also fires this without a selection
+        if table.selection is None:
+            return
+        self._ensure_details_pane()
+        
         # In a real implementation, we would load the selected shopping list details
         # For now, this is just a placeholder
         pass
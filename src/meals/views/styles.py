@@ -0,0 +1,28 @@
+"""
+Shared widget styles for the meal planner views.
+
+Widgets copy the style they are given, so one instance can be passed to any number of them.
+"""
+
+from toga.style import Pack
+from toga.style.pack import COLUMN, ROW
+
+# View layout
+STYLE_CONTENT = Pack(direction=COLUMN, padding=10)
+STYLE_TITLE = Pack(padding=(0, 0, 10, 0), font_size=18, font_weight="bold")
+STYLE_FLEX = Pack(flex=1)
+
+# List and details sections
+STYLE_SECTION = Pack(direction=COLUMN, padding=5)
+STYLE_SECTION_LABEL = Pack(padding=(0, 0, 5, 0), font_weight="bold")
+STYLE_LABEL = Pack(padding=(0, 0, 5, 0))
+STYLE_ACTIONS = Pack(direction=ROW, padding=5)
+
+# Forms
+STYLE_FORM = Pack(direction=COLUMN, padding=2)
+STYLE_FORM_ROW = Pack(direction=ROW, padding=2)
+STYLE_FORM_LABEL = Pack(width=100, padding=(0, 5, 0, 0))
+STYLE_FORM_LIST = Pack(flex=1, height=150)
+
+# Tabs
+STYLE_TAB = Pack(direction=COLUMN, flex=1)
\ No newline at end of file
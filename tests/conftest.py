@@ -0,0 +1,9 @@
+"""
+Test configuration shared by all test modules.
+"""
+
+import os
+
+# Make any unplanned lazy load raise, so N+1 query regressions fail the tests;
+# set before the models are imported, since it picks their loader strategy
+os.environ.setdefault("MEALS_STRICT_LOAD", "1")
\ No newline at end of file
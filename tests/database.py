@@ -0,0 +1,95 @@
+"""
+Shared database setup for the tests.
+"""
+
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from meals.models import Base
+from meals.repositories.meal_plan import MealPlanRepository
+from meals.repositories.recipe import RecipeRepository
+from meals.repositories.shopping_list import ShoppingListRepository
+
+
+def create_test_engine():
+    """Create an in-memory SQLite database with all tables."""
+    # One in-memory SQLite database shared by every connection
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    
+    # Let SQLAlchemy emit BEGIN itself; pysqlite's own transaction handling breaks savepoints
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    # The in-memory database already journals in memory and never syncs to disk,
+    # so only the temporary sort and GROUP BY tables need keeping out of files
+    @event.listens_for(engine, "connect")
+    def _set_test_db_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+    
+    # Create all tables
+    Base.metadata.create_all(engine)
+    return engine
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Base class for tests that run against one database per test class."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Create the database once for all tests."""
+        cls.engine = create_test_engine()
+        
+        # Add the class's fixtures, if any
+        with Session(cls.engine) as session:
+            cls._add_test_data(session)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Dispose of the shared database."""
+        cls.engine.dispose()
+    
+    @staticmethod
+    def _add_test_data(session):
+        """Add test data shared by every test of the class."""
+    
+    def setUp(self):
+        """Set up the test environment."""
+        # Run each test in a transaction that is rolled back afterwards
+        self.connection = self.engine.connect()
+        self.transaction = self.connection.begin()
+        
+        # Commits and rollbacks of the session only end savepoints inside that transaction;
+        # flushing and expiry behave as with the application's SessionLocal
+        self.session = Session(
+            bind=self.connection,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        
+        # Create repositories
+        self.meal_plan_repo = MealPlanRepository(self.session)
+        self.recipe_repo = RecipeRepository(self.session)
+        self.shopping_list_repo = ShoppingListRepository(self.session)
+    
+    def tearDown(self):
+        """Clean up the test environment."""
+        self.session.close()
+        
+        # Discard everything the test wrote
+        self.transaction.rollback()
+        self.connection.close()
\ No newline at end of file
@@ -2,7 +2,9 @@
 Tests for the app module.
 """
 
+import ast
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import toga
@@ -14,43 +16,72 @@ from meals.app import MealPlannerApp
 class TestApp(unittest.TestCase):
     """Tests for the app module."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Patch the app's collaborators once for all tests."""
+        main_view_patcher = patch("meals.views.main_window.MainView")
+        init_db_patcher = patch("meals.utils.database.init_db")
+        cls.mock_main_view = main_view_patcher.start()
+        cls.addClassCleanup(main_view_patcher.stop)
+        cls.mock_init_db = init_db_patcher.start()
+        cls.addClassCleanup(init_db_patcher.stop)
+        
+        # Create the app once; startup() only touches the patched collaborators
+        cls.app_instance = MealPlannerApp("献立管理", "com.example.meals")
+    
     def setUp(self):
         """Set up the test environment."""
-        # Create a mock app
-        self.app = MealPlannerApp("献立管理", "com.example.meals")
+        # Forget the calls and side effects of the previous test
+        self.mock_main_view.reset_mock(side_effect=True)
+        self.mock_init_db.reset_mock(side_effect=True)
+        
+        # Reuse the app with a fresh mock window
+        self.app = self.app_instance
         self.app.main_window = MagicMock()
     
     def test_app_initialization(self):
         """Test app initialization."""
         # Call startup
-        with patch("meals.app.MainView") as mock_main_view:
-            with patch("meals.utils.database.init_db") as mock_init_db:
-                self.app.startup()
-                
-                # Check if init_db was called
-                mock_init_db.assert_called_once()
-                
-                # Check if MainView was created
-                mock_main_view.assert_called_once_with(self.app)
+        self.app.startup()
+        
+        # Check if init_db was called
+        self.mock_init_db.assert_called_once()
+        
+        # Check if MainView was created
+        self.mock_main_view.assert_called_once_with(self.app)
     
     def test_app_initialization_error(self):
         """Test app initialization with an error."""
+        # Make init_db raise an exception
+        self.mock_init_db.side_effect = Exception("Test error")
+        
         # Call startup
-        with patch("meals.app.MainView") as mock_main_view:
-            with patch("meals.utils.database.init_db") as mock_init_db:
-                # Make init_db raise an exception
-                mock_init_db.side_effect = Exception("Test error")
-                
-                self.app.startup()
-                
-                # Check if init_db was called
-                mock_init_db.assert_called_once()
-                
-                # Check if info_dialog was called
-                self.app.main_window.info_dialog.assert_called_once()
-                
-                # Check if MainView was not created
-                mock_main_view.assert_not_called()
+        self.app.startup()
+        
+        # Check if init_db was called
+        self.mock_init_db.assert_called_once()
+        
+        # Check if info_dialog was called
+        self.app.main_window.info_dialog.assert_called_once()
+        
+        # Check if MainView was not created
+        self.mock_main_view.assert_not_called()
+
+
+class TestAppModule(unittest.TestCase):
+    """Tests for the app module source."""
+    
+    def test_app_defined_once(self):
+        """Test that the app module defines MealPlannerApp exactly once."""
+        source = Path(__file__).parent.parent / "src" / "meals" / "app.py"
+        tree = ast.parse(source.read_text(encoding="utf-8"))
+        
+        class_defs = [
+            node for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == "MealPlannerApp"
+        ]
+        
+        self.assertEqual(len(class_defs), 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""
+Tests for the database module.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from meals.models.enums import IngredientCategory, RecipeCategory
+from meals.repositories.recipe import RecipeRepository
+from meals.utils.database import SCHEMA_VERSION, backup_database, init_db
+
+# The tables as created before the enum columns stored integer codes
+BASELINE_SCHEMA = """
+CREATE TABLE recipes (
+    name VARCHAR NOT NULL,
+    description TEXT,
+    preparation_time INTEGER,
+    cooking_instructions TEXT,
+    category VARCHAR,
+    id INTEGER NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE ingredients (
+    recipe_id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    quantity FLOAT NOT NULL,
+    unit VARCHAR NOT NULL,
+    category VARCHAR,
+    id INTEGER NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+);
+INSERT INTO recipes (id, name, category) VALUES (1, 'オムレツ', 'MAIN_DISH');
+INSERT INTO ingredients (id, recipe_id, name, quantity, unit, category) VALUES (1, 1, '卵', 2, '個', 'OTHER');
+"""
+
+
+class TestDatabase(unittest.TestCase):
+    """Tests for the database module."""
+    
+    def setUp(self):
+        """Set up a database in the baseline schema."""
+        self.engine = create_engine("sqlite://")
+        self.addCleanup(self.engine.dispose)
+        
+        self.connection = self.engine.connect()
+        self.addCleanup(self.connection.close)
+        self.connection.connection.executescript(BASELINE_SCHEMA)
+    
+    def test_init_db_migrates_baseline_database(self):
+        """Test that enum columns of a baseline database read back after migration."""
+        init_db(connection=self.connection)
+        self.assertEqual(self.connection.exec_driver_sql("PRAGMA user_version").scalar(), SCHEMA_VERSION)
+        
+        session = Session(bind=self.connection, autoflush=False, expire_on_commit=False)
+        self.addCleanup(session.close)
+        repo = RecipeRepository(session)
+        
+        # Rows migrated from member names
+        recipe = repo.get_with_ingredients(1)
+        self.assertEqual(recipe.category, RecipeCategory.MAIN_DISH)
+        self.assertEqual(recipe.ingredients[0].category, IngredientCategory.OTHER)
+        
+        # Rows written after the migration into the old VARCHAR columns
+        created = repo.create_with_ingredients(
+            {"name": "サラダ", "category": RecipeCategory.SALAD.value},
+            [{"name": "レタス", "quantity": 1, "unit": "個", "category": IngredientCategory.VEGETABLE.value}],
+        )
+        session.expunge_all()
+        categories = {recipe.name: recipe.category for recipe in repo.get_all()}
+        self.assertEqual(categories, {"オムレツ": RecipeCategory.MAIN_DISH, "サラダ": RecipeCategory.SALAD})
+        self.assertEqual(repo.get_by_category(RecipeCategory.SALAD.value)[0].id, created.id)
+        self.assertEqual(repo.get_with_ingredients(created.id).ingredients[0].category, IngredientCategory.VEGETABLE)
+
+
+
+class TestBackupDatabase(unittest.TestCase):
+    """Tests for backup_database."""
+    
+    def test_backup_database_with_uri_characters_in_path(self):
+        """Test that the online backup reads a database whose path contains "#" and "?"."""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        data_dir = Path(temp_dir.name) / "meals #1?"
+        data_dir.mkdir()
+        db_path = data_dir / "meals.db"
+        
+        connection = sqlite3.connect(db_path)
+        connection.execute("CREATE TABLE recipes (name TEXT)")
+        connection.execute("INSERT INTO recipes VALUES ('オムレツ')")
+        connection.commit()
+        connection.close()
+        
+        # Fail the raw file copy fallback, so only the online backup can succeed
+        with mock.patch("meals.utils.database.DB_PATH", db_path), \
+                mock.patch("meals.utils.database.get_app_data_dir", return_value=data_dir), \
+                mock.patch("shutil.copy2", side_effect=OSError("fallback used")):
+            backup_path = backup_database()
+        
+        self.assertIsNotNone(backup_path)
+        backup = sqlite3.connect(backup_path)
+        self.addCleanup(backup.close)
+        self.assertEqual(backup.execute("SELECT name FROM recipes").fetchall(), [("オムレツ",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
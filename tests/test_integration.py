@@ -3,50 +3,24 @@ Integration tests for the meal planner application.
 """
 
 import datetime
-import os
-import tempfile
 import unittest
 from datetime import date
 from pathlib import Path
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-
-from meals.models import Base, Ingredient, MealPlan, Recipe, ShoppingList, ShoppingListItem
+from meals.models import Ingredient, MealPlan, Recipe, ShoppingList, ShoppingListItem
 from meals.models.enums import IngredientCategory, MealType, RecipeCategory
-from meals.repositories.meal_plan import MealPlanRepository
-from meals.repositories.recipe import RecipeRepository
-from meals.repositories.shopping_list import ShoppingListRepository
 from meals.viewmodels.meal_plan import MealPlanViewModel
 from meals.viewmodels.recipe import RecipeViewModel
 from meals.viewmodels.shopping_list import ShoppingListViewModel
+from tests.database import DatabaseTestCase
 
 
-class TestIntegration(unittest.TestCase):
+class TestIntegration(DatabaseTestCase):
     """Integration tests for the meal planner application."""
     
     def setUp(self):
         """Set up the test environment."""
-        # Create a temporary database file
-        self.temp_db_file = tempfile.NamedTemporaryFile(delete=False)
-        self.temp_db_file.close()
-        
-        # Create an SQLite database
-        self.engine = create_engine(f"sqlite:///{self.temp_db_file.name}")
-        
-        # Create all tables
-        Base.metadata.create_all(self.engine)
-        
-        # Create a session factory
-        self.SessionLocal = sessionmaker(bind=self.engine)
-        
-        # Create a session
-        self.session = self.SessionLocal()
-        
-        # Create repositories
-        self.meal_plan_repo = MealPlanRepository(self.session)
-        self.recipe_repo = RecipeRepository(self.session)
-        self.shopping_list_repo = ShoppingListRepository(self.session)
+        super().setUp()
         
         # Create viewmodels
         self.meal_plan_vm = MealPlanViewModel()
@@ -60,13 +34,6 @@ class TestIntegration(unittest.TestCase):
         self.shopping_list_vm.shopping_list_repo = self.shopping_list_repo
         self.shopping_list_vm.meal_plan_repo = self.meal_plan_repo
     
-    def tearDown(self):
-        """Clean up the test environment."""
-        self.session.close()
-        
-        # Remove the temporary database file
-        os.unlink(self.temp_db_file.name)
-    
     def test_create_recipe_and_meal_plan(self):
         """Test creating a recipe and a meal plan."""
         # Create a recipe
@@ -202,13 +169,37 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(len(shopping_list.items), 4)
         
         # Check if items were aggregated correctly
-        egg_item = next((item for item in shopping_list.items if item.ingredient_name == "卵"), None)
+        items = shopping_list.items_by_key
+        egg_item = items.get(("卵", "個", IngredientCategory.OTHER))
         self.assertIsNotNone(egg_item)
         self.assertEqual(egg_item.total_quantity, 2)
         
-        lettuce_item = next((item for item in shopping_list.items if item.ingredient_name == "レタス"), None)
+        lettuce_item = items.get(("レタス", "個", IngredientCategory.VEGETABLE))
         self.assertIsNotNone(lettuce_item)
         self.assertEqual(lettuce_item.total_quantity, 1)
+        
+        # Check if items are grouped by category
+        vegetables = shopping_list.items_by_category[IngredientCategory.VEGETABLE]
+        self.assertEqual([item.ingredient_name for item in vegetables], ["トマト", "レタス"])
+    
+    def test_create_and_update_trusted_recipe(self):
+        """Test creating and updating a recipe from trusted column values."""
+        recipe = self.recipe_vm.create_recipe(
+            {"name": "サラダ", "category": RecipeCategory.SALAD},
+            [{"name": "レタス", "quantity": 1, "unit": "個", "category": IngredientCategory.VEGETABLE}],
+            trusted=True,
+        )
+        
+        self.assertIsNotNone(recipe)
+        self.assertEqual(recipe.category, RecipeCategory.SALAD)
+        self.assertEqual([i.name for i in recipe.ingredients], ["レタス"])
+        
+        updated = self.recipe_vm.update_recipe(
+            recipe.id, {"name": "グリーンサラダ", "description": None}, trusted=True
+        )
+        
+        self.assertEqual(updated.name, "グリーンサラダ")
+        self.assertEqual(len(updated.ingredients), 1)
 
 
 if __name__ == "__main__":
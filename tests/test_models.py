@@ -113,6 +113,20 @@ class TestModels(unittest.TestCase):
         self.assertEqual(meal_plan_dict["meal_type"], MealType.BREAKFAST.value)
         self.assertIn("created_at", meal_plan_dict)
         self.assertIn("updated_at", meal_plan_dict)
+    
+    def test_meal_plan_to_dicts(self):
+        """Test converting MealPlans to dictionaries in bulk."""
+        today = date.today()
+        meal_plans = [
+            MealPlan(id=1, name="朝食メニュー", date=today, meal_type=MealType.BREAKFAST.value),
+            MealPlan(id=2, name="昼食メニュー", date=today, meal_type=MealType.LUNCH.value),
+        ]
+        
+        meal_plan_dicts = MealPlan.to_dicts(meal_plans)
+        
+        self.assertEqual(len(meal_plan_dicts), 2)
+        self.assertEqual(meal_plan_dicts[0], meal_plans[0].to_dict())
+        self.assertEqual(meal_plan_dicts[1]["name"], "昼食メニュー")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+"""
+Tests for the performance utilities.
+"""
+
+import threading
+import unittest
+
+from meals.utils.performance import clear_cache, memoize
+
+
+class TestMemoize(unittest.TestCase):
+    """Tests for the memoize decorator."""
+    
+    def test_memoize_does_not_cache_none(self):
+        """Test that a None result, as returned by a failed call, is computed again."""
+        calls = []
+        
+        @memoize(ttl=60)
+        def search(query):
+            calls.append(query)
+            return None if len(calls) == 1 else [query]
+        
+        self.assertIsNone(search("卵"))
+        self.assertEqual(search("卵"), ["卵"])
+        self.assertEqual(search("卵"), ["卵"])
+        self.assertEqual(calls, ["卵", "卵"])
+    
+    def test_memoize_discards_result_computed_before_clear(self):
+        """Test that a call running while the cache is cleared does not store its stale result."""
+        started = threading.Event()
+        release = threading.Event()
+        results = iter(["stale", "fresh"])
+        
+        @memoize(ttl=60)
+        def load(key):
+            result = next(results)
+            if result == "stale":
+                started.set()
+                release.wait(5)
+            return result
+        
+        thread = threading.Thread(target=load, args=(1,))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        clear_cache(load)
+        release.set()
+        thread.join(5)
+        
+        self.assertEqual(load(1), "fresh")
+        self.assertEqual(load(1), "fresh")
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -7,46 +7,29 @@ import unittest
 from datetime import date
 from unittest.mock import MagicMock, patch
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
 
-from meals.models import Base, Ingredient, MealPlan, Recipe, ShoppingList, ShoppingListItem
+from meals.models import Ingredient, MealPlan, Recipe, ShoppingList, ShoppingListItem
 from meals.models.enums import IngredientCategory, MealType, RecipeCategory
 from meals.repositories.meal_plan import MealPlanRepository
 from meals.repositories.recipe import RecipeRepository
-from meals.repositories.shopping_list import ShoppingListRepository
+from meals.schemas.recipe import IngredientCreate
+from meals.utils.database import RequestCache
+from meals.utils.exceptions import DatabaseException
+from tests.database import DatabaseTestCase
 
+# Computed once so a run crossing midnight sees the same dates throughout
+TODAY = date.today()
+TOMORROW = TODAY + datetime.timedelta(days=1)
 
-class TestRepositories(unittest.TestCase):
+
+class TestRepositories(DatabaseTestCase):
     """Tests for the repositories module."""
     
-    def setUp(self):
-        """Set up the test environment."""
-        # Create an in-memory SQLite database
-        self.engine = create_engine("sqlite:///:memory:")
-        
-        # Create all tables
-        Base.metadata.create_all(self.engine)
-        
-        # Create a session factory
-        self.SessionLocal = sessionmaker(bind=self.engine)
-        
-        # Create a session
-        self.session = self.SessionLocal()
-        
-        # Create repositories
-        self.meal_plan_repo = MealPlanRepository(self.session)
-        self.recipe_repo = RecipeRepository(self.session)
-        self.shopping_list_repo = ShoppingListRepository(self.session)
-        
-        # Add some test data
-        self._add_test_data()
-    
-    def tearDown(self):
-        """Clean up the test environment."""
-        self.session.close()
-    
-    def _add_test_data(self):
+    @staticmethod
+    def _add_test_data(session):
         """Add test data to the database."""
         # Create recipes
         recipe1 = Recipe(
@@ -65,13 +48,9 @@ class TestRepositories(unittest.TestCase):
             category=RecipeCategory.SALAD.value,
         )
         
-        self.session.add(recipe1)
-        self.session.add(recipe2)
-        self.session.flush()
-        
         # Create ingredients
         ingredient1 = Ingredient(
-            recipe_id=recipe1.id,
+            recipe=recipe1,
             name="卵",
             quantity=2,
             unit="個",
@@ -79,7 +58,7 @@ class TestRepositories(unittest.TestCase):
         )
         
         ingredient2 = Ingredient(
-            recipe_id=recipe1.id,
+            recipe=recipe1,
             name="塩",
             quantity=1,
             unit="小さじ",
@@ -87,54 +66,38 @@ class TestRepositories(unittest.TestCase):
         )
         
         ingredient3 = Ingredient(
-            recipe_id=recipe2.id,
+            recipe=recipe2,
             name="レタス",
             quantity=1,
             unit="個",
             category=IngredientCategory.VEGETABLE.value,
         )
         
-        self.session.add(ingredient1)
-        self.session.add(ingredient2)
-        self.session.add(ingredient3)
-        
         # Create meal plans
-        today = date.today()
-        tomorrow = today + datetime.timedelta(days=1)
-        
         meal_plan1 = MealPlan(
             name="朝食メニュー",
-            date=today,
+            date=TODAY,
             meal_type=MealType.BREAKFAST.value,
+            recipes=[recipe1],
         )
         
         meal_plan2 = MealPlan(
             name="昼食メニュー",
-            date=today,
+            date=TODAY,
             meal_type=MealType.LUNCH.value,
+            recipes=[recipe2],
         )
         
-        self.session.add(meal_plan1)
-        self.session.add(meal_plan2)
-        self.session.flush()
-        
-        # Add recipes to meal plans
-        meal_plan1.recipes.append(recipe1)
-        meal_plan2.recipes.append(recipe2)
-        
         # Create shopping lists
         shopping_list = ShoppingList(
             name="週末の買い物",
-            date_range_start=today,
-            date_range_end=tomorrow,
+            date_range_start=TODAY,
+            date_range_end=TOMORROW,
         )
         
-        self.session.add(shopping_list)
-        self.session.flush()
-        
         # Create shopping list items
         item1 = ShoppingListItem(
-            shopping_list_id=shopping_list.id,
+            shopping_list=shopping_list,
             ingredient_name="卵",
             total_quantity=6,
             unit="個",
@@ -143,7 +106,7 @@ class TestRepositories(unittest.TestCase):
         )
         
         item2 = ShoppingListItem(
-            shopping_list_id=shopping_list.id,
+            shopping_list=shopping_list,
             ingredient_name="レタス",
             total_quantity=1,
             unit="個",
@@ -151,19 +114,59 @@ class TestRepositories(unittest.TestCase):
             is_purchased=True,
         )
         
-        self.session.add(item1)
-        self.session.add(item2)
+        # Add everything at once; the unit of work inserts parents before their children
+        session.add_all(
+            [
+                recipe1,
+                recipe2,
+                ingredient1,
+                ingredient2,
+                ingredient3,
+                meal_plan1,
+                meal_plan2,
+                shopping_list,
+                item1,
+                item2,
+            ]
+        )
         
         # Commit the changes
-        self.session.commit()
+        session.commit()
+    
+    def _record_selects(self):
+        """Record the SELECT statements run until the end of the test."""
+        statements = []
+        
+        def record(*args):
+            # Count queries only, not the savepoints the test transaction adds
+            if args[2].startswith("SELECT"):
+                statements.append(args[2])
+        
+        event.listen(self.engine, "before_cursor_execute", record)
+        self.addCleanup(event.remove, self.engine, "before_cursor_execute", record)
+        return statements
     
-    def test_meal_plan_repository_get_all(self):
-        """Test getting all meal plans."""
-        meal_plans = self.meal_plan_repo.get_all()
+    def test_repository_get_all(self):
+        """Test getting all meal plans, recipes and shopping lists."""
+        cases = [
+            (self.meal_plan_repo, {"朝食メニュー", "昼食メニュー"}),
+            (self.recipe_repo, {"オムレツ", "サラダ"}),
+            (self.shopping_list_repo, {"週末の買い物"}),
+        ]
+        for repo, expected in cases:
+            with self.subTest(repo=type(repo).__name__):
+                self.assertEqual({row.name for row in repo.get_all()}, expected)
+    
+    def test_meal_plan_repository_get_all_with_recipes(self):
+        """Test that the recipes of all meal plans are loaded without a query per meal plan."""
+        self.session.expunge_all()
+        statements = self._record_selects()
+        
+        meal_plans = self.meal_plan_repo.get_all_with_recipes()
+        recipes = {meal_plan.name: [recipe.name for recipe in meal_plan.recipes] for meal_plan in meal_plans}
         
-        self.assertEqual(len(meal_plans), 2)
-        self.assertEqual(meal_plans[0].name, "朝食メニュー")
-        self.assertEqual(meal_plans[1].name, "昼食メニュー")
+        self.assertEqual(recipes, {"朝食メニュー": ["オムレツ"], "昼食メニュー": ["サラダ"]})
+        self.assertLessEqual(len(statements), 2)
     
     def test_meal_plan_repository_get_by_id(self):
         """Test getting a meal plan by ID."""
@@ -172,21 +175,89 @@ class TestRepositories(unittest.TestCase):
         self.assertIsNotNone(meal_plan)
         self.assertEqual(meal_plan.name, "朝食メニュー")
     
+    def test_meal_plan_repository_get_with_recipes(self):
+        """Test that a meal plan and its recipes are loaded with one query."""
+        self.session.expunge_all()
+        statements = self._record_selects()
+        
+        meal_plan = self.meal_plan_repo.get_with_recipes(1)
+        
+        self.assertEqual([recipe.name for recipe in meal_plan.recipes], ["オムレツ"])
+        self.assertEqual(len(statements), 1)
+    
+    def test_meal_plan_repository_exists(self):
+        """Test checking whether a meal plan exists."""
+        self.assertTrue(self.meal_plan_repo.exists(1))
+        self.assertFalse(self.meal_plan_repo.exists(999))
+    
     def test_meal_plan_repository_get_by_date_and_meal_type(self):
         """Test getting a meal plan by date and meal type."""
-        today = date.today()
-        meal_plan = self.meal_plan_repo.get_by_date_and_meal_type(today, MealType.BREAKFAST.value)
+        meal_plan = self.meal_plan_repo.get_by_date_and_meal_type(TODAY, MealType.BREAKFAST.value)
         
         self.assertIsNotNone(meal_plan)
         self.assertEqual(meal_plan.name, "朝食メニュー")
     
-    def test_recipe_repository_get_all(self):
-        """Test getting all recipes."""
-        recipes = self.recipe_repo.get_all()
+    def test_meal_plan_repository_create_if_slot_free(self):
+        """Test that a meal plan is not created for a taken date and meal type."""
+        taken = self.meal_plan_repo.create_if_slot_free(
+            {"name": "朝食2", "date": TODAY, "meal_type": MealType.BREAKFAST.value}
+        )
+        free = self.meal_plan_repo.create_if_slot_free(
+            {"name": "夕食メニュー", "date": TODAY, "meal_type": MealType.DINNER.value}
+        )
         
-        self.assertEqual(len(recipes), 2)
-        self.assertEqual(recipes[0].name, "オムレツ")
-        self.assertEqual(recipes[1].name, "サラダ")
+        self.assertIsNone(taken)
+        self.assertIsNotNone(free)
+        self.assertEqual(len(self.meal_plan_repo.get_all()), 3)
+    
+    def test_meal_plan_repository_set_recipes(self):
+        """Test adding and removing recipes of a meal plan in one batch."""
+        result = self.meal_plan_repo.set_recipes(1, {2, 999}, {1})
+        
+        self.assertTrue(result)
+        meal_plan = self.meal_plan_repo.get_with_recipes(1)
+        self.assertEqual([recipe.name for recipe in meal_plan.recipes], ["サラダ"])
+    
+    def test_meal_plan_repository_add_recipe_to_meal_plan(self):
+        """Test that an added recipe shows up when the meal plan is read again in the same session."""
+        self.assertEqual([r.name for r in self.meal_plan_repo.get_with_recipes(1).recipes], ["オムレツ"])
+        recipe = self.session.get(Recipe, 2, options=[selectinload(Recipe.meal_plans)])
+        
+        self.assertTrue(self.meal_plan_repo.add_recipe_to_meal_plan(1, 2))
+        
+        meal_plan = self.meal_plan_repo.get_with_recipes(1)
+        self.assertEqual({r.name for r in meal_plan.recipes}, {"オムレツ", "サラダ"})
+        self.assertIn("meal_plans", inspect(recipe).unloaded)
+    
+    def test_meal_plan_repository_remove_recipe_from_meal_plan(self):
+        """Test that a removed recipe is gone when the meal plan is read again in the same session."""
+        self.assertEqual([r.name for r in self.meal_plan_repo.get_with_recipes(1).recipes], ["オムレツ"])
+        recipe = self.session.get(Recipe, 1, options=[selectinload(Recipe.meal_plans)])
+        
+        self.assertTrue(self.meal_plan_repo.remove_recipe_from_meal_plan(1, 1))
+        
+        self.assertEqual(self.meal_plan_repo.get_with_recipes(1).recipes, [])
+        self.assertIn("meal_plans", inspect(recipe).unloaded)
+    
+    def test_meal_plan_repository_get_recipe_ids(self):
+        """Test getting the recipe IDs of a meal plan."""
+        self.assertEqual(self.meal_plan_repo.get_recipe_ids(1), {1})
+        self.assertEqual(self.meal_plan_repo.get_recipe_ids(999), set())
+    
+    def test_meal_plan_repository_aggregate_ingredients_for_date_range(self):
+        """Test summing the planned ingredients in a date range."""
+        self.meal_plan_repo.set_recipes(2, {1}, ())
+        
+        rows = self.meal_plan_repo.aggregate_ingredients_for_date_range(TODAY, TODAY)
+        
+        quantities = {row["ingredient_name"]: row["total_quantity"] for row in rows}
+        self.assertEqual(quantities, {"卵": 4, "塩": 2, "レタス": 1})
+    
+    def test_repository_shared(self):
+        """Test that each repository class has one shared instance."""
+        self.assertIs(RecipeRepository.shared(), RecipeRepository.shared())
+        self.assertIsNot(RecipeRepository.shared(), MealPlanRepository.shared())
+        self.assertIsInstance(MealPlanRepository.shared(), MealPlanRepository)
     
     def test_recipe_repository_get_by_id(self):
         """Test getting a recipe by ID."""
@@ -199,22 +270,115 @@ class TestRepositories(unittest.TestCase):
         """Test getting recipes by category."""
         recipes = self.recipe_repo.get_by_category(RecipeCategory.MAIN_DISH.value)
         
-        self.assertEqual(len(recipes), 1)
-        self.assertEqual(recipes[0].name, "オムレツ")
+        self.assertEqual([recipe.name for recipe in recipes], ["オムレツ"])
     
     def test_recipe_repository_search(self):
         """Test searching recipes."""
         recipes = self.recipe_repo.search("オムレツ")
         
-        self.assertEqual(len(recipes), 1)
-        self.assertEqual(recipes[0].name, "オムレツ")
+        self.assertEqual([recipe.name for recipe in recipes], ["オムレツ"])
+    
+    def test_recipe_repository_get_all_with_ingredients(self):
+        """Test that only the ingredients are loaded with the recipes."""
+        self.session.expunge_all()
+        statements = self._record_selects()
+        recipes = {recipe.name: recipe for recipe in self.recipe_repo.get_all_with_ingredients()}
+        
+        self.assertEqual(set(recipes), {"オムレツ", "サラダ"})
+        self.assertEqual({i.name for i in recipes["オムレツ"].ingredients}, {"卵", "塩"})
+        self.assertEqual({i.name for i in recipes["サラダ"].ingredients}, {"レタス"})
+        self.assertLessEqual(len(statements), 2)
+        with self.assertRaises(InvalidRequestError):
+            recipes["オムレツ"].meal_plans
+    
+    def test_recipe_repository_get_with_ingredients_cached(self):
+        """Test that a repeated fetch is served from the session cache until a write or commit."""
+        statements = self._record_selects()
+        
+        recipe = self.recipe_repo.get_with_ingredients(1)
+        self.assertIs(self.recipe_repo.get_with_ingredients(1), recipe)
+        self.assertEqual(len(statements), 1)
+        
+        self.recipe_repo.add_ingredient(1, {"name": "牛乳", "quantity": 50, "unit": "ml"})
+        statements.clear()
+        self.recipe_repo.get_with_ingredients(1)
+        self.assertEqual(len(statements), 1)
+        
+        # A commit ends the request, so the next fetch reads the database again
+        self.session.commit()
+        statements.clear()
+        self.recipe_repo.get_with_ingredients(1)
+        self.assertEqual(len(statements), 1)
+    
+    def test_request_cache_evicts_least_recently_used(self):
+        """Test that the request cache keeps only its most recently used objects."""
+        cache = RequestCache(maxsize=1)
+        cache.put(self.recipe_repo.get_by_id(1))
+        cache.put(self.recipe_repo.get_by_id(2))
+        
+        self.assertIsNone(cache.get(Recipe, 1))
+        self.assertEqual(cache.get(Recipe, 2).name, "サラダ")
+    
+    def test_recipe_repository_add_ingredient_missing_recipe(self):
+        """Test that adding an ingredient to a missing recipe returns None and keeps the transaction."""
+        with self.recipe_repo.transaction():
+            self.recipe_repo.add_ingredient(1, {"name": "牛乳", "quantity": 50, "unit": "ml"})
+            ingredient = self.recipe_repo.add_ingredient(999, {"name": "牛乳", "quantity": 50, "unit": "ml"})
+        
+        self.assertIsNone(ingredient)
+        names = {i.name for i in self.recipe_repo.get_with_ingredients(1).ingredients}
+        self.assertEqual(names, {"卵", "塩", "牛乳"})
+    
+    def test_recipe_repository_add_ingredient_invalid(self):
+        """Test that an ingredient violating another constraint is reported as a database error."""
+        with self.assertRaises(DatabaseException):
+            self.recipe_repo.add_ingredient(1, {"name": "牛乳", "quantity": 50, "unit": None})
+    
+    def test_recipe_repository_update_with_ingredients(self):
+        """Test that updating ingredients keeps matching rows and their timestamps."""
+        egg = next(i for i in self.recipe_repo.get_with_ingredients(1).ingredients if i.name == "卵")
+        egg_id, egg_created_at, egg_updated_at = egg.id, egg.created_at, egg.updated_at
+        
+        # Rows as the viewmodel passes them, with the schema's empty timestamps
+        self.recipe_repo.update_with_ingredients(
+            1,
+            {},
+            [
+                IngredientCreate(name="卵", quantity=3, unit="個").to_dict(),
+                IngredientCreate(name="牛乳", quantity=50, unit="ml").to_dict(),
+            ],
+        )
+        
+        # The update expires the collection, so read it back with an eager load
+        recipe = self.recipe_repo.get_with_ingredients(1)
+        ingredients = {i.name: i for i in recipe.ingredients}
+        self.assertEqual(set(ingredients), {"卵", "牛乳"})
+        self.assertEqual(ingredients["卵"].id, egg_id)
+        self.assertEqual(ingredients["卵"].quantity, 3)
+        self.assertEqual(ingredients["卵"].created_at, egg_created_at)
+        self.assertGreater(ingredients["卵"].updated_at, egg_updated_at)
+        self.assertIsNotNone(ingredients["牛乳"].created_at)
     
-    def test_shopping_list_repository_get_all(self):
-        """Test getting all shopping lists."""
-        shopping_lists = self.shopping_list_repo.get_all()
+    def test_shopping_list_repository_get_all_with_items(self):
+        """Test that the items of all shopping lists are loaded without a query per shopping list."""
+        self.session.expunge_all()
+        statements = self._record_selects()
         
-        self.assertEqual(len(shopping_lists), 1)
-        self.assertEqual(shopping_lists[0].name, "週末の買い物")
+        shopping_lists = self.shopping_list_repo.get_all_with_items()
+        items = {item.ingredient_name for shopping_list in shopping_lists for item in shopping_list.items}
+        
+        self.assertEqual(items, {"卵", "レタス"})
+        self.assertLessEqual(len(statements), 2)
+    
+    def test_shopping_list_repository_get_with_items(self):
+        """Test that a shopping list and its items are loaded with one query."""
+        self.session.expunge_all()
+        statements = self._record_selects()
+        
+        shopping_list = self.shopping_list_repo.get_with_items(1)
+        
+        self.assertEqual({item.ingredient_name for item in shopping_list.items}, {"卵", "レタス"})
+        self.assertEqual(len(statements), 1)
     
     def test_shopping_list_repository_get_by_id(self):
         """Test getting a shopping list by ID."""
@@ -227,8 +391,15 @@ class TestRepositories(unittest.TestCase):
         """Test getting shopping list items by purchase status."""
         items = self.shopping_list_repo.get_items_by_purchase_status(1, True)
         
-        self.assertEqual(len(items), 1)
-        self.assertEqual(items[0].ingredient_name, "レタス")
+        self.assertEqual([item.ingredient_name for item in items], ["レタス"])
+    
+    def test_shopping_list_repository_bulk_mark_items_as_purchased(self):
+        """Test marking several items as purchased at once."""
+        count = self.shopping_list_repo.bulk_mark_items_as_purchased([1, 2], True)
+        
+        self.assertEqual(count, 2)
+        items = self.shopping_list_repo.get_items_by_purchase_status(1, True)
+        self.assertEqual(len(items), 2)
 
 
 if __name__ == "__main__":
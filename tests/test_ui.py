@@ -0,0 +1,80 @@
+"""
+Tests for the UI utilities module.
+"""
+
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from meals.models import Base
+from meals.repositories.recipe import RecipeRepository
+from meals.utils import database, ui
+
+
+class TestLoadInBackground(unittest.TestCase):
+    """Tests for load_in_background."""
+    
+    def setUp(self):
+        """Point the scoped sessions at a test database with one recipe."""
+        # A file database, so each thread gets its own pooled connection as in the app
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.engine = create_engine(f"sqlite:///{Path(directory.name) / 'meals.db'}")
+        self.addCleanup(self.engine.dispose)
+        Base.metadata.create_all(self.engine)
+        
+        database.ScopedSession.remove()
+        database.ScopedSession.configure(bind=self.engine)
+        self.addCleanup(database.ScopedSession.configure, bind=database.engine)
+        self.addCleanup(database.ScopedSession.remove)
+        
+        with Session(self.engine) as session:
+            recipe = RecipeRepository(session).create_with_ingredients(
+                {"name": "old"}, [{"name": "卵", "quantity": 1, "unit": "個"}]
+            )
+            self.recipe_id = recipe.id
+        
+        # One worker, so every load runs on the same thread
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        patcher = patch.object(ui, "_executor", executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        # Repository using the scoped session of whichever thread calls it
+        self.repo = RecipeRepository()
+    
+    def _load(self):
+        """Load the recipe on a background worker."""
+        def load():
+            recipe = self.repo.get_with_ingredients(self.recipe_id)
+            names = [recipe.name for recipe in self.repo.get_all()]
+            return recipe.name, recipe.ingredients[0].quantity, names
+        
+        async def run():
+            result = asyncio.get_running_loop().create_future()
+            ui.load_in_background(load, result.set_result)
+            return await result
+        
+        return asyncio.run(run())
+    
+    def test_load_sees_changes_from_other_threads(self):
+        """Test that a background load does not return rows cached by an earlier load."""
+        self.assertEqual(self._load(), ("old", 1.0, ["old"]))
+        
+        # Update the recipe on this thread, as the UI does
+        self.repo.update_with_ingredients(
+            self.recipe_id, {"name": "new"}, [{"name": "卵", "quantity": 5, "unit": "個"}]
+        )
+        
+        self.assertEqual(self._load(), ("new", 5.0, ["new"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -5,48 +5,66 @@ Tests for the viewmodels module.
 import datetime
 import unittest
 from datetime import date
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+from sqlalchemy import inspect
+
+from meals.models import MealPlan, Recipe, ShoppingList
 from meals.models.enums import MealType, RecipeCategory
+from meals.viewmodels import meal_plan, recipe, shopping_list
 from meals.viewmodels.meal_plan import MealPlanViewModel
 from meals.viewmodels.recipe import RecipeViewModel
 from meals.viewmodels.shopping_list import ShoppingListViewModel
 
+# Computed once so a run crossing midnight sees the same dates throughout
+TODAY = date.today()
+TOMORROW = TODAY + datetime.timedelta(days=1)
+
+
+def model_stub(model, **attributes):
+    """Create a plain stand-in for an ORM instance of a model; attributes not given read as None."""
+    return SimpleNamespace(**{**dict.fromkeys(inspect(model).attrs.keys()), **attributes})
+
 
 class TestViewModels(unittest.TestCase):
     """Tests for the viewmodels module."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Patch the repositories once for all tests."""
+        cls.mock_meal_plan_repo = cls._start_patch(meal_plan, "MealPlanRepository")
+        cls.mock_recipe_repo = cls._start_patch(recipe, "RecipeRepository")
+        cls.mock_shopping_list_repo = cls._start_patch(shopping_list, "ShoppingListRepository")
+    
+    @classmethod
+    def _start_patch(cls, module, attribute):
+        """Start a patcher that is stopped after the last test of the class."""
+        # Patch the already imported module directly instead of resolving a dotted path
+        patcher = patch.object(module, attribute)
+        cls.addClassCleanup(patcher.stop)
+        return patcher.start()
+    
     def setUp(self):
         """Set up the test environment."""
-        # Create mock repositories
-        self.meal_plan_repo_patcher = patch("meals.viewmodels.meal_plan.MealPlanRepository")
-        self.recipe_repo_patcher = patch("meals.viewmodels.recipe.RecipeRepository")
-        self.shopping_list_repo_patcher = patch("meals.viewmodels.shopping_list.ShoppingListRepository")
-        
-        self.mock_meal_plan_repo = self.meal_plan_repo_patcher.start()
-        self.mock_recipe_repo = self.recipe_repo_patcher.start()
-        self.mock_shopping_list_repo = self.shopping_list_repo_patcher.start()
+        # Forget the calls, return values and side effects configured by the previous test
+        for mock_repo in (self.mock_meal_plan_repo, self.mock_recipe_repo, self.mock_shopping_list_repo):
+            mock_repo.reset_mock(return_value=True, side_effect=True)
         
         # Create viewmodels
         self.meal_plan_vm = MealPlanViewModel()
         self.recipe_vm = RecipeViewModel()
         self.shopping_list_vm = ShoppingListViewModel()
     
-    def tearDown(self):
-        """Clean up the test environment."""
-        self.meal_plan_repo_patcher.stop()
-        self.recipe_repo_patcher.stop()
-        self.shopping_list_repo_patcher.stop()
-    
     def test_meal_plan_viewmodel_create_meal_plan(self):
         """Test creating a meal plan."""
         # Set up mock
-        self.meal_plan_vm.meal_plan_repo.get_by_date_and_meal_type.return_value = None
-        self.meal_plan_vm.meal_plan_repo.create.return_value = MagicMock(id=1)
-        self.meal_plan_vm.meal_plan_repo.get_with_recipes.return_value = MagicMock(
+        self.meal_plan_vm.meal_plan_repo.create_if_slot_free.return_value = SimpleNamespace(id=1)
+        self.meal_plan_vm.meal_plan_repo.load_recipes.return_value = model_stub(
+            MealPlan,
             id=1,
             name="朝食メニュー",
-            date=date.today(),
+            date=TODAY,
             meal_type=MealType.BREAKFAST.value,
             recipes=[],
         )
@@ -58,7 +76,7 @@ class TestViewModels(unittest.TestCase):
         # Create meal plan
         meal_plan_data = {
             "name": "朝食メニュー",
-            "date": date.today(),
+            "date": TODAY,
             "meal_type": MealType.BREAKFAST.value,
         }
         
@@ -74,7 +92,7 @@ class TestViewModels(unittest.TestCase):
     def test_meal_plan_viewmodel_create_meal_plan_duplicate(self):
         """Test creating a duplicate meal plan."""
         # Set up mock
-        self.meal_plan_vm.meal_plan_repo.get_by_date_and_meal_type.return_value = MagicMock()
+        self.meal_plan_vm.meal_plan_repo.create_if_slot_free.return_value = None
         
         # Register error handler
         error_handler = MagicMock()
@@ -83,7 +101,7 @@ class TestViewModels(unittest.TestCase):
         # Create meal plan
         meal_plan_data = {
             "name": "朝食メニュー",
-            "date": date.today(),
+            "date": TODAY,
             "meal_type": MealType.BREAKFAST.value,
         }
         
@@ -98,8 +116,9 @@ class TestViewModels(unittest.TestCase):
     def test_recipe_viewmodel_create_recipe(self):
         """Test creating a recipe."""
         # Set up mock
-        self.recipe_vm.recipe_repo.create_with_ingredients.return_value = MagicMock(id=1)
-        self.recipe_vm.recipe_repo.get_with_ingredients.return_value = MagicMock(
+        self.recipe_vm.recipe_repo.create_with_ingredients.return_value = SimpleNamespace(id=1)
+        self.recipe_vm.recipe_repo.get_with_ingredients.return_value = model_stub(
+            Recipe,
             id=1,
             name="オムレツ",
             description="シンプルなオムレツのレシピ",
@@ -139,15 +158,57 @@ class TestViewModels(unittest.TestCase):
         # Check if success handler was called
         success_handler.assert_called_once()
     
+    def test_recipe_viewmodel_create_recipe_invalid_ingredient(self):
+        """Test creating a recipe with an ingredient missing required fields."""
+        # Register error handler
+        error_handler = MagicMock()
+        self.recipe_vm.register_error_handler("create_recipe", error_handler)
+        
+        # Create recipe
+        ingredients_data = [
+            {"name": "卵", "quantity": 2, "unit": "個"},
+            {"name": "塩", "quantity": 1, "unit": " "},
+        ]
+        
+        result = self.recipe_vm.create_recipe({"name": "オムレツ"}, ingredients_data)
+        
+        # Check result
+        self.assertIsNone(result)
+        self.recipe_vm.recipe_repo.create_with_ingredients.assert_not_called()
+        
+        # Check if error handler was called with the failing ingredient
+        error_handler.assert_called_once()
+        self.assertIn("Ingredient 2: Missing required fields: unit", str(error_handler.call_args[0][0]))
+    
+    def test_recipe_viewmodel_create_recipe_trusted_invalid_ingredient(self):
+        """Test creating a trusted recipe with an ingredient missing required fields."""
+        # Register error handler
+        error_handler = MagicMock()
+        self.recipe_vm.register_error_handler("create_recipe", error_handler)
+        
+        # Create recipe
+        ingredients_data = [{"name": "卵", "quantity": 2}]
+        
+        result = self.recipe_vm.create_recipe({"name": "オムレツ"}, ingredients_data, trusted=True)
+        
+        # Check result
+        self.assertIsNone(result)
+        self.recipe_vm.recipe_repo.create_with_ingredients.assert_not_called()
+        
+        # Check if error handler was called with the failing ingredient
+        error_handler.assert_called_once()
+        self.assertIn("Ingredient 1: Missing required fields: unit", str(error_handler.call_args[0][0]))
+    
     def test_shopping_list_viewmodel_create_shopping_list(self):
         """Test creating a shopping list."""
         # Set up mock
-        self.shopping_list_vm.shopping_list_repo.create.return_value = MagicMock(id=1)
-        self.shopping_list_vm.shopping_list_repo.get_with_items.return_value = MagicMock(
+        self.shopping_list_vm.shopping_list_repo.create.return_value = SimpleNamespace(id=1)
+        self.shopping_list_vm.shopping_list_repo.get_with_items.return_value = model_stub(
+            ShoppingList,
             id=1,
             name="週末の買い物",
-            date_range_start=date.today(),
-            date_range_end=date.today() + datetime.timedelta(days=1),
+            date_range_start=TODAY,
+            date_range_end=TOMORROW,
             items=[],
         )
         
@@ -158,8 +219,8 @@ class TestViewModels(unittest.TestCase):
         # Create shopping list
         shopping_list_data = {
             "name": "週末の買い物",
-            "date_range_start": date.today(),
-            "date_range_end": date.today() + datetime.timedelta(days=1),
+            "date_range_start": TODAY,
+            "date_range_end": TOMORROW,
         }
         
         result = self.shopping_list_vm.create_shopping_list(shopping_list_data)
@@ -180,8 +241,8 @@ class TestViewModels(unittest.TestCase):
         # Create shopping list
         shopping_list_data = {
             "name": "週末の買い物",
-            "date_range_start": date.today() + datetime.timedelta(days=1),
-            "date_range_end": date.today(),
+            "date_range_start": TOMORROW,
+            "date_range_end": TODAY,
         }
         
         result = self.shopping_list_vm.create_shopping_list(shopping_list_data)
@@ -191,6 +252,21 @@ class TestViewModels(unittest.TestCase):
         
         # Check if error handler was called
         error_handler.assert_called_once()
+    
+    def test_register_handlers(self):
+        """Test registering error and success handlers for several actions at once."""
+        error_handler = MagicMock()
+        success_handler = MagicMock()
+        self.shopping_list_vm.register_handlers(
+            error_handlers={"create_shopping_list": error_handler},
+            success_handlers={"delete_shopping_list": success_handler},
+        )
+        
+        self.shopping_list_vm._handle_error("create_shopping_list", Exception("Test error"))
+        self.shopping_list_vm._handle_success("delete_shopping_list", True)
+        
+        error_handler.assert_called_once()
+        success_handler.assert_called_once_with(True)
 
 
 if __name__ == "__main__":